@@ -7,17 +7,24 @@ or: python -m backend --help
 import asyncio
 import argparse
 import sys
-import json
 from pathlib import Path
 
+try:
+    # libuv-backed event loop; not available on Windows.
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from agent.workflow_analyzer_agent.orchestrator import WorkflowAnalyzerOrchestrator
-
 
-async def run_analysis(workflow_text: str, verbose: bool = False):
+async def run_analysis(workflow_text: str, verbose: bool = False, json_output: bool = False):
     """Run workflow analysis with the orchestrator."""
+    # Deferred so `--help` and argument errors don't pay for the
+    # google-genai / ADK import chain.
+    from agent.workflow_analyzer_agent.orchestrator import WorkflowAnalyzerOrchestrator
+
     try:
         # Initialize orchestrator
         print("\n" + "=" * 80)
@@ -37,6 +44,15 @@ async def run_analysis(workflow_text: str, verbose: bool = False):
         print("\nAnalyzing workflow... (this may take a moment)")
         result = await orchestrator.analyze_workflow(workflow_text)
 
+        # Serialize once for both the verbose dump and --json output
+        result_json = None
+        if verbose or json_output:
+            import orjson
+
+            result_json = orjson.dumps(
+                result.model_dump(mode="json"), option=orjson.OPT_INDENT_2
+            ).decode()
+
         # Display results
         print("\n" + "=" * 80)
         print("ANALYSIS RESULTS")
@@ -57,37 +73,44 @@ async def run_analysis(workflow_text: str, verbose: bool = False):
         print(f"High-Risk Steps: {result.summary.high_risk_steps}")
         print(f"Critical-Risk Steps: {result.summary.critical_risk_steps}")
 
+        # Build the per-step, insight and recommendation sections in one
+        # buffer and write it once instead of issuing a print per line.
+        buf = []
+        out = buf.append
+
         # Step-by-step breakdown
         if verbose:
-            print(f"\n--- STEPS BREAKDOWN ---")
+            out("\n--- STEPS BREAKDOWN ---\n")
             for i, step in enumerate(result.steps, 1):
-                print(f"\n[Step {i}] {step.id}: {step.description}")
-                print(f"  - Agent Type: {step.agent_type}")
-                print(f"  - Risk Level: {step.risk_level}")
-                print(f"  - Automation Feasibility: {step.automation_feasibility:.1%}")
-                print(f"  - Determinism Score: {step.determinism_score:.1%}")
+                out(f"\n[Step {i}] {step.id}: {step.description}\n")
+                out(f"  - Agent Type: {step.agent_type}\n")
+                out(f"  - Risk Level: {step.risk_level}\n")
+                out(f"  - Automation Feasibility: {step.automation_feasibility:.1%}\n")
+                out(f"  - Determinism Score: {step.determinism_score:.1%}\n")
                 if step.available_api:
-                    print(f"  - Available API: {step.available_api}")
+                    out(f"  - Available API: {step.available_api}\n")
                 if step.suggested_tools:
-                    print(f"  - Suggested Tools: {', '.join(step.suggested_tools)}")
+                    out(f"  - Suggested Tools: {', '.join(step.suggested_tools)}\n")
                 if step.requires_human_review:
-                    print(f"  - Human Review Required: YES")
+                    out("  - Human Review Required: YES\n")
 
         # Key insights
         if result.key_insights:
-            print(f"\n--- KEY INSIGHTS ---")
+            out("\n--- KEY INSIGHTS ---\n")
             for i, insight in enumerate(result.key_insights, 1):
-                print(f"\n[Insight {i}] {insight.title}")
-                print(f"  - Priority: {insight.priority}")
-                print(f"  - Description: {insight.description}")
+                out(f"\n[Insight {i}] {insight.title}\n")
+                out(f"  - Priority: {insight.priority}\n")
+                out(f"  - Description: {insight.description}\n")
                 if insight.affected_steps:
-                    print(f"  - Affected Steps: {', '.join(insight.affected_steps)}")
+                    out(f"  - Affected Steps: {', '.join(insight.affected_steps)}\n")
 
         # Recommendations
         if result.recommendations:
-            print(f"\n--- RECOMMENDATIONS ---")
+            out("\n--- RECOMMENDATIONS ---\n")
             for i, rec in enumerate(result.recommendations, 1):
-                print(f"{i}. {rec}")
+                out(f"{i}. {rec}\n")
+
+        sys.stdout.write("".join(buf))
 
         # Metrics
         print(f"\n--- METRICS ---")
@@ -100,12 +123,19 @@ async def run_analysis(workflow_text: str, verbose: bool = False):
         # Full JSON output
         if verbose:
             print(f"\n--- FULL JSON OUTPUT ---")
-            print(json.dumps(result.dict(), indent=2, default=str))
+            print(result_json)
 
         print("\n" + "=" * 80)
         print("ANALYSIS COMPLETED SUCCESSFULLY")
         print("=" * 80 + "\n")
 
+        # Output as JSON if requested
+        if json_output:
+            print("\n" + "=" * 80)
+            print("JSON OUTPUT")
+            print("=" * 80 + "\n")
+            print(result_json)
+
         return result
 
     except Exception as e:
@@ -187,14 +217,11 @@ Examples:
         print("Using default sample workflow (customer support workflow)\n")
 
     # Run analysis
-    result = asyncio.run(run_analysis(workflow_text, verbose=args.verbose))
-
-    # Output as JSON if requested
-    if args.json:
-        print("\n" + "=" * 80)
-        print("JSON OUTPUT")
-        print("=" * 80 + "\n")
-        print(json.dumps(result.dict(), indent=2, default=str))
+    coro = run_analysis(workflow_text, verbose=args.verbose, json_output=args.json)
+    if uvloop is not None:
+        uvloop.run(coro)
+    else:
+        asyncio.run(coro)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,5 @@
 """ADK Workflow Analyzer Agent module."""
 
-from .workflow_analyzer_agent import (
-    SessionState,
-    SessionManager,
-    StructuredLogger,
-    DistributedTracer,
-    MetricsCollector,
-    WorkflowStep,
-    ParsedWorkflow,
-    RiskAssessment,
-    AutomationData,
-    AutomationSummary,
-    KeyInsight,
-    WorkflowAnalysis,
-    AnalysisMetrics,
-)
-
 __all__ = [
     "SessionState",
     "SessionManager",
@@ -31,3 +15,14 @@ __all__ = [
     "WorkflowAnalysis",
     "AnalysisMetrics",
 ]
+
+
+def __getattr__(name):
+    """Lazily resolve re-exports so importing ``agent`` stays cheap (PEP 562)."""
+    if name in __all__:
+        from . import workflow_analyzer_agent
+
+        value = getattr(workflow_analyzer_agent, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
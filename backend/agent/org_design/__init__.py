@@ -1,31 +1,35 @@
 """Org design module for agent org charts, cards, and registries."""
 
-from .types import (
-    AgentCard,
-    AgentConnection,
-    AgentOrgChart,
-    AgentRegistry,
-    SafetyConstraints,
-    ToolRegistry,
-    ToolRegistryEntry,
-)
-from .designer import (
-    build_agent_registry,
-    build_tool_registry,
-    synthesize_agent_org_chart,
-)
-from .service import run_org_design_for_analysis
+from importlib import import_module
 
-__all__ = [
-    "AgentCard",
-    "AgentConnection",
-    "AgentOrgChart",
-    "AgentRegistry",
-    "SafetyConstraints",
-    "ToolRegistry",
-    "ToolRegistryEntry",
-    "build_agent_registry",
-    "build_tool_registry",
-    "synthesize_agent_org_chart",
-    "run_org_design_for_analysis",
-]
+# Public name -> submodule that defines it. Resolved lazily (PEP 562) so
+# importing the package does not pull in pydantic or the service layer.
+_LAZY_EXPORTS = {
+    "AgentCard": ".types",
+    "AgentConnection": ".types",
+    "AgentOrgChart": ".types",
+    "AgentRegistry": ".types",
+    "SafetyConstraints": ".types",
+    "ToolRegistry": ".types",
+    "ToolRegistryEntry": ".types",
+    "build_agent_registry": ".designer",
+    "build_tool_registry": ".designer",
+    "synthesize_agent_org_chart": ".designer",
+    "run_org_design_for_analysis": ".service",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    """Import re-exported names on first access."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
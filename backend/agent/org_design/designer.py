@@ -1,6 +1,7 @@
 """Functions to synthesize AgentOrgChart and registries from workflow analysis."""
 
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import Any, List, Mapping, Tuple
 
 from ..workflow_analyzer_agent.types import WorkflowAnalysis, WorkflowStep
 from .types import (
@@ -13,10 +14,16 @@ from .types import (
     ToolRegistryEntry,
 )
 
+# Risk levels that require human approval and PII restrictions.
+_HIGH_RISK_LEVELS = frozenset(("HIGH", "CRITICAL"))
+
+# Read-only stand-in for steps without metadata.
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
 
 def _infer_mode(step: WorkflowStep) -> str:
     """Infer agent execution mode from a workflow step."""
-    if step.requires_human_review or (step.risk_level in {"HIGH", "CRITICAL"}):
+    if step.requires_human_review or (step.risk_level in _HIGH_RISK_LEVELS):
         return "HUMAN" if step.automation_feasibility < 0.4 else "HYBRID"
 
     if step.available_api:
@@ -28,37 +35,38 @@ def _infer_mode(step: WorkflowStep) -> str:
     return "HUMAN"
 
 
-def _infer_safety(step: WorkflowStep) -> SafetyConstraints:
+def _infer_safety(step: WorkflowStep, md: Mapping[str, Any]) -> SafetyConstraints:
     """Infer basic safety constraints from risk and human-review flags."""
-    requires_approval = step.requires_human_review or step.risk_level in {"HIGH", "CRITICAL"}
+    high_risk = step.risk_level in _HIGH_RISK_LEVELS
+    requires_approval = step.requires_human_review or high_risk
     # Simple heuristic: treat high/critical or explicit human review as PII-sensitive.
-    restricts_pii = step.risk_level in {"HIGH", "CRITICAL"}
+    restricts_pii = high_risk
 
-    return SafetyConstraints(
+    return SafetyConstraints.model_construct(
         requires_human_approval=requires_approval,
         restricts_pii=restricts_pii,
-        notes=step.metadata.get("safety_notes") if step.metadata else None,
+        notes=md.get("safety_notes"),
     )
 
 
 def _collect_tool_ids(step: WorkflowStep) -> List[str]:
     """Create tool IDs from available_api and suggested_tools."""
     tool_ids: List[str] = []
+    seen = set()
 
     if step.available_api:
-        tool_ids.append(f"api::{step.available_api}")
+        api_id = f"api::{step.available_api}"
+        seen.add(api_id)
+        tool_ids.append(api_id)
 
+    # Deduplicate while preserving order
     for tool_name in step.suggested_tools:
-        tool_ids.append(f"tool::{tool_name}")
+        tool_id = f"tool::{tool_name}"
+        if tool_id not in seen:
+            seen.add(tool_id)
+            tool_ids.append(tool_id)
 
-    # Deduplicate while preserving order
-    seen = set()
-    deduped: List[str] = []
-    for t in tool_ids:
-        if t not in seen:
-            seen.add(t)
-            deduped.append(t)
-    return deduped
+    return tool_ids
 
 
 def synthesize_agent_org_chart(analysis: WorkflowAnalysis) -> AgentOrgChart:
@@ -67,35 +75,51 @@ def synthesize_agent_org_chart(analysis: WorkflowAnalysis) -> AgentOrgChart:
     This is a pure, deterministic transformation that:
     - Creates one AgentCard per WorkflowStep (step-centric design).
     - Wires AgentConnection edges based on step dependencies.
+
+    Every field is derived from an already-validated WorkflowAnalysis, so
+    the org chart models are built with ``model_construct`` to skip
+    re-validation.
     """
     agents: List[AgentCard] = []
     connections: List[AgentConnection] = []
 
     # Map from step id to agent id for building connections.
     step_to_agent: dict[str, str] = {}
+    # (step id, dependencies) pairs; resolved once every step has an agent,
+    # since a dependency may refer to a step that appears later.
+    pending_connections: List[Tuple[str, List[str]]] = []
+
+    # Local bindings for the hot loops below.
+    agents_append = agents.append
+    connections_append = connections.append
+    pending_append = pending_connections.append
+    make_card = AgentCard.model_construct
+    make_connection = AgentConnection.model_construct
 
     for step in analysis.steps:
         agent_id = f"agent_{step.id}"
         step_to_agent[step.id] = agent_id
+        if step.dependencies:
+            pending_append((step.id, step.dependencies))
+
+        md = step.metadata or _EMPTY_METADATA
 
         mode = _infer_mode(step)
-        safety = _infer_safety(step)
+        safety = _infer_safety(step, md)
         tool_ids = _collect_tool_ids(step)
 
+        # Allow explicit override via metadata.
         capabilities: List[str] = []
-        if step.metadata.get("capabilities"):
-            # Allow explicit override via metadata.
-            explicit_caps = step.metadata["capabilities"]
-            if isinstance(explicit_caps, list):
-                capabilities.extend([str(c) for c in explicit_caps])
+        explicit_caps = md.get("capabilities")
+        if isinstance(explicit_caps, list):
+            capabilities = [str(c) for c in explicit_caps]
 
         data_domains: List[str] = []
-        if step.metadata.get("data_domains"):
-            explicit_domains = step.metadata["data_domains"]
-            if isinstance(explicit_domains, list):
-                data_domains.extend([str(d) for d in explicit_domains])
+        explicit_domains = md.get("data_domains")
+        if isinstance(explicit_domains, list):
+            data_domains = [str(d) for d in explicit_domains]
 
-        agent = AgentCard(
+        agent = make_card(
             id=agent_id,
             name=f"Agent for {step.id}",
             description=step.description,
@@ -104,8 +128,10 @@ def synthesize_agent_org_chart(analysis: WorkflowAnalysis) -> AgentOrgChart:
             data_domains=data_domains,
             step_ids=[step.id],
             tool_ids=tool_ids,
-            input_schema={"inputs": step.inputs},
-            output_schema={"outputs": step.outputs},
+            # model_construct stores values as given, so each card gets its own
+            # schema dicts rather than aliasing the step's lists.
+            input_schema={"inputs": list(step.inputs)},
+            output_schema={"outputs": list(step.outputs)},
             safety_constraints=safety,
             metadata={
                 "agent_type": step.agent_type,
@@ -115,30 +141,29 @@ def synthesize_agent_org_chart(analysis: WorkflowAnalysis) -> AgentOrgChart:
                 "implementation_notes": step.implementation_notes,
             },
         )
-        agents.append(agent)
+        agents_append(agent)
 
     # Build connections based on step dependencies.
-    for step in analysis.steps:
-        to_agent_id = step_to_agent.get(step.id)
-        if not to_agent_id:
-            continue
+    step_to_agent_get = step_to_agent.get
+    for step_id, dependencies in pending_connections:
+        to_agent_id = step_to_agent[step_id]
 
-        for dep_id in step.dependencies:
-            from_agent_id = step_to_agent.get(dep_id)
+        for dep_id in dependencies:
+            from_agent_id = step_to_agent_get(dep_id)
             if not from_agent_id:
                 continue
 
-            connections.append(
-                AgentConnection(
+            connections_append(
+                make_connection(
                     from_agent_id=from_agent_id,
                     to_agent_id=to_agent_id,
-                    description=f"Output of {dep_id} feeds into {step.id}",
+                    description=f"Output of {dep_id} feeds into {step_id}",
                     payload_schema={"type": "workflow_step_output"},
                     channel="request_response",
                 )
             )
 
-    org_chart = AgentOrgChart(
+    org_chart = AgentOrgChart.model_construct(
         workflow_id=analysis.workflow_id,
         agents=agents,
         connections=connections,
@@ -153,35 +178,34 @@ def synthesize_agent_org_chart(analysis: WorkflowAnalysis) -> AgentOrgChart:
 
 def build_agent_registry(org_chart: AgentOrgChart) -> AgentRegistry:
     """Create an AgentRegistry from an AgentOrgChart."""
-    registry = AgentRegistry()
-    for card in org_chart.agents:
-        registry.agents[card.id] = card
-    return registry
+    return AgentRegistry(agents={card.id: card for card in org_chart.agents})
+
+
+def _make_tool_entry(tool_id: str) -> ToolRegistryEntry:
+    """Build a registry entry for a tool ID, deriving name/description from its prefix."""
+    if tool_id.startswith("api::"):
+        name = tool_id[len("api::") :]
+        description = f"API integration for {name}"
+    elif tool_id.startswith("tool::"):
+        name = tool_id[len("tool::") :]
+        description = f"Tool for {name}"
+    else:
+        name = tool_id
+        description = "Tool referenced by agent card"
+
+    return ToolRegistryEntry.model_construct(
+        tool_id=tool_id,
+        name=name,
+        description=description,
+    )
 
 
 def build_tool_registry(org_chart: AgentOrgChart) -> ToolRegistry:
     """Create a ToolRegistry from an AgentOrgChart's tool references."""
-    registry = ToolRegistry()
-
-    for card in org_chart.agents:
-        for tool_id in card.tool_ids:
-            if tool_id in registry.tools:
-                continue
-
-            if tool_id.startswith("api::"):
-                name = tool_id[len("api::") :]
-                description = f"API integration for {name}"
-            elif tool_id.startswith("tool::"):
-                name = tool_id[len("tool::") :]
-                description = f"Tool for {name}"
-            else:
-                name = tool_id
-                description = "Tool referenced by agent card"
-
-            registry.tools[tool_id] = ToolRegistryEntry(
-                tool_id=tool_id,
-                name=name,
-                description=description,
-            )
-
-    return registry
+    # dict.fromkeys dedupes while keeping first-seen order.
+    unique_tool_ids = dict.fromkeys(
+        tool_id for card in org_chart.agents for tool_id in card.tool_ids
+    )
+    return ToolRegistry(
+        tools={tool_id: _make_tool_entry(tool_id) for tool_id in unique_tool_ids}
+    )
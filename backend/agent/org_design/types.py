@@ -2,7 +2,7 @@
 
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SafetyConstraints(BaseModel):
@@ -15,6 +15,8 @@ class SafetyConstraints(BaseModel):
     notes: Optional[str] = None
     extra: Dict[str, Any] = Field(default_factory=dict)
 
+    model_config = ConfigDict(frozen=True)
+
 
 class AgentCard(BaseModel):
     """Logical definition of an agent for a user's workflow."""
@@ -56,6 +58,10 @@ class AgentCard(BaseModel):
     )
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    # Synthesized once and only read afterwards. Freezing blocks field
+    # reassignment only; the dict and list values stay mutable.
+    model_config = ConfigDict(frozen=True)
+
 
 class AgentConnection(BaseModel):
     """Directed connection between two agents in the org chart."""
@@ -72,6 +78,8 @@ class AgentConnection(BaseModel):
         description="Optional channel/type (e.g., request/response, event, notification).",
     )
 
+    model_config = ConfigDict(frozen=True)
+
 
 class AgentOrgChart(BaseModel):
     """High-level org chart describing agents for a specific workflow."""
@@ -85,6 +93,8 @@ class AgentOrgChart(BaseModel):
     )
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    model_config = ConfigDict(frozen=True)
+
 
 class ToolRegistryEntry(BaseModel):
     """Single tool definition in the tool registry."""
@@ -96,6 +106,8 @@ class ToolRegistryEntry(BaseModel):
     output_schema: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    model_config = ConfigDict(frozen=True)
+
 
 class ToolRegistry(BaseModel):
     """Registry of tools referenced by AgentCards."""
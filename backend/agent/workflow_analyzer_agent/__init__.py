@@ -8,6 +8,7 @@ from .config import (
     MIN_WORKFLOW_LENGTH,
     AGENT_TYPES,
     RISK_LEVELS,
+    RISK_LEVELS_ORDERED,
     AUTOMATION_FEASIBLE_THRESHOLD,
 )
 from .session import SessionState, SessionManager
@@ -32,6 +33,7 @@ __all__ = [
     "MIN_WORKFLOW_LENGTH",
     "AGENT_TYPES",
     "RISK_LEVELS",
+    "RISK_LEVELS_ORDERED",
     "AUTOMATION_FEASIBLE_THRESHOLD",
     # Session
     "SessionState",
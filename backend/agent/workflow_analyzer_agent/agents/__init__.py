@@ -3,5 +3,7 @@ from .agent1_parser import WorkflowParserAgent
 from .agent2_risk_assessor import RiskAssessorAgent
 from .agent3_automation_analyzer import AutomationAnalyzerAgent
 from .agent4_automation_summarizer import AutomationSummarizerAgent
+from .batch_risk_assessor import BatchRiskAssessor
+from .fused_analyzer import FusedAnalyzerAgent
 
-__all__ = ["WorkflowParserAgent", "RiskAssessorAgent", "AutomationAnalyzerAgent", "AutomationSummarizerAgent"]
+__all__ = ["WorkflowParserAgent", "RiskAssessorAgent", "AutomationAnalyzerAgent", "AutomationSummarizerAgent", "FusedAnalyzerAgent", "BatchRiskAssessor"]
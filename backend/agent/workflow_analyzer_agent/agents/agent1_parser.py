@@ -1,12 +1,28 @@
 """Agent 1: Workflow Parser - Parses workflow text into structured steps."""
-import json
+import logging
 import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import orjson
+from google.genai import types as genai_types
+
+from .context_cache import SystemPromptCache
+from .error_handling import llm_call_errors, warn_on_prompt_bloat
+from .response_schemas import ParsedStepsResponse, load_response
+from .retry import generate_with_retry
+from ..config import TEMPERATURE
 from ..prompts import AGENT1_SYSTEM_PROMPT
 
 
+# Static user prompt scaffolding; only the placeholders change per call.
+_USER_PROMPT_TEMPLATE = """Please parse the following workflow description into structured steps:
+
+{workflow_text}
+
+Remember to respond with ONLY valid JSON, no markdown or explanations."""
+
+
 class WorkflowParserAgent:
     """
     Parses workflow text into structured, actionable steps.
@@ -34,8 +50,17 @@ class WorkflowParserAgent:
         self.logger = logger
         self.tracer = tracer
         self.model = "gemini-2.0-flash-exp"
+        # Built once and reused; the system prompt goes in system_instruction
+        # rather than being resent as a user part on every call.
+        self._gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=ParsedStepsResponse,
+            temperature=TEMPERATURE,
+            system_instruction=AGENT1_SYSTEM_PROMPT,
+        )
+        self._prompt_cache = SystemPromptCache(logger, "Agent 1")
 
-    def parse(self, workflow_text: str, session) -> List[Dict[str, Any]]:
+    async def parse(self, workflow_text: str, session) -> List[Dict[str, Any]]:
         """
         Parse workflow text into structured steps.
 
@@ -61,52 +86,41 @@ class WorkflowParserAgent:
         )
 
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        try:
+        with llm_call_errors(
+            self.logger, session, "Agent 1", "agent_1", start_time,
+            unexpected_message="Unexpected error during parsing",
+        ):
             # Create user prompt
-            user_prompt = f"""Please parse the following workflow description into structured steps:
-
-{workflow_text}
-
-Remember to respond with ONLY valid JSON, no markdown or explanations."""
-
-            # Call Gemini API client with JSON response type
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[
-                    {
-                        "role": "user",
-                        "parts": [
-                            {"text": AGENT1_SYSTEM_PROMPT},
-                            {"text": user_prompt},
-                        ],
-                    }
-                ],
-                config={
-                    "response_mime_type": "application/json",
-                },
+            user_prompt = _USER_PROMPT_TEMPLATE.format(workflow_text=workflow_text)
+
+            gen_config = await self._prompt_cache.apply(self.client, self.model, self._gen_config)
+
+            # Call Gemini API client with JSON response type, retrying transient errors
+            response = await generate_with_retry(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=user_prompt,
+                    config=gen_config,
+                ),
+                self.logger,
+                "Agent 1: Retrying workflow parsing call after transient error",
             )
 
-            # Extract and parse response
-            response_text = response.text.strip()
-
-            # Handle potential markdown code blocks
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-
-            parsed_response = json.loads(response_text)
+            warn_on_prompt_bloat(self.logger, session, "Agent 1", response)
+            # Use the SDK-parsed structured output, falling back to the raw text
+            parsed_response = load_response(response)
             steps = parsed_response.get("steps", [])
 
             # Calculate latency
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
 
             # Store results in session
             session.parsed_steps = {"steps": steps}
+            # Serialized once here; Agents 2-4 embed it in their prompts.
+            session.parsed_steps_json = orjson.dumps(steps).decode()
             session.agent1_latency = latency_ms
 
             # Log success
@@ -117,40 +131,22 @@ Remember to respond with ONLY valid JSON, no markdown or explanations."""
                 latency_ms=latency_ms
             )
 
-            # Log detailed step information at DEBUG level
-            for step in steps:
+            # Log detailed step information at DEBUG level (one record)
+            if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug(
-                    "Agent 1: Parsed step",
+                    "Agent 1: Parsed steps",
                     trace_id=session.trace_id,
-                    step_id=step.get("step_id"),
-                    description=step.get("description"),
-                    dependencies=step.get("dependencies", [])
+                    steps=[
+                        {
+                            "step_id": step.get("step_id"),
+                            "description": step.get("description"),
+                            "dependencies": step.get("dependencies", []),
+                        }
+                        for step in steps
+                    ]
                 )
 
             return steps
 
-        except json.JSONDecodeError as e:
-            # Log error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 1: JSON parsing error",
-                trace_id=session.trace_id,
-                error_type="JSONDecodeError",
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error("JSONDecodeError", str(e), agent="agent_1")
-            return []
-
-        except Exception as e:
-            # Log unexpected error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 1: Unexpected error during parsing",
-                trace_id=session.trace_id,
-                error_type=type(e).__name__,
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error(type(e).__name__, str(e), agent="agent_1")
-            return []
+        # Only reached when llm_call_errors suppressed an error
+        return []
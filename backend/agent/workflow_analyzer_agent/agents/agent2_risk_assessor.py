@@ -1,18 +1,49 @@
 """Agent 2: Risk Assessor - Evaluates risk and compliance for each workflow step."""
-import json
+import asyncio
+import logging
 import time
-from typing import List, Dict, Any, Optional, Callable
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import AsyncContextManager, List, Dict, Any, Optional, Callable, Tuple
+
+import orjson
+from google.genai import types as genai_types
+
+from .context_cache import SystemPromptCache
+from .error_handling import llm_call_errors, warn_on_prompt_bloat
+from .function_calling import tool_calling_config
+from .response_schemas import RiskAssessmentsResponse, load_response
+from .retry import generate_with_retry
+from .streaming import discard_tasks, stream_generate
+from ..config import (
+    COMPLIANCE_CACHE_SIZE,
+    MAX_CONCURRENT_LLM_CALLS,
+    ROW_MARSHAL_MIN_STEPS,
+    ROW_MARSHAL_SIZE,
+    STREAM_LLM_RESPONSES,
+    TEMPERATURE,
+    USE_MODEL_TOOL_CALLS,
+)
+from ..prompts import AGENT2_SYSTEM_PROMPT
 
-try:
-    from urllib3.exceptions import ReadError, ProtocolError
-except Exception:  # pragma: no cover - fallback for older urllib3 versions
-    class ReadError(Exception):
-        """Fallback ReadError when urllib3 version lacks this class."""
 
-    class ProtocolError(Exception):
-        """Fallback ProtocolError when urllib3 version lacks this class."""
+# Static user prompt scaffolding; only the placeholders change per call.
+_USER_PROMPT_TEMPLATE = """Please assess the risk level for each step in this workflow.
 
-from ..prompts import AGENT2_SYSTEM_PROMPT
+Original Workflow:
+{workflow_text}
+
+Parsed Steps (from Agent 1):
+{parsed_steps_str}
+
+For each step:
+1. Determine the risk level (LOW, MEDIUM, HIGH, CRITICAL)
+2. Identify if human oversight is required
+3. Use the get_compliance_rules tool to find applicable regulations
+4. Provide a confidence score (0.0-1.0)
+5. Suggest mitigation strategies
+
+Respond with ONLY valid JSON, no markdown or explanations."""
 
 
 class RiskAssessorAgent:
@@ -28,9 +59,17 @@ class RiskAssessorAgent:
         tracer: DistributedTracer instance for distributed tracing
         tools: Dictionary containing available tools (get_compliance_rules)
         model: Model to use (default: gemini-2.0-flash-exp)
+        llm_slot: Shared Gemini call limiter, held around each call
     """
 
-    def __init__(self, client, logger, tracer, tools: Dict[str, Callable]):
+    def __init__(
+        self,
+        client,
+        logger,
+        tracer,
+        tools: Dict[str, Callable],
+        llm_slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ):
         """
         Initialize the Risk Assessor Agent.
 
@@ -39,14 +78,35 @@ class RiskAssessorAgent:
             logger: StructuredLogger instance
             tracer: DistributedTracer instance
             tools: Dictionary with tool functions (e.g., get_compliance_rules)
+            llm_slot: Factory of an async context manager holding one of the
+                caller's shared Gemini call slots (e.g. the orchestrator's
+                ``_llm_slot``). Each Gemini call, including each chunk of a
+                large workflow, acquires its own slot. Without one, only the
+                chunk calls of a single workflow are bounded, by
+                MAX_CONCURRENT_LLM_CALLS.
         """
         self.client = client
         self.logger = logger
         self.tracer = tracer
         self.tools = tools
+        self.llm_slot = llm_slot
         self.model = "gemini-2.0-flash-exp"
-
-    def assess_risk(self, session, workflow_text: str) -> List[Dict[str, Any]]:
+        # Built once and reused; the system prompt goes in system_instruction
+        # rather than being resent as a user part on every call.
+        self._gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=RiskAssessmentsResponse,
+            temperature=TEMPERATURE,
+            system_instruction=AGENT2_SYSTEM_PROMPT,
+        )
+        self._prompt_cache = SystemPromptCache(logger, "Agent 2")
+        # get_compliance_rules is a pure lookup on (risk_level, domain), so
+        # results are reused (LRU) across steps and workflows.
+        self._compliance_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._compliance_hits = 0
+        self._compliance_misses = 0
+
+    async def assess_risk(self, session, workflow_text: str) -> List[Dict[str, Any]]:
         """
         Assess risk for each step in the workflow.
 
@@ -72,9 +132,12 @@ class RiskAssessorAgent:
         )
 
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        try:
+        with llm_call_errors(
+            self.logger, session, "Agent 2", "agent_2", start_time,
+            unexpected_message="Unexpected error during risk assessment",
+        ):
             # Validate that Agent 1 has run
             parsed_steps = session.parsed_steps.get("steps", [])
             if not parsed_steps:
@@ -84,57 +147,32 @@ class RiskAssessorAgent:
                 )
                 return []
 
-            # Create user prompt with context from Agent 1
-            parsed_steps_str = json.dumps(parsed_steps, indent=2)
-            user_prompt = f"""Please assess the risk level for each step in this workflow.
-
-Original Workflow:
-{workflow_text}
-
-Parsed Steps (from Agent 1):
-{parsed_steps_str}
-
-For each step:
-1. Determine the risk level (LOW, MEDIUM, HIGH, CRITICAL)
-2. Identify if human oversight is required
-3. Use the get_compliance_rules tool to find applicable regulations
-4. Provide a confidence score (0.0-1.0)
-5. Suggest mitigation strategies
-
-Respond with ONLY valid JSON, no markdown or explanations."""
-
-            response = self._generate_with_retry(
-                contents=[
-                    {
-                        "role": "user",
-                        "parts": [
-                            {"text": AGENT2_SYSTEM_PROMPT},
-                            {"text": user_prompt},
-                        ],
-                    }
-                ]
-            )
-
-            # Extract and parse response
-            response_text = response.text.strip()
-
-            # Handle potential markdown code blocks
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-
-            parsed_response = json.loads(response_text)
-            risk_assessments = parsed_response.get("risk_assessments", [])
+            # Compliance lookups started while the response is still streaming
+            prefetched: Dict[Tuple[str, str], asyncio.Future] = {}
+            # Lookups the model made itself through function calling, by risk level
+            model_lookups: Optional[Dict[str, Dict[str, Any]]] = None
+            try:
+                config = None
+                if USE_MODEL_TOOL_CALLS and "get_compliance_rules" in self.tools:
+                    model_lookups = {}
+                    config = self._tool_calling_config(session, model_lookups)
+                risk_assessments = await self._generate_assessments(
+                    session,
+                    workflow_text,
+                    parsed_steps,
+                    on_item=lambda item: self._prefetch_compliance(item, session, prefetched),
+                    config=config,
+                )
 
-            # Process tool calls if needed
-            risk_assessments = self._process_risk_assessments(
-                risk_assessments, session
-            )
+                # Process tool calls if needed
+                risk_assessments = await self._process_risk_assessments(
+                    risk_assessments, session, prefetched, model_lookups
+                )
+            finally:
+                discard_tasks(prefetched.values())
 
             # Calculate latency
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
 
             # Store results in session
@@ -149,151 +187,341 @@ Respond with ONLY valid JSON, no markdown or explanations."""
                 latency_ms=latency_ms
             )
 
-            # Log detailed assessment information at DEBUG level
-            for assessment in risk_assessments:
+            # Log detailed assessment information at DEBUG level (one record)
+            if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug(
-                    "Agent 2: Risk assessment for step",
+                    "Agent 2: Risk assessments per step",
                     trace_id=session.trace_id,
-                    step_id=assessment.get("step_id"),
-                    risk_level=assessment.get("risk_level"),
-                    requires_hitl=assessment.get("requires_human_in_loop"),
-                    confidence=assessment.get("confidence_score")
+                    assessments=[
+                        {
+                            "step_id": assessment.get("step_id"),
+                            "risk_level": assessment.get("risk_level"),
+                            "requires_hitl": assessment.get("requires_human_in_loop"),
+                            "confidence": assessment.get("confidence_score"),
+                        }
+                        for assessment in risk_assessments
+                    ]
                 )
 
             return risk_assessments
 
-        except json.JSONDecodeError as e:
-            # Log error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 2: JSON parsing error",
-                trace_id=session.trace_id,
-                error_type="JSONDecodeError",
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error("JSONDecodeError", str(e), agent="agent_2")
-            return []
-
-        except Exception as e:
-            # Log unexpected error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 2: Unexpected error during risk assessment",
-                trace_id=session.trace_id,
-                error_type=type(e).__name__,
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error(type(e).__name__, str(e), agent="agent_2")
-            return []
+        # Only reached when llm_call_errors suppressed an error
+        return []
+
+    def _build_user_prompt(
+        self,
+        session,
+        workflow_text: str,
+        steps: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """Build the user prompt from the workflow text and Agent 1's parsed steps (or a subset)."""
+        if steps is not None:
+            parsed_steps_str = orjson.dumps(steps).decode()
+        else:
+            parsed_steps_str = session.parsed_steps_json or orjson.dumps(
+                session.parsed_steps.get("steps", [])
+            ).decode()
+        return _USER_PROMPT_TEMPLATE.format(
+            workflow_text=workflow_text, parsed_steps_str=parsed_steps_str
+        )
 
-    def _generate_with_retry(self, contents: List[Dict[str, Any]], max_attempts: int = 3):
+    async def _generate_assessments(
+        self,
+        session,
+        workflow_text: str,
+        parsed_steps: List[Dict[str, Any]],
+        on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        Call Gemini with basic retry/backoff to absorb transient network resets.
+        Generate the raw risk assessments for a workflow's steps.
+
+        Workflows with more than ROW_MARSHAL_MIN_STEPS steps are split into
+        chunks of ROW_MARSHAL_SIZE steps, each assessed by its own call; the
+        calls run concurrently, each holding an ``llm_slot`` so they count
+        against the caller's shared limit, and their results are merged by
+        step_id in step order.
+
+        Args:
+            session: SessionState with parsed_steps from Agent 1
+            workflow_text: Original workflow text (for context)
+            parsed_steps: Agent 1's parsed steps
+            on_item: Streaming callback, see ``_generate_with_retry``
+            config: Optional config override, see ``_generate_with_retry``
+
+        Returns:
+            Risk assessment dictionaries, before tool processing
         """
-        backoff_seconds = 2
+        llm_slot = self.llm_slot or nullcontext
+        if len(parsed_steps) <= ROW_MARSHAL_MIN_STEPS:
+            async with llm_slot():
+                response = await self._generate_with_retry(
+                    contents=self._build_user_prompt(session, workflow_text),
+                    on_item=on_item,
+                    config=config,
+                )
+            warn_on_prompt_bloat(self.logger, session, "Agent 2", response)
+            # Use the SDK-parsed structured output, falling back to the raw text
+            return load_response(response).get("risk_assessments", [])
 
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return self.client.models.generate_content(
-                    model=self.model,
-                    contents=contents,
-                    config={"response_mime_type": "application/json"},
+        chunks = [
+            parsed_steps[i:i + ROW_MARSHAL_SIZE]
+            for i in range(0, len(parsed_steps), ROW_MARSHAL_SIZE)
+        ]
+        self.logger.info(
+            "Agent 2: Assessing large workflow in chunks",
+            trace_id=session.trace_id,
+            steps_count=len(parsed_steps),
+            chunks_count=len(chunks)
+        )
+
+        if self.llm_slot is None:
+            # No shared limiter: bound this workflow's chunk calls on their own
+            limiter = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+            def llm_slot():
+                return limiter
+
+        async def assess_chunk(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            async with llm_slot():
+                response = await self._generate_with_retry(
+                    contents=self._build_user_prompt(session, workflow_text, steps),
+                    on_item=on_item,
+                    config=config,
                 )
-            except Exception as exc:
-                if not self._is_retryable_error(exc) or attempt == max_attempts:
-                    raise
+            warn_on_prompt_bloat(self.logger, session, "Agent 2", response)
+            return load_response(response).get("risk_assessments", [])
 
-                wait_time = backoff_seconds * attempt
-                self.logger.warning(
-                    "Agent 2: Retrying risk assessment call after transient error",
-                    attempt=attempt,
-                    wait_seconds=wait_time,
-                    error_type=type(exc).__name__,
-                    error_message=str(exc),
+        chunk_results = await asyncio.gather(*(assess_chunk(chunk) for chunk in chunks))
+
+        # Merge by step_id, keeping the first assessment of each step.
+        merged: Dict[Any, Dict[str, Any]] = {}
+        for assessments in chunk_results:
+            for assessment in assessments:
+                merged.setdefault(assessment.get("step_id"), assessment)
+        return list(merged.values())
+
+    async def _generate_with_retry(
+        self,
+        contents: str,
+        on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+    ):
+        """
+        Call Gemini, retrying transient failures with exponential backoff.
+
+        When STREAM_LLM_RESPONSES is enabled the response is streamed and
+        ``on_item`` is called with each risk assessment as soon as it completes.
+        Passing a ``config`` (the function-calling one) disables streaming.
+        """
+        # The function-calling config keeps its inline system prompt: cached
+        # content can't be combined with tool declarations.
+        gen_config = config or await self._prompt_cache.apply(
+            self.client, self.model, self._gen_config
+        )
+
+        async def call():
+            if STREAM_LLM_RESPONSES and config is None:
+                return await stream_generate(
+                    self.client,
+                    self.model,
+                    contents,
+                    gen_config,
+                    item_key="risk_assessments",
+                    on_item=on_item,
                 )
-                time.sleep(wait_time)
-
-        raise RuntimeError("Risk assessment retries exhausted")
-
-    def _is_retryable_error(self, exc: Exception) -> bool:
-        """Check whether an exception should trigger a retry."""
-        retryable_types = (ReadError, ProtocolError, ConnectionError, TimeoutError)
-        if isinstance(exc, retryable_types):
-            return True
-
-        message = str(exc)
-        retryable_signatures = [
-            "Connection reset by peer",
-            "RST_STREAM",
-            "503",
-            "temporarily unavailable",
-        ]
-        return any(signature in message for signature in retryable_signatures)
+            return await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=gen_config,
+            )
+
+        return await generate_with_retry(
+            call,
+            self.logger,
+            "Agent 2: Retrying risk assessment call after transient error",
+        )
+
+    def _tool_calling_config(
+        self,
+        session,
+        model_lookups: Dict[str, Dict[str, Any]],
+    ) -> genai_types.GenerateContentConfig:
+        """Config declaring get_compliance_rules to the model; its calls are recorded in model_lookups."""
+        tool = self.tools["get_compliance_rules"]
+        cache = self._compliance_cache
+
+        def get_compliance_rules(risk_level: str) -> Dict[str, Any]:
+            """
+            Return applicable compliance rules for a workflow step's risk level.
+
+            Args:
+                risk_level: Risk level of the step (LOW, MEDIUM, HIGH, CRITICAL)
+            """
+            result = cache.get((risk_level, "general"))
+            if result is None:
+                result = tool(risk_level=risk_level, domain="general", trace_id=session.trace_id)
+                self._compliance_misses += 1
+            else:
+                self._compliance_hits += 1
+            model_lookups[risk_level] = result
+            return result
+
+        return tool_calling_config(self._gen_config, [get_compliance_rules])
+
+    def _prefetch_compliance(
+        self,
+        assessment: Dict[str, Any],
+        session,
+        prefetched: Dict[Tuple[str, str], asyncio.Future],
+    ) -> None:
+        """Start the compliance lookup for a streamed assessment if not cached or in flight."""
+        tool = self.tools.get("get_compliance_rules")
+        risk_level = assessment.get("risk_level")
+        if tool is None or not isinstance(risk_level, str):
+            return
+
+        key = (risk_level, "general")
+        if key in self._compliance_cache or key in prefetched:
+            return
+
+        prefetched[key] = asyncio.ensure_future(
+            asyncio.to_thread(
+                tool,
+                risk_level=risk_level,
+                domain="general",
+                trace_id=session.trace_id,
+            )
+        )
 
-    def _process_risk_assessments(
+    async def _process_risk_assessments(
         self,
         assessments: List[Dict[str, Any]],
-        session
+        session,
+        prefetched: Optional[Dict[Tuple[str, str], asyncio.Future]] = None,
+        model_lookups: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Process risk assessments and call tools if needed.
 
+        Each distinct (risk_level, domain) pair is looked up at most once and
+        cached; cache misses are dispatched concurrently on worker threads, and
+        a failure in one lookup does not affect the others.
+
         Args:
             assessments: List of risk assessment dictionaries
             session: SessionState for logging
+            prefetched: Lookups already started while streaming, by cache key
+            model_lookups: Lookups the model already made through function
+                calling, by risk level. When given, no further lookups are
+                dispatched; other steps are only enriched from the cache.
 
         Returns:
-            Processed assessments with tool results incorporated
+            The same list, with tool results incorporated in place
         """
-        processed = []
+        tool = self.tools.get("get_compliance_rules")
+        if not assessments or tool is None:
+            return assessments
+
+        domain = "general"
+        cache = self._compliance_cache
+
+        # Only steps with a risk level need a compliance lookup.
+        pending = [a for a in assessments if a.get("risk_level")]
+        missing = [] if model_lookups is not None else list(dict.fromkeys(
+            a["risk_level"] for a in pending if (a["risk_level"], domain) not in cache
+        ))
+        prefetched = prefetched or {}
+        results = await asyncio.gather(
+            *(
+                prefetched.get((risk_level, domain))
+                or asyncio.to_thread(
+                    tool,
+                    risk_level=risk_level,
+                    domain=domain,
+                    trace_id=session.trace_id,
+                )
+                for risk_level in missing
+            ),
+            return_exceptions=True,
+        )
+
+        fetched: Dict[str, Any] = dict(zip(missing, results))
+        if model_lookups:
+            fetched.update(model_lookups)
 
-        for assessment in assessments:
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
+        cache_hits = 0
+        for assessment in pending:
             step_id = assessment.get("step_id")
-            risk_level = assessment.get("risk_level")
-
-            # Call compliance rules tool if needed
-            if risk_level and "get_compliance_rules" in self.tools:
-                try:
-                    # Get compliance rules
-                    compliance_result = self.tools["get_compliance_rules"](
-                        risk_level=risk_level,
-                        domain="general",
-                        trace_id=session.trace_id
-                    )
-
-                    self.logger.debug(
-                        "Agent 2: Called get_compliance_rules tool",
-                        trace_id=session.trace_id,
-                        step_id=step_id,
-                        risk_level=risk_level,
-                        tool_result_status=compliance_result.get("lookup_status")
-                    )
-
-                    # Log tool call in session
-                    session.add_tool_call(
-                        "get_compliance_rules",
-                        duration_ms=0,  # Already timed in tool
-                        step_id=step_id,
-                        risk_level=risk_level
-                    )
-
-                    # Incorporate compliance rules into assessment
-                    assessment["applicable_regulations"] = compliance_result.get(
-                        "applicable_rules",
-                        []
-                    )
-
-                except Exception as e:
-                    self.logger.debug(
-                        "Agent 2: Tool call failed",
-                        trace_id=session.trace_id,
-                        step_id=step_id,
-                        tool="get_compliance_rules",
-                        error=str(e)
-                    )
-
-            processed.append(assessment)
-
-        return processed
+            risk_level = assessment["risk_level"]
+            compliance_result = fetched.get(risk_level)
+            if compliance_result is None:
+                compliance_result = cache.get((risk_level, domain))
+                if compliance_result is None:
+                    continue
+                cache.move_to_end((risk_level, domain))
+                cache_hits += 1
+
+            if isinstance(compliance_result, Exception):
+                self.logger.debug(
+                    "Agent 2: Tool call failed",
+                    trace_id=session.trace_id,
+                    step_id=step_id,
+                    tool="get_compliance_rules",
+                    error=str(compliance_result)
+                )
+                continue
+
+            if debug_enabled:
+                self.logger.debug(
+                    "Agent 2: Called get_compliance_rules tool",
+                    trace_id=session.trace_id,
+                    step_id=step_id,
+                    risk_level=risk_level,
+                    tool_result_status=compliance_result.get("lookup_status")
+                )
+
+            # Log tool call in session
+            session.add_tool_call(
+                "get_compliance_rules",
+                duration_ms=0,  # Already timed in tool
+                step_id=step_id,
+                risk_level=risk_level
+            )
+
+            # Incorporate compliance rules into assessment
+            # Copy so steps sharing a cached result don't share the list.
+            assessment["applicable_regulations"] = list(compliance_result.get(
+                "applicable_rules",
+                []
+            ))
+
+        # Lookups the model made are counted as they are served
+        self._compliance_hits += cache_hits
+        self._compliance_misses += len(missing)
+
+        # Cache successful lookups, evicting the least recently used past the cap.
+        for risk_level, result in fetched.items():
+            if not isinstance(result, Exception):
+                cache[(risk_level, domain)] = result
+                cache.move_to_end((risk_level, domain))
+        while len(cache) > COMPLIANCE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+        return assessments
+
+    def tool_cache_info(self) -> Dict[str, Any]:
+        """
+        Statistics of the get_compliance_rules result cache.
+
+        Returns:
+            Dictionary with hits, misses (lookups dispatched), size and maxsize
+        """
+        return {
+            "hits": self._compliance_hits,
+            "misses": self._compliance_misses,
+            "size": len(self._compliance_cache),
+            "maxsize": COMPLIANCE_CACHE_SIZE,
+        }
@@ -1,11 +1,52 @@
 """Agent 3: Automation Analyzer - Determines automation potential for workflow steps."""
-import json
+import asyncio
+import logging
 import time
-from typing import List, Dict, Any, Callable
-
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import AsyncContextManager, List, Dict, Any, Callable, Optional
+
+import orjson
+from google.genai import types as genai_types
+
+from .context_cache import SystemPromptCache
+from .error_handling import llm_call_errors, warn_on_prompt_bloat
+from .function_calling import tool_calling_config
+from .response_schemas import AutomationAnalysesResponse, load_response
+from .retry import generate_with_retry
+from .streaming import discard_tasks, stream_generate
+from ..config import (
+    API_LOOKUP_CACHE_SIZE,
+    STREAM_LLM_RESPONSES,
+    TEMPERATURE,
+    USE_MODEL_TOOL_CALLS,
+)
 from ..prompts import AGENT3_SYSTEM_PROMPT
 
 
+# Static user prompt scaffolding; only the placeholders change per call.
+_USER_PROMPT_TEMPLATE = """Please analyze the automation potential for each step in this workflow.
+
+Original Workflow:
+{workflow_text}
+
+Parsed Steps (from Agent 1):
+{parsed_steps_str}
+
+Risk Assessments (from Agent 2):
+{risk_assessments_str}
+
+For each step:
+1. Determine the best agent type (adk_base, agentic_rag, TOOL, or HUMAN)
+2. Use the lookup_api_docs tool to check if APIs exist for automation
+3. Score the determinism (0.0=random, 1.0=perfectly consistent)
+4. Score the automation feasibility (0.0=impossible, 1.0=fully automatable)
+5. Assess complexity (LOW, MEDIUM, HIGH)
+6. Provide implementation notes and risks
+
+Respond with ONLY valid JSON, no markdown or explanations."""
+
+
 class AutomationAnalyzerAgent:
     """
     Analyzes automation potential for workflow steps.
@@ -19,9 +60,17 @@ class AutomationAnalyzerAgent:
         tracer: DistributedTracer instance for distributed tracing
         tools: Dictionary containing available tools (lookup_api_docs)
         model: Model to use (default: gemini-2.0-flash-exp)
+        llm_slot: Shared Gemini call limiter, held around each call
     """
 
-    def __init__(self, client, logger, tracer, tools: Dict[str, Callable]):
+    def __init__(
+        self,
+        client,
+        logger,
+        tracer,
+        tools: Dict[str, Callable],
+        llm_slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ):
         """
         Initialize the Automation Analyzer Agent.
 
@@ -30,14 +79,38 @@ class AutomationAnalyzerAgent:
             logger: StructuredLogger instance
             tracer: DistributedTracer instance
             tools: Dictionary with tool functions (e.g., lookup_api_docs)
+            llm_slot: Factory of an async context manager holding one of the
+                caller's shared Gemini call slots (e.g. the orchestrator's
+                ``_llm_slot``). It is held for each Gemini request only, not
+                for tool lookups or retry backoff.
         """
         self.client = client
         self.logger = logger
         self.tracer = tracer
         self.tools = tools
+        self.llm_slot = llm_slot or nullcontext
         self.model = "gemini-2.0-flash-exp"
-
-    def analyze(self, session, workflow_text: str) -> List[Dict[str, Any]]:
+        # Built once and reused; the system prompt goes in system_instruction
+        # rather than being resent as a user part on every call.
+        self._gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=AutomationAnalysesResponse,
+            temperature=TEMPERATURE,
+            system_instruction=AGENT3_SYSTEM_PROMPT,
+        )
+        self._prompt_cache = SystemPromptCache(logger, "Agent 3")
+        # lookup_api_docs matches on the normalized description only, so
+        # results are reused (LRU) for repeated step descriptions.
+        self._api_lookup_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._api_lookup_hits = 0
+        self._api_lookup_misses = 0
+
+    async def analyze(
+        self,
+        session,
+        workflow_text: str,
+        risk_assessments: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Analyze automation potential for each step.
 
@@ -48,6 +121,10 @@ class AutomationAnalyzerAgent:
         Args:
             session: SessionState with parsed_steps and risks from Agents 1 & 2
             workflow_text: Original workflow text (for context)
+            risk_assessments: Risk context to include in the prompt. Defaults to
+                whatever Agent 2 has stored on the session; pass ``[]`` when
+                running in parallel with Agent 2 so the prompt does not depend
+                on which agent finishes first.
 
         Returns:
             List of automation analysis dictionaries
@@ -64,9 +141,12 @@ class AutomationAnalyzerAgent:
         )
 
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        try:
+        with llm_call_errors(
+            self.logger, session, "Agent 3", "agent_3", start_time,
+            unexpected_message="Unexpected error during automation analysis",
+        ):
             # Validate that Agent 1 has run
             parsed_steps = session.parsed_steps.get("steps", [])
             if not parsed_steps:
@@ -77,70 +157,54 @@ class AutomationAnalyzerAgent:
                 return []
 
             # Get risk assessments if available
-            risk_assessments = session.risks.get("risk_assessments", []) if session.risks else []
+            if risk_assessments is None:
+                risk_assessments = session.risks.get("risk_assessments", []) if session.risks else []
 
             # Create user prompt with context from Agents 1 & 2
-            parsed_steps_str = json.dumps(parsed_steps, indent=2)
-            risk_assessments_str = json.dumps(risk_assessments, indent=2) if risk_assessments else "No risk assessments available yet"
-
-            user_prompt = f"""Please analyze the automation potential for each step in this workflow.
-
-Original Workflow:
-{workflow_text}
-
-Parsed Steps (from Agent 1):
-{parsed_steps_str}
-
-Risk Assessments (from Agent 2):
-{risk_assessments_str}
-
-For each step:
-1. Determine the best agent type (adk_base, agentic_rag, TOOL, or HUMAN)
-2. Use the lookup_api_docs tool to check if APIs exist for automation
-3. Score the determinism (0.0=random, 1.0=perfectly consistent)
-4. Score the automation feasibility (0.0=impossible, 1.0=fully automatable)
-5. Assess complexity (LOW, MEDIUM, HIGH)
-6. Provide implementation notes and risks
-
-Respond with ONLY valid JSON, no markdown or explanations."""
+            parsed_steps_str = session.parsed_steps_json or orjson.dumps(parsed_steps).decode()
+            risk_assessments_str = orjson.dumps(risk_assessments).decode() if risk_assessments else "No risk assessments available yet"
 
-            # Call Gemini API client with JSON response type
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[
-                    {
-                        "role": "user",
-                        "parts": [
-                            {"text": AGENT3_SYSTEM_PROMPT},
-                            {"text": user_prompt},
-                        ],
-                    }
-                ],
-                config={
-                    "response_mime_type": "application/json",
-                },
+            user_prompt = _USER_PROMPT_TEMPLATE.format(
+                workflow_text=workflow_text,
+                parsed_steps_str=parsed_steps_str,
+                risk_assessments_str=risk_assessments_str,
             )
 
-            # Extract and parse response
-            response_text = response.text.strip()
-
-            # Handle potential markdown code blocks
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            # API lookups started while the response is still streaming
+            prefetched: Dict[str, asyncio.Future] = {}
+            # Lookups the model made itself through function calling, by cache key
+            model_lookups: Optional[Dict[str, Dict[str, Any]]] = None
+            descriptions = {
+                step.get("step_id"): step.get("description", "")
+                for step in parsed_steps
+            } if STREAM_LLM_RESPONSES else {}
+            try:
+                config = None
+                if USE_MODEL_TOOL_CALLS and "lookup_api_docs" in self.tools:
+                    model_lookups = {}
+                    config = self._tool_calling_config(session, model_lookups)
+                response = await self._generate_with_retry(
+                    contents=user_prompt,
+                    on_item=lambda item: self._prefetch_api_lookup(
+                        item, descriptions, session, prefetched
+                    ),
+                    config=config,
+                )
 
-            parsed_response = json.loads(response_text)
-            automation_analyses = parsed_response.get("automation_analyses", [])
+                warn_on_prompt_bloat(self.logger, session, "Agent 3", response)
+                # Use the SDK-parsed structured output, falling back to the raw text
+                parsed_response = load_response(response)
+                automation_analyses = parsed_response.get("automation_analyses", [])
 
-            # Process tool calls if needed
-            automation_analyses = self._process_automation_analyses(
-                automation_analyses, session
-            )
+                # Process tool calls if needed
+                automation_analyses = await self._process_automation_analyses(
+                    automation_analyses, session, prefetched, model_lookups
+                )
+            finally:
+                discard_tasks(prefetched.values())
 
             # Calculate latency
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
 
             # Store results in session
@@ -155,111 +219,271 @@ Respond with ONLY valid JSON, no markdown or explanations."""
                 latency_ms=latency_ms
             )
 
-            # Log detailed analysis information at DEBUG level
-            for analysis in automation_analyses:
+            # Log detailed analysis information at DEBUG level (one record)
+            if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug(
-                    "Agent 3: Automation analysis for step",
+                    "Agent 3: Automation analyses per step",
                     trace_id=session.trace_id,
-                    step_id=analysis.get("step_id"),
-                    agent_type=analysis.get("recommended_agent_type"),
-                    determinism=analysis.get("determinism_score"),
-                    feasibility=analysis.get("automation_feasibility")
+                    analyses=[
+                        {
+                            "step_id": analysis.get("step_id"),
+                            "agent_type": analysis.get("recommended_agent_type"),
+                            "determinism": analysis.get("determinism_score"),
+                            "feasibility": analysis.get("automation_feasibility"),
+                        }
+                        for analysis in automation_analyses
+                    ]
                 )
 
             return automation_analyses
 
-        except json.JSONDecodeError as e:
-            # Log error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 3: JSON parsing error",
-                trace_id=session.trace_id,
-                error_type="JSONDecodeError",
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error("JSONDecodeError", str(e), agent="agent_3")
-            return []
-
-        except Exception as e:
-            # Log unexpected error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 3: Unexpected error during automation analysis",
+        # Only reached when llm_call_errors suppressed an error
+        return []
+
+    async def _generate_with_retry(
+        self,
+        contents: str,
+        on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+    ):
+        """
+        Call Gemini, retrying transient failures with exponential backoff.
+
+        When STREAM_LLM_RESPONSES is enabled the response is streamed and
+        ``on_item`` is called with each automation analysis as soon as it
+        completes. Passing a ``config`` (the function-calling one) disables
+        streaming.
+        """
+        # The function-calling config keeps its inline system prompt: cached
+        # content can't be combined with tool declarations.
+        gen_config = config or await self._prompt_cache.apply(
+            self.client, self.model, self._gen_config
+        )
+
+        async def call():
+            async with self.llm_slot():
+                if STREAM_LLM_RESPONSES and config is None:
+                    return await stream_generate(
+                        self.client,
+                        self.model,
+                        contents,
+                        gen_config,
+                        item_key="automation_analyses",
+                        on_item=on_item,
+                    )
+                return await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=contents,
+                    config=gen_config,
+                )
+
+        return await generate_with_retry(
+            call,
+            self.logger,
+            "Agent 3: Retrying automation analysis call after transient error",
+        )
+
+    def _tool_calling_config(
+        self,
+        session,
+        model_lookups: Dict[str, Dict[str, Any]],
+    ) -> genai_types.GenerateContentConfig:
+        """Config declaring lookup_api_docs to the model; its calls are recorded in model_lookups."""
+        tool = self.tools["lookup_api_docs"]
+        cache = self._api_lookup_cache
+
+        def lookup_api_docs(step_description: str) -> Dict[str, Any]:
+            """
+            Check if an existing API can automate a workflow step.
+
+            Args:
+                step_description: Description of the workflow step to automate
+            """
+            key = step_description.strip().lower()
+            result = cache.get(key)
+            if result is None:
+                result = tool(step_description=step_description, trace_id=session.trace_id)
+                self._api_lookup_misses += 1
+            else:
+                self._api_lookup_hits += 1
+            model_lookups[key] = result
+            return result
+
+        return tool_calling_config(self._gen_config, [lookup_api_docs])
+
+    def _prefetch_api_lookup(
+        self,
+        analysis: Dict[str, Any],
+        descriptions: Dict[str, str],
+        session,
+        prefetched: Dict[str, asyncio.Future],
+    ) -> None:
+        """Start the API lookup for a streamed analysis if not cached or in flight."""
+        tool = self.tools.get("lookup_api_docs")
+        description = analysis.get("description") or descriptions.get(analysis.get("step_id"), "")
+        if tool is None or not description:
+            return
+
+        key = description.strip().lower()
+        if key in self._api_lookup_cache or key in prefetched:
+            return
+
+        prefetched[key] = asyncio.ensure_future(
+            asyncio.to_thread(
+                tool,
+                step_description=description,
                 trace_id=session.trace_id,
-                error_type=type(e).__name__,
-                error_message=str(e),
-                latency_ms=latency_ms
             )
-            session.add_error(type(e).__name__, str(e), agent="agent_3")
-            return []
+        )
 
-    def _process_automation_analyses(
+    async def _process_automation_analyses(
         self,
         analyses: List[Dict[str, Any]],
-        session
+        session,
+        prefetched: Optional[Dict[str, asyncio.Future]] = None,
+        model_lookups: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Process automation analyses and call tools if needed.
 
+        Each distinct normalized description is looked up at most once and
+        cached; cache misses are dispatched concurrently on worker threads, and
+        a failure in one lookup does not affect the others.
+
         Args:
             analyses: List of automation analysis dictionaries
             session: SessionState for logging
+            prefetched: Lookups already started while streaming, by cache key
+            model_lookups: Lookups the model already made through function
+                calling, by cache key. When given, no further lookups are
+                dispatched; steps the model did not look up are only enriched
+                from the cache.
 
         Returns:
-            Processed analyses with tool results incorporated
+            The same list, with tool results incorporated in place
         """
-        processed = []
+        tool = self.tools.get("lookup_api_docs")
+        if not analyses or tool is None:
+            return analyses
+
+        # Step descriptions from Agent 1, indexed once for analyses that lack one.
+        step_descriptions: Optional[Dict[str, str]] = None
 
+        # Resolve each step's description up front so lookups can run together.
+        pending = []
         for analysis in analyses:
             step_id = analysis.get("step_id")
             description = analysis.get("description", "")
 
             # Get description from parsed steps if not in analysis
             if not description and "parsed_steps" in session.__dict__:
-                for step in session.parsed_steps.get("steps", []):
-                    if step.get("step_id") == step_id:
-                        description = step.get("description", "")
-                        break
-
-            # Call API lookup tool if needed
-            if description and "lookup_api_docs" in self.tools:
-                try:
-                    # Look up available APIs
-                    api_result = self.tools["lookup_api_docs"](
-                        step_description=description,
-                        trace_id=session.trace_id
-                    )
+                if step_descriptions is None:
+                    step_descriptions = {}
+                    for step in session.parsed_steps.get("steps", []):
+                        step_descriptions.setdefault(
+                            step.get("step_id"), step.get("description", "")
+                        )
+                description = step_descriptions.get(step_id, "")
+
+            if description:
+                pending.append((analysis, step_id, description))
+
+        cache = self._api_lookup_cache
+
+        # Normalized key -> original description, for keys not yet cached.
+        missing: Dict[str, str] = {}
+        keys = []
+        for _, _, description in pending:
+            key = description.strip().lower()
+            keys.append(key)
+            if model_lookups is None and key not in cache and key not in missing:
+                missing[key] = description
+
+        prefetched = prefetched or {}
+        results = await asyncio.gather(
+            *(
+                prefetched.get(key)
+                or asyncio.to_thread(
+                    tool,
+                    step_description=description,
+                    trace_id=session.trace_id,
+                )
+                for key, description in missing.items()
+            ),
+            return_exceptions=True,
+        )
 
-                    self.logger.debug(
-                        "Agent 3: Called lookup_api_docs tool",
-                        trace_id=session.trace_id,
-                        step_id=step_id,
-                        api_found=api_result.get("api_exists"),
-                        tool_result_status=api_result.get("lookup_status")
-                    )
+        fetched: Dict[str, Any] = dict(zip(missing, results))
+        if model_lookups:
+            fetched.update(model_lookups)
+
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
+        cache_hits = 0
+        for (analysis, step_id, _), key in zip(pending, keys):
+            if key in fetched:
+                api_result = fetched[key]
+            else:
+                api_result = cache.get(key)
+                if api_result is None:
+                    continue
+                cache.move_to_end(key)
+                cache_hits += 1
+            if isinstance(api_result, Exception):
+                self.logger.debug(
+                    "Agent 3: Tool call failed",
+                    trace_id=session.trace_id,
+                    step_id=step_id,
+                    tool="lookup_api_docs",
+                    error=str(api_result)
+                )
+                continue
 
-                    # Log tool call in session
-                    session.add_tool_call(
-                        "lookup_api_docs",
-                        duration_ms=0,  # Already timed in tool
-                        step_id=step_id,
-                        api_exists=api_result.get("api_exists")
-                    )
+            if debug_enabled:
+                self.logger.debug(
+                    "Agent 3: Called lookup_api_docs tool",
+                    trace_id=session.trace_id,
+                    step_id=step_id,
+                    api_found=api_result.get("api_exists"),
+                    tool_result_status=api_result.get("lookup_status")
+                )
 
-                    # Incorporate API info into analysis
-                    if api_result.get("api_exists"):
-                        analysis["available_api"] = api_result.get("api_name")
-
-                except Exception as e:
-                    self.logger.debug(
-                        "Agent 3: Tool call failed",
-                        trace_id=session.trace_id,
-                        step_id=step_id,
-                        tool="lookup_api_docs",
-                        error=str(e)
-                    )
+            # Log tool call in session
+            session.add_tool_call(
+                "lookup_api_docs",
+                duration_ms=0,  # Already timed in tool
+                step_id=step_id,
+                api_exists=api_result.get("api_exists")
+            )
+
+            # Incorporate API info into analysis
+            if api_result.get("api_exists"):
+                analysis["available_api"] = api_result.get("api_name")
+
+        # Lookups the model made are counted as they are served
+        self._api_lookup_hits += cache_hits
+        self._api_lookup_misses += len(missing)
 
-            processed.append(analysis)
+        # Cache successful lookups, evicting the least recently used past the cap.
+        for key, result in fetched.items():
+            if not isinstance(result, Exception):
+                cache[key] = result
+                cache.move_to_end(key)
+        while len(cache) > API_LOOKUP_CACHE_SIZE:
+            cache.popitem(last=False)
 
-        return processed
+        return analyses
+
+    def tool_cache_info(self) -> Dict[str, Any]:
+        """
+        Statistics of the lookup_api_docs result cache.
+
+        Returns:
+            Dictionary with hits, misses (lookups dispatched), size and maxsize
+        """
+        return {
+            "hits": self._api_lookup_hits,
+            "misses": self._api_lookup_misses,
+            "size": len(self._api_lookup_cache),
+            "maxsize": API_LOOKUP_CACHE_SIZE,
+        }
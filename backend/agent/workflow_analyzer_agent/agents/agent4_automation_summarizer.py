@@ -1,11 +1,44 @@
 """Agent 4: Automation Summarizer - Synthesizes insights and provides actionable recommendations."""
-import json
+import hashlib
 import time
+from collections import OrderedDict
 from typing import List, Dict, Any
 
+import orjson
+from google.genai import types as genai_types
+
+from .context_cache import SystemPromptCache
+from .error_handling import llm_call_errors, warn_on_prompt_bloat
+from .response_schemas import AutomationSummaryResponse, load_response
+from .retry import generate_with_retry
+from ..config import SUMMARY_CACHE_SIZE, TEMPERATURE
 from ..prompts import AGENT4_SYSTEM_PROMPT
 
 
+# Static user prompt scaffolding; only the placeholders change per call.
+_USER_PROMPT_TEMPLATE = """Please synthesize the workflow analysis results and provide a comprehensive automation summary.
+
+Parsed Steps (from Agent 1):
+{parsed_steps_str}
+
+Risk Assessments (from Agent 2):
+{risk_assessments_str}
+
+Automation Analyses (from Agent 3):
+{automation_analyses_str}
+
+Please provide a comprehensive summary that includes:
+1. Overall assessment of automation feasibility
+2. Key blockers preventing full automation
+3. Quick wins (low effort, high impact opportunities)
+4. High-priority steps that should be targeted
+5. Compliance and risk mitigation strategy
+6. Phased implementation roadmap
+7. Success metrics to track progress
+
+Respond with ONLY valid JSON, no markdown or explanations."""
+
+
 class AutomationSummarizerAgent:
     """
     Synthesizes insights from Agents 1-3 to produce automation summary and roadmap.
@@ -34,8 +67,20 @@ class AutomationSummarizerAgent:
         self.logger = logger
         self.tracer = tracer
         self.model = "gemini-2.0-flash-exp"
+        # Built once and reused; the system prompt goes in system_instruction
+        # rather than being resent as a user part on every call.
+        self._gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=AutomationSummaryResponse,
+            temperature=TEMPERATURE,
+            system_instruction=AGENT4_SYSTEM_PROMPT,
+        )
+        self._prompt_cache = SystemPromptCache(logger, "Agent 4")
+        # The summary depends only on Agents 1-3's outputs, so it is cached
+        # (as serialized JSON, LRU) under a hash of them.
+        self._summary_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
 
-    def summarize(self, session) -> Dict[str, Any]:
+    async def summarize(self, session) -> Dict[str, Any]:
         """
         Synthesize insights and generate automation summary.
 
@@ -59,9 +104,12 @@ class AutomationSummarizerAgent:
         )
 
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        try:
+        with llm_call_errors(
+            self.logger, session, "Agent 4", "agent_4", start_time,
+            unexpected_message="Unexpected error during summarization",
+        ):
             # Validate that previous agents have run
             parsed_steps = session.parsed_steps.get("steps", []) if session.parsed_steps else []
             risk_assessments = session.risks.get("risk_assessments", []) if session.risks else []
@@ -74,71 +122,70 @@ class AutomationSummarizerAgent:
                 )
                 return {}
 
-            # Create comprehensive context for Agent 4
-            parsed_steps_str = json.dumps(parsed_steps, indent=2)
-            risk_assessments_str = json.dumps(risk_assessments, indent=2) if risk_assessments else "No risk assessments available"
-            automation_analyses_str = json.dumps(automation_analyses, indent=2) if automation_analyses else "No automation analyses available"
-
-            user_prompt = f"""Please synthesize the workflow analysis results and provide a comprehensive automation summary.
-
-Parsed Steps (from Agent 1):
-{parsed_steps_str}
-
-Risk Assessments (from Agent 2):
-{risk_assessments_str}
-
-Automation Analyses (from Agent 3):
-{automation_analyses_str}
-
-Please provide a comprehensive summary that includes:
-1. Overall assessment of automation feasibility
-2. Key blockers preventing full automation
-3. Quick wins (low effort, high impact opportunities)
-4. High-priority steps that should be targeted
-5. Compliance and risk mitigation strategy
-6. Phased implementation roadmap
-7. Success metrics to track progress
-
-Respond with ONLY valid JSON, no markdown or explanations."""
+            # Reuse the summary of an identical earlier analysis
+            cache_key = hashlib.blake2b(
+                orjson.dumps(
+                    [parsed_steps, risk_assessments, automation_analyses],
+                    option=orjson.OPT_SORT_KEYS,
+                ),
+                digest_size=16,
+            ).digest()
+            cached = self._summary_cache.get(cache_key)
+            if cached is not None:
+                self._summary_cache.move_to_end(cache_key)
+                summary = orjson.loads(cached)
+                latency_ms = (time.perf_counter() - start_time) * 1000
+                session.automation_summary = {"summary": summary}
+                session.agent4_latency = latency_ms
+                self.logger.info(
+                    "Agent 4: Automation summary served from cache",
+                    trace_id=session.trace_id,
+                    latency_ms=latency_ms
+                )
+                return summary
 
-            # Call Gemini API client with JSON response type
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[
-                    {
-                        "role": "user",
-                        "parts": [
-                            {"text": AGENT4_SYSTEM_PROMPT},
-                            {"text": user_prompt},
-                        ],
-                    }
-                ],
-                config={
-                    "response_mime_type": "application/json",
-                },
+            # Create comprehensive context for Agent 4
+            parsed_steps_str = session.parsed_steps_json or orjson.dumps(parsed_steps).decode()
+            risk_assessments_str = orjson.dumps(risk_assessments).decode() if risk_assessments else "No risk assessments available"
+            automation_analyses_str = orjson.dumps(automation_analyses).decode() if automation_analyses else "No automation analyses available"
+
+            user_prompt = _USER_PROMPT_TEMPLATE.format(
+                parsed_steps_str=parsed_steps_str,
+                risk_assessments_str=risk_assessments_str,
+                automation_analyses_str=automation_analyses_str,
             )
 
-            # Extract and parse response
-            response_text = response.text.strip()
-
-            # Handle potential markdown code blocks
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            gen_config = await self._prompt_cache.apply(self.client, self.model, self._gen_config)
+
+            # Call Gemini API client with JSON response type, retrying transient errors
+            response = await generate_with_retry(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=user_prompt,
+                    config=gen_config,
+                ),
+                self.logger,
+                "Agent 4: Retrying automation summary call after transient error",
+            )
 
-            parsed_response = json.loads(response_text)
+            warn_on_prompt_bloat(self.logger, session, "Agent 4", response)
+            # Use the SDK-parsed structured output, falling back to the raw text
+            parsed_response = load_response(response)
             summary = parsed_response.get("summary", {})
 
             # Calculate latency
-            end_time = time.time()
+            end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
 
             # Store results in session
             session.automation_summary = {"summary": summary}
             session.agent4_latency = latency_ms
 
+            if summary:
+                self._summary_cache[cache_key] = orjson.dumps(summary)
+                if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
+
             # Log success
             self.logger.info(
                 "Agent 4: Automation summarization completed",
@@ -159,28 +206,5 @@ Respond with ONLY valid JSON, no markdown or explanations."""
 
             return summary
 
-        except json.JSONDecodeError as e:
-            # Log error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 4: JSON parsing error",
-                trace_id=session.trace_id,
-                error_type="JSONDecodeError",
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error("JSONDecodeError", str(e), agent="agent_4")
-            return {}
-
-        except Exception as e:
-            # Log unexpected error
-            latency_ms = (time.time() - start_time) * 1000
-            self.logger.error(
-                "Agent 4: Unexpected error during summarization",
-                trace_id=session.trace_id,
-                error_type=type(e).__name__,
-                error_message=str(e),
-                latency_ms=latency_ms
-            )
-            session.add_error(type(e).__name__, str(e), agent="agent_4")
-            return {}
+        # Only reached when llm_call_errors suppressed an error
+        return {}
@@ -0,0 +1,198 @@
+"""Batch Risk Assessor - Runs Agent 2 over many workflows as one Gemini batch job."""
+import asyncio
+import time
+from typing import Any, Dict, List, Sequence
+
+from google.genai import types as genai_types
+
+from .error_handling import llm_call_errors
+from .response_schemas import load_response
+from ..config import BATCH_MAX_WAIT_SECONDS, BATCH_POLL_INTERVAL_SECONDS
+
+# Batch job states after which polling stops.
+_TERMINAL_STATES = {
+    genai_types.JobState.JOB_STATE_SUCCEEDED,
+    genai_types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    genai_types.JobState.JOB_STATE_FAILED,
+    genai_types.JobState.JOB_STATE_CANCELLED,
+    genai_types.JobState.JOB_STATE_EXPIRED,
+}
+
+# Terminal states with (at least some) usable responses.
+_SUCCEEDED_STATES = {
+    genai_types.JobState.JOB_STATE_SUCCEEDED,
+    genai_types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+}
+
+
+class BatchRiskAssessor:
+    """
+    Assesses risk for many workflows through the Gemini Batch API.
+
+    Batch jobs are billed at a lower rate than interactive calls but finish
+    asynchronously (minutes to hours), so this is meant for offline and
+    nightly analysis rather than the interactive pipeline. Each workflow
+    becomes one inlined request with Agent 2's prompt and config; responses
+    get Agent 2's compliance lookups and are stored on each session exactly as
+    ``RiskAssessorAgent.assess_risk`` would store them.
+
+    Attributes:
+        risk_assessor: RiskAssessorAgent whose prompt, config, client and tool
+            processing are reused
+        use_batch_api: Submit a batch job (True) or call Agent 2 per workflow
+        poll_interval: Seconds between batch job status checks
+        max_wait: Seconds to wait for the batch job before giving up
+    """
+
+    def __init__(
+        self,
+        risk_assessor,
+        use_batch_api: bool = True,
+        poll_interval: float = BATCH_POLL_INTERVAL_SECONDS,
+        max_wait: float = BATCH_MAX_WAIT_SECONDS,
+    ):
+        """
+        Initialize the Batch Risk Assessor.
+
+        Args:
+            risk_assessor: RiskAssessorAgent to batch requests for
+            use_batch_api: Set False to fall back to one interactive call per workflow
+            poll_interval: Seconds between batch job status checks
+            max_wait: Seconds to wait for the batch job before giving up
+        """
+        self.risk_assessor = risk_assessor
+        self.use_batch_api = use_batch_api
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+
+    async def assess_risk_batch(
+        self,
+        sessions: Sequence[Any],
+        workflow_texts: Sequence[str],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Assess risk for several workflows at once.
+
+        Args:
+            sessions: SessionStates with parsed_steps from Agent 1, one per workflow
+            workflow_texts: Original workflow texts, in the same order
+
+        Returns:
+            One list of risk assessment dictionaries per session (empty on failure)
+
+        Raises:
+            ValueError: If sessions and workflow_texts differ in length
+        """
+        if len(sessions) != len(workflow_texts):
+            raise ValueError("sessions and workflow_texts must have the same length")
+
+        assessor = self.risk_assessor
+        if not self.use_batch_api:
+            return list(await asyncio.gather(*(
+                assessor.assess_risk(session, workflow_text)
+                for session, workflow_text in zip(sessions, workflow_texts)
+            )))
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in sessions]
+
+        # Workflows Agent 1 could not parse are skipped, as assess_risk does.
+        indices = [i for i, session in enumerate(sessions) if session.parsed_steps.get("steps")]
+        if not indices:
+            return results
+
+        assessor.logger.info(
+            "Agent 2: Batch risk assessment started",
+            workflow_count=len(indices)
+        )
+
+        # Record start time
+        start_time = time.perf_counter()
+
+        try:
+            responses = await self._run_batch_job([
+                assessor._build_user_prompt(sessions[i], workflow_texts[i]) for i in indices
+            ])
+        except Exception as e:
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            assessor.logger.error(
+                "Agent 2: Batch risk assessment failed",
+                error_type=type(e).__name__,
+                error_message=str(e),
+                latency_ms=latency_ms
+            )
+            for i in indices:
+                sessions[i].add_error(type(e).__name__, str(e), agent="agent_2")
+            return results
+
+        # Every workflow in the job waited for the whole job.
+        latency_ms = (time.perf_counter() - start_time) * 1000
+
+        for i, inlined in zip(indices, responses):
+            results[i] = await self._store_response(sessions[i], inlined, start_time, latency_ms)
+
+        assessor.logger.info(
+            "Agent 2: Batch risk assessment completed",
+            workflow_count=len(indices),
+            latency_ms=latency_ms
+        )
+
+        return results
+
+    async def _run_batch_job(self, prompts: List[str]) -> List[genai_types.InlinedResponse]:
+        """Submit one inlined request per prompt and wait for the job's responses."""
+        assessor = self.risk_assessor
+        client = assessor.client
+
+        job = await client.aio.batches.create(
+            model=assessor.model,
+            src=[
+                genai_types.InlinedRequest(contents=prompt, config=assessor._gen_config)
+                for prompt in prompts
+            ],
+        )
+
+        deadline = time.monotonic() + self.max_wait
+        while job.state not in _TERMINAL_STATES:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch job {job.name} did not finish within {self.max_wait}s")
+            await asyncio.sleep(self.poll_interval)
+            job = await client.aio.batches.get(name=job.name)
+
+        if job.state not in _SUCCEEDED_STATES:
+            raise RuntimeError(f"Batch job {job.name} ended in state {job.state}")
+
+        responses = job.dest.inlined_responses if job.dest else None
+        if not responses or len(responses) != len(prompts):
+            raise RuntimeError(f"Batch job {job.name} returned an unexpected number of responses")
+        return responses
+
+    async def _store_response(
+        self,
+        session,
+        inlined: genai_types.InlinedResponse,
+        start_time: float,
+        latency_ms: float,
+    ) -> List[Dict[str, Any]]:
+        """Post-process one workflow's batch response and store it on its session."""
+        assessor = self.risk_assessor
+
+        with llm_call_errors(
+            assessor.logger, session, "Agent 2", "agent_2", start_time,
+            unexpected_message="Unexpected error during batch risk assessment",
+        ):
+            if inlined.error is not None:
+                raise RuntimeError(inlined.error.message or "Batch request failed")
+
+            parsed_response = load_response(inlined.response)
+            risk_assessments = await assessor._process_risk_assessments(
+                parsed_response.get("risk_assessments", []), session
+            )
+
+            # Store results in session
+            session.risks = {"risk_assessments": risk_assessments}
+            session.agent2_latency = latency_ms
+
+            return risk_assessments
+
+        # Only reached when llm_call_errors suppressed an error
+        return []
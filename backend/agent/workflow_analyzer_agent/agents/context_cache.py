@@ -0,0 +1,136 @@
+"""Gemini context caching of the agents' static system prompts.
+
+With ``USE_CONTEXT_CACHE`` enabled, each agent uploads its system prompt once
+as cached content and its requests reference that cache by name instead of
+resending the prompt, so the prompt tokens are billed at the cached rate.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from google.genai import types as genai_types
+
+from ..config import CONTEXT_CACHE_TTL_SECONDS, USE_CONTEXT_CACHE
+
+# Recreate a cache this long before it expires, so requests in flight don't
+# reference an expired cache.
+_REFRESH_MARGIN_SECONDS = 60.0
+
+
+class SystemPromptCache:
+    """
+    Holds one agent's system prompt as Gemini cached content.
+
+    The cache is created on first use and recreated shortly before its TTL
+    runs out. If creation fails (e.g. the prompt is below the model's minimum
+    cacheable size), caching is turned off for this prompt and requests keep
+    sending ``system_instruction`` as before.
+
+    Attributes:
+        logger: StructuredLogger instance for JSON logging
+        log_prefix: Agent name used in log messages (e.g. "Agent 1")
+        enabled: Whether caching is attempted at all
+        ttl_seconds: Lifetime requested for each cache
+    """
+
+    def __init__(
+        self,
+        logger,
+        log_prefix: str,
+        enabled: bool = USE_CONTEXT_CACHE,
+        ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize the system prompt cache.
+
+        Args:
+            logger: StructuredLogger instance
+            log_prefix: Agent name used in log messages
+            enabled: Attempt context caching (default: from config)
+            ttl_seconds: Lifetime requested for each cache
+        """
+        self.logger = logger
+        self.log_prefix = log_prefix
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self._cache_name: Optional[str] = None
+        self._refresh_at = 0.0
+        self._lock = asyncio.Lock()
+        # Last (base config, cache name) -> derived config, to avoid re-copying
+        self._derived: Optional[tuple] = None
+
+    async def apply(
+        self,
+        client,
+        model: str,
+        config: genai_types.GenerateContentConfig,
+    ) -> genai_types.GenerateContentConfig:
+        """
+        Return ``config`` with its system instruction replaced by the cache.
+
+        Args:
+            client: Gemini API client (google.genai.Client-compatible)
+            model: Model the requests (and therefore the cache) use
+            config: The agent's GenerateContentConfig
+
+        Returns:
+            A config referencing the cached prompt, or ``config`` unchanged if
+            caching is disabled or unavailable
+        """
+        if not self.enabled or config.system_instruction is None:
+            return config
+
+        cache_name = await self._current_cache_name(client, model, config.system_instruction)
+        if cache_name is None:
+            return config
+
+        derived = self._derived
+        if derived is not None and derived[0] is config and derived[1] == cache_name:
+            return derived[2]
+        cached_config = config.model_copy(update={
+            "system_instruction": None,
+            "cached_content": cache_name,
+        })
+        self._derived = (config, cache_name, cached_config)
+        return cached_config
+
+    async def _current_cache_name(self, client, model: str, system_instruction) -> Optional[str]:
+        """Return a live cache's name, creating or refreshing it if needed."""
+        if self._cache_name is not None and time.monotonic() < self._refresh_at:
+            return self._cache_name
+
+        async with self._lock:
+            # Another call may have refreshed it while we waited
+            if self._cache_name is not None and time.monotonic() < self._refresh_at:
+                return self._cache_name
+            if not self.enabled:
+                return None
+
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=genai_types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{self.ttl_seconds}s",
+                    ),
+                )
+            except Exception as e:
+                self.enabled = False
+                self._cache_name = None
+                self.logger.warning(
+                    f"{self.log_prefix}: Context caching unavailable, sending system prompt inline",
+                    error_type=type(e).__name__,
+                    error_message=str(e)
+                )
+                return None
+
+            self._cache_name = cached.name
+            self._refresh_at = time.monotonic() + max(
+                self.ttl_seconds - _REFRESH_MARGIN_SECONDS, self.ttl_seconds / 2
+            )
+            self.logger.info(
+                f"{self.log_prefix}: System prompt cached",
+                cache_name=cached.name,
+                ttl_seconds=self.ttl_seconds
+            )
+            return self._cache_name
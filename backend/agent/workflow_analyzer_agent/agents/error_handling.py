@@ -0,0 +1,86 @@
+"""Shared error handling for the agents' Gemini calls."""
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from ..config import MODEL_CONTEXT_WINDOW_TOKENS, PROMPT_TOKEN_WARNING_RATIO
+
+
+@contextmanager
+def llm_call_errors(
+    logger,
+    session,
+    log_prefix: str,
+    agent: str,
+    start_time: float,
+    unexpected_message: str = "Unexpected error",
+) -> Iterator[None]:
+    """
+    Log, record and suppress any error raised by an agent's LLM call.
+
+    The caller returns its empty result after the ``with`` block, which is only
+    reached when an error was suppressed:
+
+        with llm_call_errors(self.logger, session, "Agent 2", "agent_2", start_time):
+            ...
+            return risk_assessments
+        return []
+
+    Args:
+        logger: StructuredLogger instance
+        session: SessionState that records the error
+        log_prefix: Prefix of the logged messages (e.g. "Agent 2")
+        agent: Agent name recorded with the session error (e.g. "agent_2")
+        start_time: ``time.perf_counter()`` value taken when the call started
+        unexpected_message: Message logged for errors other than bad JSON
+    """
+    try:
+        yield
+    except json.JSONDecodeError as e:
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        logger.error(
+            f"{log_prefix}: JSON parsing error",
+            trace_id=session.trace_id,
+            error_type="JSONDecodeError",
+            error_message=str(e),
+            latency_ms=latency_ms
+        )
+        session.add_error("JSONDecodeError", str(e), agent=agent)
+    except Exception as e:
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        logger.error(
+            f"{log_prefix}: {unexpected_message}",
+            trace_id=session.trace_id,
+            error_type=type(e).__name__,
+            error_message=str(e),
+            latency_ms=latency_ms
+        )
+        session.add_error(type(e).__name__, str(e), agent=agent)
+
+
+def warn_on_prompt_bloat(logger, session, log_prefix: str, response) -> None:
+    """
+    Warn when a call's prompt used most of the model's context window.
+
+    Reads the token count Gemini already reports in ``usage_metadata``, so it
+    costs no extra request. Responses without usage data (e.g. streamed) are
+    ignored.
+
+    Args:
+        logger: StructuredLogger instance
+        session: SessionState of the analysis
+        log_prefix: Prefix of the logged message (e.g. "Agent 4")
+        response: ``generate_content`` response
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    if not isinstance(prompt_tokens, int):
+        return
+    if prompt_tokens > MODEL_CONTEXT_WINDOW_TOKENS * PROMPT_TOKEN_WARNING_RATIO:
+        logger.warning(
+            f"{log_prefix}: Prompt is close to the model context window",
+            trace_id=session.trace_id,
+            prompt_tokens=prompt_tokens,
+            context_window_tokens=MODEL_CONTEXT_WINDOW_TOKENS
+        )
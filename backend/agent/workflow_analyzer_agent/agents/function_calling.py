@@ -0,0 +1,60 @@
+"""Gemini function-calling configuration for the agents' tool lookups.
+
+With ``USE_MODEL_TOOL_CALLS`` enabled, Agents 2 and 3 declare their lookup tool
+to the model, which calls it only for the steps it judges need one, instead of
+the agents looking up every step after the response arrives.
+"""
+from functools import lru_cache
+from typing import Callable, Iterable
+
+import orjson
+from google.genai import types as genai_types
+
+from ..config import MAX_REMOTE_TOOL_CALLS
+
+
+@lru_cache(maxsize=None)
+def _output_format_section(schema) -> str:
+    """System prompt section spelling out ``schema`` as JSON Schema (built once per schema)."""
+    return (
+        "\n\nOutput Format:\n"
+        "You MUST respond with ONLY valid JSON, no markdown, no extra text, no explanation.\n"
+        "The JSON must match this JSON Schema:\n"
+        + orjson.dumps(schema.model_json_schema()).decode()
+    )
+
+
+def tool_calling_config(
+    base_config: genai_types.GenerateContentConfig,
+    tools: Iterable[Callable],
+) -> genai_types.GenerateContentConfig:
+    """
+    Derive a function-calling config from an agent's structured-output config.
+
+    Gemini does not combine function calling with a JSON response schema, so
+    the schema is dropped and the response is parsed from its text
+    (``load_response`` falls back to that). The system prompts don't describe
+    the response format, so the schema is appended to the system instruction
+    as JSON Schema instead. The SDK executes the tools itself (automatic
+    function calling), running plain functions on worker threads.
+
+    Args:
+        base_config: The agent's regular GenerateContentConfig
+        tools: Python callables to declare; their signature and docstring
+            become the function declaration
+
+    Returns:
+        A copy of ``base_config`` with the tools enabled
+    """
+    return base_config.model_copy(update={
+        "system_instruction": (
+            base_config.system_instruction
+            + _output_format_section(base_config.response_schema)
+        ),
+        "response_mime_type": None,
+        "response_schema": None,
+        "tools": list(tools),
+        "automatic_function_calling": genai_types.AutomaticFunctionCallingConfig(
+            maximum_remote_calls=MAX_REMOTE_TOOL_CALLS,
+        ),
+    })
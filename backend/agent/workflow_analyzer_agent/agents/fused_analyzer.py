@@ -0,0 +1,411 @@
+"""Fused Analyzer - Runs the Agent 2, 3 (and 4) analyses in a single Gemini call."""
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import AsyncContextManager, Callable, Dict, Any, List, Optional, Tuple
+
+import orjson
+from google.genai import types as genai_types
+
+from .context_cache import SystemPromptCache
+from .error_handling import llm_call_errors, warn_on_prompt_bloat
+from .response_schemas import FusedAnalysisResponse, RiskAndAutomationResponse, load_response
+from .retry import generate_with_retry
+from .streaming import discard_tasks, stream_generate
+from ..config import (
+    COMBINED_STEPS_PER_CALL,
+    MAX_CONCURRENT_LLM_CALLS,
+    STREAM_LLM_RESPONSES,
+    TEMPERATURE,
+)
+from ..prompts import AGENT23_SYSTEM_PROMPT, FUSED_ANALYSIS_SYSTEM_PROMPT
+
+
+# Static user prompt scaffolding; only the placeholders change per call.
+_USER_PROMPT_TEMPLATE = """Please assess risk, analyze automation potential, and summarize this workflow.
+
+Original Workflow:
+{workflow_text}
+
+Parsed Steps (from Agent 1):
+{parsed_steps_str}
+
+Respond with ONLY valid JSON, no markdown or explanations."""
+
+_AGENT23_USER_PROMPT_TEMPLATE = """Please assess risk and analyze automation potential for each step of this workflow.
+
+Original Workflow:
+{workflow_text}
+
+Parsed Steps (from Agent 1):
+{parsed_steps_str}
+
+Respond with ONLY valid JSON, no markdown or explanations."""
+
+
+class FusedAnalyzerAgent:
+    """
+    Produces risk assessments, automation analyses and the automation summary
+    from one LLM call instead of three dependent ones (``analyze``), or just the
+    risk assessments and automation analyses from one call instead of two
+    (``assess_and_analyze``).
+
+    Tool lookups are not done through function calling (Gemini does not combine
+    it with a JSON response schema); instead the risk and automation results are
+    enriched afterwards by the Risk Assessor and Automation Analyzer agents'
+    own (cached, concurrent) tool processing. With STREAM_LLM_RESPONSES those
+    lookups start while the response is still streaming, as in the agents.
+
+    Attributes:
+        client: Gemini API client (google.genai.Client-compatible)
+        logger: StructuredLogger instance for JSON logging
+        tracer: DistributedTracer instance for distributed tracing
+        risk_assessor: RiskAssessorAgent used to apply compliance lookups
+        automation_analyzer: AutomationAnalyzerAgent used to apply API lookups
+        model: Model to use (default: gemini-2.0-flash-exp)
+        llm_slot: Shared Gemini call limiter, held around each call
+    """
+
+    def __init__(
+        self,
+        client,
+        logger,
+        tracer,
+        risk_assessor,
+        automation_analyzer,
+        llm_slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ):
+        """
+        Initialize the Fused Analyzer Agent.
+
+        Args:
+            client: Gemini API client (google.genai.Client-compatible)
+            logger: StructuredLogger instance
+            tracer: DistributedTracer instance
+            risk_assessor: RiskAssessorAgent whose tool processing is reused
+            automation_analyzer: AutomationAnalyzerAgent whose tool processing is reused
+            llm_slot: Factory of an async context manager holding one of the
+                caller's shared Gemini call slots (e.g. the orchestrator's
+                ``_llm_slot``). Each Gemini call, including each chunk of a
+                combined analysis, acquires its own slot. Without one, only the
+                chunk calls of a single workflow are bounded, by
+                MAX_CONCURRENT_LLM_CALLS.
+        """
+        self.client = client
+        self.logger = logger
+        self.tracer = tracer
+        self.risk_assessor = risk_assessor
+        self.automation_analyzer = automation_analyzer
+        self.llm_slot = llm_slot
+        self.model = "gemini-2.0-flash-exp"
+        # Built once and reused; the system prompt goes in system_instruction
+        # rather than being resent as a user part on every call.
+        self._gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=FusedAnalysisResponse,
+            temperature=TEMPERATURE,
+            system_instruction=FUSED_ANALYSIS_SYSTEM_PROMPT,
+        )
+        self._agent23_gen_config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=RiskAndAutomationResponse,
+            temperature=TEMPERATURE,
+            system_instruction=AGENT23_SYSTEM_PROMPT,
+        )
+        self._prompt_cache = SystemPromptCache(logger, "Fused analysis")
+        self._agent23_prompt_cache = SystemPromptCache(logger, "Agents 2-3")
+
+    async def analyze(self, session, workflow_text: str) -> Dict[str, Any]:
+        """
+        Assess risk, analyze automation potential and summarize in one call.
+
+        Stores results on the session exactly where Agents 2-4 would
+        (``risks``, ``automation``, ``automation_summary``).
+
+        Args:
+            session: SessionState with parsed_steps from Agent 1
+            workflow_text: Original workflow text (for context)
+
+        Returns:
+            The automation summary dictionary (empty on failure)
+        """
+        # Log start
+        self.logger.info(
+            "Fused analysis started",
+            trace_id=session.trace_id,
+            workflow_length=len(workflow_text)
+        )
+
+        # Record start time
+        start_time = time.perf_counter()
+
+        with llm_call_errors(self.logger, session, "Fused analysis", "fused_analyzer", start_time):
+            # Validate that Agent 1 has run
+            parsed_steps = session.parsed_steps.get("steps", [])
+            if not parsed_steps:
+                self.logger.warning(
+                    "Fused analysis: No parsed steps available",
+                    trace_id=session.trace_id
+                )
+                return {}
+
+            parsed_steps_str = session.parsed_steps_json or orjson.dumps(parsed_steps).decode()
+
+            user_prompt = _USER_PROMPT_TEMPLATE.format(
+                workflow_text=workflow_text, parsed_steps_str=parsed_steps_str
+            )
+
+            gen_config = await self._prompt_cache.apply(self.client, self.model, self._gen_config)
+
+            parsed_response, risk_assessments, automation_analyses = await self._generate_and_enrich(
+                session,
+                parsed_steps,
+                user_prompt,
+                gen_config,
+                "Fused analysis",
+                "Fused analysis: Retrying call after transient error",
+            )
+            summary = parsed_response.get("summary", {})
+
+            # Calculate latency
+            latency_ms = (time.perf_counter() - start_time) * 1000
+
+            # Store results in session
+            session.risks = {"risk_assessments": risk_assessments}
+            session.automation = {"automation_analyses": automation_analyses}
+            session.automation_summary = {"summary": summary}
+            session.fused_latency = latency_ms
+
+            # Log success
+            self.logger.info(
+                "Fused analysis completed",
+                trace_id=session.trace_id,
+                assessments_count=len(risk_assessments),
+                analyses_count=len(automation_analyses),
+                latency_ms=latency_ms
+            )
+
+            return summary
+
+        # Only reached when llm_call_errors suppressed an error
+        return {}
+
+    async def assess_and_analyze(
+        self, session, workflow_text: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Assess risk and analyze automation potential in one call.
+
+        Stores results on the session exactly where Agents 2 and 3 would
+        (``risks``, ``automation``); both agent latencies are set to the one
+        call's latency. Agent 4 still runs separately.
+
+        With COMBINED_STEPS_PER_CALL set, the steps are instead split into
+        chunks of that many steps, each analyzed by its own call; the calls
+        run concurrently, each holding an ``llm_slot`` so they count against
+        the caller's shared limit, and their results are merged by step_id in
+        step order.
+
+        Args:
+            session: SessionState with parsed_steps from Agent 1
+            workflow_text: Original workflow text (for context)
+
+        Returns:
+            (risk assessments, automation analyses); empty lists on failure
+        """
+        # Log start
+        self.logger.info(
+            "Agents 2-3: Combined analysis started",
+            trace_id=session.trace_id,
+            workflow_length=len(workflow_text)
+        )
+
+        # Record start time
+        start_time = time.perf_counter()
+
+        with llm_call_errors(self.logger, session, "Agents 2-3", "agents_2_3", start_time):
+            # Validate that Agent 1 has run
+            parsed_steps = session.parsed_steps.get("steps", [])
+            if not parsed_steps:
+                self.logger.warning(
+                    "Agents 2-3: No parsed steps available",
+                    trace_id=session.trace_id
+                )
+                return [], []
+
+            gen_config = await self._agent23_prompt_cache.apply(
+                self.client, self.model, self._agent23_gen_config
+            )
+
+            if 0 < COMBINED_STEPS_PER_CALL < len(parsed_steps):
+                risk_assessments, automation_analyses = await self._assess_and_analyze_chunks(
+                    session, workflow_text, parsed_steps, gen_config
+                )
+            else:
+                parsed_steps_str = session.parsed_steps_json or orjson.dumps(parsed_steps).decode()
+
+                user_prompt = _AGENT23_USER_PROMPT_TEMPLATE.format(
+                    workflow_text=workflow_text, parsed_steps_str=parsed_steps_str
+                )
+
+                _, risk_assessments, automation_analyses = await self._generate_and_enrich(
+                    session,
+                    parsed_steps,
+                    user_prompt,
+                    gen_config,
+                    "Agents 2-3",
+                    "Agents 2-3: Retrying combined call after transient error",
+                )
+
+            # Calculate latency
+            latency_ms = (time.perf_counter() - start_time) * 1000
+
+            # Store results in session
+            session.risks = {"risk_assessments": risk_assessments}
+            session.automation = {"automation_analyses": automation_analyses}
+            session.agent2_latency = latency_ms
+            session.agent3_latency = latency_ms
+
+            # Log success
+            self.logger.info(
+                "Agents 2-3: Combined analysis completed",
+                trace_id=session.trace_id,
+                assessments_count=len(risk_assessments),
+                analyses_count=len(automation_analyses),
+                latency_ms=latency_ms
+            )
+
+            return risk_assessments, automation_analyses
+
+        # Only reached when llm_call_errors suppressed an error
+        return [], []
+
+    async def _assess_and_analyze_chunks(
+        self,
+        session,
+        workflow_text: str,
+        parsed_steps: List[Dict[str, Any]],
+        gen_config: genai_types.GenerateContentConfig,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Run the combined call per chunk of COMBINED_STEPS_PER_CALL steps and merge the results."""
+        chunks = [
+            parsed_steps[i:i + COMBINED_STEPS_PER_CALL]
+            for i in range(0, len(parsed_steps), COMBINED_STEPS_PER_CALL)
+        ]
+        self.logger.info(
+            "Agents 2-3: Analyzing workflow in chunks",
+            trace_id=session.trace_id,
+            steps_count=len(parsed_steps),
+            chunks_count=len(chunks)
+        )
+
+        llm_slot = self.llm_slot
+        if llm_slot is None:
+            # No shared limiter: bound this workflow's chunk calls on their own
+            limiter = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+            def llm_slot():
+                return limiter
+
+        async def analyze_chunk(steps: List[Dict[str, Any]]):
+            user_prompt = _AGENT23_USER_PROMPT_TEMPLATE.format(
+                workflow_text=workflow_text, parsed_steps_str=orjson.dumps(steps).decode()
+            )
+            _, risks, analyses = await self._generate_and_enrich(
+                session,
+                steps,
+                user_prompt,
+                gen_config,
+                "Agents 2-3",
+                "Agents 2-3: Retrying combined call after transient error",
+                llm_slot=llm_slot,
+            )
+            return risks, analyses
+
+        chunk_results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+
+        # Merge by step_id, keeping the first result of each step.
+        merged_risks: Dict[Any, Dict[str, Any]] = {}
+        merged_analyses: Dict[Any, Dict[str, Any]] = {}
+        for risks, analyses in chunk_results:
+            for assessment in risks:
+                merged_risks.setdefault(assessment.get("step_id"), assessment)
+            for analysis in analyses:
+                merged_analyses.setdefault(analysis.get("step_id"), analysis)
+        return list(merged_risks.values()), list(merged_analyses.values())
+
+    async def _generate_and_enrich(
+        self,
+        session,
+        parsed_steps: List[Dict[str, Any]],
+        user_prompt: str,
+        gen_config: genai_types.GenerateContentConfig,
+        log_prefix: str,
+        retry_message: str,
+        llm_slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Call Gemini (retrying transient errors) and apply the tool lookups.
+
+        The call holds ``llm_slot`` (default: the agent's shared one, if any);
+        the tool lookups run after it is released.
+
+        When STREAM_LLM_RESPONSES is enabled the response is streamed and each
+        risk assessment's compliance lookup and each automation analysis's API
+        lookup starts as soon as that item completes.
+
+        Returns:
+            (parsed response, risk assessments, automation analyses)
+        """
+        # Lookups started while the response is still streaming
+        compliance_prefetched: Dict[Tuple[str, str], asyncio.Future] = {}
+        api_prefetched: Dict[str, asyncio.Future] = {}
+        descriptions = {
+            step.get("step_id"): step.get("description", "")
+            for step in parsed_steps
+        } if STREAM_LLM_RESPONSES else {}
+        item_handlers = {
+            "risk_assessments": lambda item: self.risk_assessor._prefetch_compliance(
+                item, session, compliance_prefetched
+            ),
+            "automation_analyses": lambda item: self.automation_analyzer._prefetch_api_lookup(
+                item, descriptions, session, api_prefetched
+            ),
+        }
+
+        async def call():
+            if STREAM_LLM_RESPONSES:
+                return await stream_generate(
+                    self.client,
+                    self.model,
+                    user_prompt,
+                    gen_config,
+                    item_handlers=item_handlers,
+                )
+            return await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=user_prompt,
+                config=gen_config,
+            )
+
+        try:
+            # Call Gemini API client with JSON response type, retrying transient errors
+            async with (llm_slot or self.llm_slot or nullcontext)():
+                response = await generate_with_retry(call, self.logger, retry_message)
+
+            warn_on_prompt_bloat(self.logger, session, log_prefix, response)
+            # Use the SDK-parsed structured output, falling back to the raw text
+            parsed_response = load_response(response)
+
+            # Apply tool lookups the same way the standalone agents do
+            risk_assessments = await self.risk_assessor._process_risk_assessments(
+                parsed_response.get("risk_assessments", []), session, compliance_prefetched
+            )
+            automation_analyses = await self.automation_analyzer._process_automation_analyses(
+                parsed_response.get("automation_analyses", []), session, api_prefetched
+            )
+        finally:
+            discard_tasks(compliance_prefetched.values())
+            discard_tasks(api_prefetched.values())
+
+        return parsed_response, risk_assessments, automation_analyses
@@ -0,0 +1,164 @@
+"""Structured-output schemas for the agents' Gemini responses.
+
+These define the JSON shape of each agent's response (the system prompts in
+``prompts.py`` no longer describe it) and are passed to ``generate_content``
+as ``response_schema`` so the SDK returns pre-parsed objects in
+``response.parsed``. Field descriptions are sent to the model with the schema.
+On the function-calling path, which can't use ``response_schema``, the schema
+is appended to the system prompt instead (see ``function_calling.py``).
+``load_response`` turns either form back into the plain dicts the agents
+already work with.
+"""
+from typing import Any, Dict, List, Optional
+
+import orjson
+from pydantic import BaseModel, Field
+
+
+# Agent 1: Workflow Parser
+
+class ParsedStepSchema(BaseModel):
+    step_id: str = Field(description="Lowercase sequential ID: step_1, step_2, ...")
+    description: str = Field(description="Brief description of what this step does")
+    inputs: List[str]
+    outputs: List[str]
+    dependencies: List[str] = Field(description="step_ids that must complete first")
+
+
+class ParsedStepsResponse(BaseModel):
+    steps: List[ParsedStepSchema]
+
+
+# Agent 2: Risk Assessor
+
+class RiskAssessmentSchema(BaseModel):
+    step_id: str
+    risk_level: str = Field(description="One of LOW, MEDIUM, HIGH, CRITICAL")
+    requires_human_in_loop: bool
+    confidence_score: float = Field(description="Confidence in this assessment, 0.0-1.0")
+    notes: Optional[str] = Field(default=None, description="Explanation of the risk assessment")
+    applicable_regulations: List[str] = Field(default_factory=list)
+    mitigation_suggestions: List[str] = Field(default_factory=list)
+
+
+class RiskAssessmentsResponse(BaseModel):
+    risk_assessments: List[RiskAssessmentSchema]
+
+
+# Agent 3: Automation Analyzer
+
+class AutomationAnalysisSchema(BaseModel):
+    step_id: str
+    recommended_agent_type: str = Field(description="One of adk_base, agentic_rag, TOOL, HUMAN")
+    determinism_score: float = Field(description="0.0-1.0")
+    automation_feasibility: float = Field(description="0.0-1.0")
+    complexity_level: Optional[str] = Field(default=None, description="One of LOW, MEDIUM, HIGH")
+    available_api: Optional[str] = None
+    automation_potential: Optional[str] = None
+    implementation_notes: Optional[str] = None
+    risks_if_automated: List[str] = Field(default_factory=list)
+
+
+class AutomationAnalysesResponse(BaseModel):
+    automation_analyses: List[AutomationAnalysisSchema]
+
+
+# Agent 4: Automation Summarizer
+
+class QuickWinSchema(BaseModel):
+    step_id: str
+    title: str
+    effort: Optional[str] = Field(default=None, description="One of LOW, MEDIUM, HIGH")
+    impact: Optional[str] = Field(default=None, description="Estimated time/cost savings")
+    rationale: Optional[str] = None
+
+
+class HighPriorityStepSchema(BaseModel):
+    step_id: str
+    title: str
+    blockers: List[str] = Field(default_factory=list)
+    recommendation: Optional[str] = None
+
+
+class ComplianceSummarySchema(BaseModel):
+    critical_risks: List[str] = Field(default_factory=list)
+    mitigation_strategy: Optional[str] = None
+    human_review_requirements: List[str] = Field(default_factory=list)
+
+
+class RoadmapPhaseSchema(BaseModel):
+    phase: str
+    duration: Optional[str] = None
+    steps: List[str] = Field(default_factory=list)
+    objectives: List[str] = Field(default_factory=list)
+
+
+class SuccessMetricSchema(BaseModel):
+    metric: str
+    current_state: Optional[str] = None
+    target_state: Optional[str] = None
+    measurement: Optional[str] = None
+
+
+class AutomationSummarySchema(BaseModel):
+    overall_assessment: str
+    automation_potential_percentage: float = Field(description="0.0-1.0")
+    estimated_time_to_full_automation: Optional[str] = Field(
+        default=None, description="e.g. 2-3 months"
+    )
+    key_blockers: List[str] = Field(default_factory=list)
+    quick_wins: List[QuickWinSchema] = Field(default_factory=list)
+    high_priority_steps: List[HighPriorityStepSchema] = Field(default_factory=list)
+    compliance_summary: Optional[ComplianceSummarySchema] = None
+    implementation_roadmap: List[RoadmapPhaseSchema] = Field(default_factory=list)
+    success_metrics: List[SuccessMetricSchema] = Field(default_factory=list)
+
+
+class AutomationSummaryResponse(BaseModel):
+    summary: AutomationSummarySchema
+
+
+# Combined Agents 2-3
+
+class RiskAndAutomationResponse(BaseModel):
+    risk_assessments: List[RiskAssessmentSchema]
+    automation_analyses: List[AutomationAnalysisSchema]
+
+
+# Fused Agents 2-4
+
+class FusedAnalysisResponse(BaseModel):
+    risk_assessments: List[RiskAssessmentSchema]
+    automation_analyses: List[AutomationAnalysisSchema]
+    summary: AutomationSummarySchema
+
+
+def load_response(response) -> Dict[str, Any]:
+    """
+    Return a Gemini response body as a plain dict.
+
+    Uses the SDK's pre-parsed ``response.parsed`` when structured output was
+    honored; otherwise falls back to decoding ``response.text``, unwrapping a
+    markdown code fence if the model added one.
+
+    Args:
+        response: ``generate_content`` response
+
+    Returns:
+        Parsed JSON object
+
+    Raises:
+        json.JSONDecodeError: If the text fallback is not valid JSON
+    """
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, BaseModel):
+        # Drop unset optionals so callers' .get(key, default) fallbacks apply.
+        return parsed.model_dump(exclude_none=True)
+
+    response_text = response.text.strip()
+    if response_text.startswith("```"):
+        # Unwrap a markdown code fence (optionally tagged json).
+        response_text = (
+            response_text.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        )
+    return orjson.loads(response_text)
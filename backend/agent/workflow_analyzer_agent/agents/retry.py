@@ -0,0 +1,81 @@
+"""Retry with exponential backoff for the agents' Gemini calls."""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from google.genai import errors as genai_errors
+
+try:
+    from urllib3.exceptions import ReadError, ProtocolError
+except Exception:  # pragma: no cover - fallback for older urllib3 versions
+    class ReadError(Exception):
+        """Fallback ReadError when urllib3 version lacks this class."""
+
+    class ProtocolError(Exception):
+        """Fallback ProtocolError when urllib3 version lacks this class."""
+
+from ..config import LLM_MAX_ATTEMPTS, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY
+
+# HTTP status codes worth retrying: rate limited, timed out, or server-side.
+_RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_RETRYABLE_TYPES = (ReadError, ProtocolError, ConnectionError, TimeoutError)
+
+_RETRYABLE_SIGNATURES = (
+    "Connection reset by peer",
+    "RST_STREAM",
+    "503",
+    "temporarily unavailable",
+)
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Check whether an exception is transient and should trigger a retry."""
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in _RETRYABLE_STATUS_CODES
+    if isinstance(exc, _RETRYABLE_TYPES):
+        return True
+
+    message = str(exc)
+    return any(signature in message for signature in _RETRYABLE_SIGNATURES)
+
+
+async def generate_with_retry(
+    call: Callable[[], Awaitable[Any]],
+    logger,
+    retry_message: str,
+    max_attempts: int = LLM_MAX_ATTEMPTS,
+) -> Any:
+    """
+    Await ``call()``, retrying transient failures with exponential backoff.
+
+    Waits ``LLM_RETRY_BASE_DELAY * 2**(attempt - 1)`` seconds (capped at
+    ``LLM_RETRY_MAX_DELAY``) between attempts. Non-retryable errors and the
+    final failure are re-raised for the agent's own error handling.
+
+    Args:
+        call: Zero-argument coroutine function making one Gemini request
+        logger: StructuredLogger instance
+        retry_message: Warning logged before each retry
+        max_attempts: Total number of attempts
+
+    Returns:
+        Whatever ``call()`` returns
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await call()
+        except Exception as exc:
+            if not is_retryable_error(exc) or attempt == max_attempts:
+                raise
+
+            wait_time = min(LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1), LLM_RETRY_MAX_DELAY)
+            logger.warning(
+                retry_message,
+                attempt=attempt,
+                wait_seconds=wait_time,
+                error_type=type(exc).__name__,
+                error_message=str(exc),
+            )
+            await asyncio.sleep(wait_time)
+
+    raise RuntimeError("Gemini call retries exhausted")
@@ -0,0 +1,161 @@
+"""Streaming Gemini calls with incremental extraction of JSON array items.
+
+Agents that post-process each item of a response array (tool lookups) can use
+``stream_generate`` to receive items as soon as they are complete, while the
+model is still generating the rest of the response.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import orjson
+
+
+@dataclass
+class StreamedResponse:
+    """Concatenated text of a streamed response (``load_response``-compatible)."""
+
+    text: str
+    parsed: Any = None
+
+
+class JsonArrayItemScanner:
+    """
+    Incrementally extracts the objects of one top-level array from streamed JSON.
+
+    Given chunks of a document like ``{"risk_assessments": [{...}, {...}]}``,
+    ``feed`` returns each ``{...}`` element of the array under ``key`` as soon
+    as its closing brace arrives. Only string/escape state and nesting depth are
+    tracked; the full document is still validated by the final parse.
+    """
+
+    def __init__(self, key: str):
+        """
+        Initialize the scanner.
+
+        Args:
+            key: Name of the top-level key whose array items should be yielded
+        """
+        self._key = key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = -1
+        self._last_key: Optional[str] = None
+        self._array_depth = -1
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of text and return any array items it completed.
+
+        Args:
+            chunk: Next piece of the streamed response text
+
+        Returns:
+            Parsed items completed by this chunk (possibly empty)
+        """
+        self._text += chunk
+        text = self._text
+        items: List[Dict[str, Any]] = []
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._last_key == self._key:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if ch == "}" and self._depth == self._array_depth and self._item_start >= 0:
+                    try:
+                        items.append(orjson.loads(text[self._item_start:i + 1]))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._item_start = -1
+                elif ch == "]" and self._depth == self._array_depth - 1:
+                    self._array_depth = -1
+
+        self._pos = len(text)
+        return items
+
+
+async def stream_generate(
+    client,
+    model: str,
+    contents: Any,
+    config: Any,
+    item_key: Optional[str] = None,
+    on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+    item_handlers: Optional[Dict[str, Callable[[Dict[str, Any]], None]]] = None,
+) -> StreamedResponse:
+    """
+    Stream a Gemini response, reporting completed array items as they arrive.
+
+    Args:
+        client: Gemini API client (google.genai.Client-compatible)
+        model: Model name
+        contents: Request contents
+        config: GenerateContentConfig for the request
+        item_key: Top-level key whose array items are passed to ``on_item``
+        on_item: Callback invoked with each completed item
+        item_handlers: Callbacks for several arrays at once, by top-level key
+
+    Returns:
+        StreamedResponse with the full response text
+    """
+    handlers = dict(item_handlers or {})
+    if item_key and on_item:
+        handlers[item_key] = on_item
+    scanners = [(JsonArrayItemScanner(key), handler) for key, handler in handlers.items()]
+    parts: List[str] = []
+
+    async for chunk in await client.aio.models.generate_content_stream(
+        model=model,
+        contents=contents,
+        config=config,
+    ):
+        text = chunk.text
+        if not text:
+            continue
+        parts.append(text)
+        for scanner, handler in scanners:
+            for item in scanner.feed(text):
+                handler(item)
+
+    return StreamedResponse(text="".join(parts))
+
+
+def discard_tasks(tasks: Iterable["asyncio.Future"]) -> None:
+    """
+    Cancel prefetch tasks that were never awaited.
+
+    Finished tasks have their exception retrieved so asyncio does not warn
+    about it at garbage collection.
+
+    Args:
+        tasks: Tasks started speculatively while streaming
+    """
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
@@ -1,34 +1,117 @@
 """Configuration constants for the workflow analyzer agent."""
+import os
+from typing import Final, FrozenSet, Tuple
 
 # Model Configuration
 MODEL = "gemini-2.0-flash-exp"
 TEMPERATURE = 0.1  # Low for consistency
 TIMEOUT = 30  # seconds
 
+# Retry of transient Gemini failures (429, 5xx, timeouts, connection resets)
+LLM_MAX_ATTEMPTS = 4
+LLM_RETRY_BASE_DELAY = 0.5  # seconds, doubled after each failed attempt
+LLM_RETRY_MAX_DELAY = 8.0  # seconds
+
+# Gemini requests-per-minute quota and typical call latency. By Little's law
+# the quota is used fully, without 429 backoff, at RPM / 60 * latency calls
+# in flight.
+GEMINI_RPM_QUOTA = int(os.getenv("GEMINI_RPM_QUOTA", "60"))
+LLM_AVG_LATENCY_SECONDS = 4.0
+
+# Maximum number of Gemini calls in flight at once (per orchestrator);
+# LLM_CONCURRENCY overrides the quota-derived default
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("LLM_CONCURRENCY", "0")) or max(
+    1, int(GEMINI_RPM_QUOTA / 60 * LLM_AVG_LATENCY_SECONDS)
+)
+
+# Maximum number of (risk_level, domain) results kept in Agent 2's compliance cache
+COMPLIANCE_CACHE_SIZE = 256
+
+# Maximum number of distinct step descriptions kept in Agent 3's API lookup cache
+API_LOOKUP_CACHE_SIZE = 1024
+
+# Maximum number of normalized descriptions memoized by the lookup_api_docs tool
+TOOL_LOOKUP_CACHE_SIZE = 4096
+
+# Maximum number of Agent 4 summaries cached by a hash of their inputs
+SUMMARY_CACHE_SIZE = 256
+
+# Maximum number of complete analyses cached by their normalized workflow text
+# (0 disables the cache)
+ANALYSIS_CACHE_SIZE = 1024
+
+# Run Agents 2-4 as one fused Gemini call instead of three (opt-in)
+USE_FUSED_ANALYSIS = False
+
+# Run Agents 2 and 3 as one combined Gemini call, keeping Agent 4 separate (opt-in)
+USE_COMBINED_AGENTS_2_3 = False
+
+# Don't wait for the Firestore auto-save before returning an analysis (opt-in;
+# the API reads the saved document back immediately, so it needs the default)
+PERSIST_ANALYSIS_IN_BACKGROUND = False
+
+# Stream Agent 2/3 responses and start tool lookups as each step's JSON completes
+STREAM_LLM_RESPONSES = False
+
+# Declare the lookup tools to Gemini so the model decides which steps need one (opt-in)
+USE_MODEL_TOOL_CALLS = False
+MAX_REMOTE_TOOL_CALLS = 10  # per agent call
+
+# Upload each agent's system prompt once as Gemini cached content (opt-in;
+# prompts below the model's minimum cacheable size fall back to inline)
+USE_CONTEXT_CACHE = False
+CONTEXT_CACHE_TTL_SECONDS = 3600
+
+# Agent 2 splits workflows with more than ROW_MARSHAL_MIN_STEPS steps into
+# concurrent calls of ROW_MARSHAL_SIZE steps each
+ROW_MARSHAL_MIN_STEPS = 200
+ROW_MARSHAL_SIZE = 20
+
+# Combined Agents 2-3 mode: steps per call (0 = the whole workflow in one call,
+# 1 = one concurrent call per step)
+COMBINED_STEPS_PER_CALL = 0
+
+# Gemini Batch API (offline risk assessment of many workflows)
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_MAX_WAIT_SECONDS = 24 * 60 * 60
+
 # Workflow Validation
 MAX_WORKFLOW_LENGTH = 10000  # characters
 MIN_WORKFLOW_LENGTH = 10
 
-# Supported Agent Types
-AGENT_TYPES = ["adk_base", "agentic_rag", "TOOL", "HUMAN"]
+# Warn when a prompt uses more than this share of the model's context window
+MODEL_CONTEXT_WINDOW_TOKENS = 1_048_576
+PROMPT_TOKEN_WARNING_RATIO = 0.8
+
+# Supported Agent Types (set, for membership checks)
+AGENT_TYPES: Final[FrozenSet[str]] = frozenset({"adk_base", "agentic_rag", "TOOL", "HUMAN"})
 
-# Risk Assessment Levels
-RISK_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+# Risk Assessment Levels (set for membership checks; ordered by severity for display/comparison)
+RISK_LEVELS_ORDERED: Final[Tuple[str, ...]] = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+RISK_LEVELS: Final[FrozenSet[str]] = frozenset(RISK_LEVELS_ORDERED)
 
 # Automation Feasibility Threshold
-AUTOMATION_FEASIBLE_THRESHOLD = 0.7
+AUTOMATION_FEASIBLE_THRESHOLD: Final[float] = 0.7
 
 # Logging Configuration
 LOG_LEVEL = "INFO"
-LOG_FORMAT = "json"  # json or text
+LOG_FORMAT = "json"  # json, text or msgpack (opt-in binary sink)
+BINARY_LOG_PATH = "workflow_analyzer.log.msgpack"  # Used when LOG_FORMAT == "msgpack"
+LOG_BUFFERED = False  # Batch JSON log writes to stderr (may lose the last flush interval on a crash)
+LOG_BUFFER_CAPACITY = 256
+LOG_FLUSH_INTERVAL_SECONDS = 0.1
+LOG_DIRECT_TO_STDOUT = False  # Write JSON lines straight to stdout, bypassing the logging module
 
 # Session Configuration
-MAX_SESSION_AGE_HOURS = 24
-ENABLE_SESSION_PERSISTENCE = False
+MAX_SESSION_AGE_HOURS = 24  # Older sessions are evicted from memory
+SESSION_SHARDS = 16  # Independently locked partitions of the in-memory store
+ENABLE_SESSION_PERSISTENCE = False  # Keep sessions in a local SQLite (WAL) database
+SESSION_DB_PATH = "sessions.db"  # Used when ENABLE_SESSION_PERSISTENCE is on
 
 # Tracing Configuration
-ENABLE_DISTRIBUTED_TRACING = True
-TRACE_SAMPLE_RATE = 1.0  # 0.0-1.0, 1.0 = trace all
+ENABLE_DISTRIBUTED_TRACING = os.getenv("TRACING_ENABLED", "1") != "0"  # Spans are no-ops when off
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # 0.0-1.0, 1.0 = trace all
+MAX_SPANS_PER_TRACE = 4096  # Most recent finished spans kept per trace
 
 # Metrics Configuration
 ENABLE_METRICS = True
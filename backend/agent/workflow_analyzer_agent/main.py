@@ -1,18 +1,111 @@
 """Entry point for workflow analyzer - demonstrates usage and testing."""
+import argparse
 import asyncio
-import json
+import os
+import sys
+import time
+import uuid
+from typing import List, Optional, Sequence, Union
+
+import orjson
+
+from .config import MAX_CONCURRENT_LLM_CALLS
 from .orchestrator import WorkflowAnalyzerOrchestrator
+from .types import WorkflowAnalysis
+
+
+async def analyze_batch(
+    orchestrator: WorkflowAnalyzerOrchestrator,
+    texts: Sequence[str],
+    concurrency: int = MAX_CONCURRENT_LLM_CALLS,
+) -> List[Union[WorkflowAnalysis, Exception]]:
+    """
+    Analyze several workflows concurrently.
+
+    At most ``concurrency`` analyses are in flight at once; the orchestrator's
+    own semaphore still bounds concurrent LLM calls across all of them.
 
+    Args:
+        orchestrator: Orchestrator shared by all analyses
+        texts: Workflow texts to analyze
+        concurrency: Maximum number of analyses running at once
 
-async def main():
+    Returns:
+        One result per text, in order; a failed analysis yields its exception
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def analyze(text: str) -> WorkflowAnalysis:
+        async with semaphore:
+            return await orchestrator.analyze_workflow(text)
+
+    start_time = time.perf_counter()
+    with orchestrator.tracer.span(str(uuid.uuid4()), "analyze_batch", "analyze_batch"):
+        results = await asyncio.gather(*(analyze(text) for text in texts), return_exceptions=True)
+    wall_clock_ms = (time.perf_counter() - start_time) * 1000
+
+    sequential_ms = sum(
+        result.analysis_duration_ms for result in results if isinstance(result, WorkflowAnalysis)
+    )
+    orchestrator.logger.info(
+        "Batch analysis completed",
+        workflow_count=len(texts),
+        concurrency=concurrency,
+        wall_clock_ms=wall_clock_ms,
+        sum_of_analysis_ms=sequential_ms
+    )
+    return results
+
+
+async def run_batch(workflow_files: Sequence[str], concurrency: int) -> None:
+    """
+    Analyze the given workflow files concurrently and print one line per file.
+
+    Args:
+        workflow_files: Paths of text files, one workflow each
+        concurrency: Maximum number of analyses running at once
+    """
+    texts = []
+    for path in workflow_files:
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+
+    orchestrator = WorkflowAnalyzerOrchestrator()
+    start_time = time.perf_counter()
+    results = await analyze_batch(orchestrator, texts, concurrency)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    for path, result in zip(workflow_files, results):
+        if isinstance(result, Exception):
+            print(f"{path}: FAILED ({type(result).__name__}: {result})")
+        else:
+            print(
+                f"{path}: {result.summary.total_steps} steps, "
+                f"{result.summary.automatable_count} automatable, "
+                f"{result.analysis_duration_ms:.2f}ms"
+            )
+    print(f"Analyzed {len(texts)} workflows in {elapsed_ms:.2f}ms (concurrency {concurrency})")
+
+
+async def main(workflow_files: Optional[Sequence[str]] = None, concurrency: int = MAX_CONCURRENT_LLM_CALLS):
     """
     Main entry point for workflow analysis.
 
-    Example workflow demonstrating all agent types:
+    With ``workflow_files`` the files are analyzed concurrently (see
+    ``run_batch``); otherwise an example workflow demonstrating all agent
+    types is analyzed and reported in full:
     - Data processing steps (automatable)
     - Human review steps (HUMAN agent)
     - Risk and compliance considerations
+
+    Args:
+        workflow_files: Optional workflow text files to analyze as a batch
+        concurrency: Maximum number of analyses running at once in batch mode
     """
+    if workflow_files:
+        await run_batch(workflow_files, concurrency)
+        return
+
     workflow_text = """
     Step 1: Receive customer email from inbox
     Step 2: Extract key information and parse structure
@@ -95,9 +188,14 @@ async def main():
         print(f"Agent 2 Latency: {metrics['agent_2_risk_latency']}")
         print(f"Agent 3 Latency: {metrics['agent_3_automation_latency']}")
 
-        # Full JSON output
-        print(f"\n--- FULL JSON OUTPUT ---")
-        print(json.dumps(result.dict(), indent=2, default=str))
+        # Full JSON output (opt-in: serializing the whole result is costly)
+        if os.getenv("WFA_EMIT_JSON"):
+            print(f"\n--- FULL JSON OUTPUT ---", flush=True)
+            sys.stdout.buffer.write(orjson.dumps(
+                result.model_dump(),
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE,
+            ))
+            sys.stdout.buffer.flush()
 
         print("\n" + "=" * 70)
         print("ANALYSIS COMPLETED SUCCESSFULLY")
@@ -111,4 +209,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Analyze business workflows.")
+    parser.add_argument("workflow_files", nargs="*", help="Workflow text files to analyze concurrently")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=MAX_CONCURRENT_LLM_CALLS,
+        help="Maximum number of workflows analyzed at once",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.workflow_files, args.concurrency))
@@ -0,0 +1,72 @@
+"""Convert a binary (msgpack) StructuredLogger file back into JSON lines.
+
+Usage:
+    python -m workflow_analyzer_agent.observability.decode_log LOG_FILE > log.jsonl
+"""
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterator
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, only needed for binary logs
+    msgpack = None
+
+# Keys whose string values StructuredLogger interns in binary logs
+_INTERNED_KEYS = ("level", "message", "logger")
+
+# Key of the record StructuredLogger writes at the start of each segment
+_SEGMENT_HEADER_KEY = "binary_log_segment"
+
+
+def decode_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the log entries of a binary log file with interned strings restored.
+
+    String ids restart at each segment header (each time a logger process
+    opened the file for appending).
+
+    Args:
+        path: File written by ``StructuredLogger(binary=True)``
+
+    Yields:
+        Log entry dictionaries as the JSON logger would have written them
+
+    Raises:
+        RuntimeError: If msgpack is not installed
+    """
+    if msgpack is None:
+        raise RuntimeError("Decoding binary logs requires the msgpack package")
+    strings: Dict[int, str] = {}
+    with open(path, "rb") as f:
+        for entry in msgpack.Unpacker(f, raw=False, timestamp=3):
+            if _SEGMENT_HEADER_KEY in entry:
+                strings = {}
+                continue
+            for key in _INTERNED_KEYS:
+                value = entry.get(key)
+                if isinstance(value, list):
+                    value, string_id = value
+                    strings[string_id] = value
+                    entry[key] = value
+                elif isinstance(value, int):
+                    entry[key] = strings[value]
+            timestamp = entry.get("timestamp")
+            if isinstance(timestamp, datetime):
+                entry["timestamp"] = timestamp.isoformat()
+            yield entry
+
+
+def main() -> None:
+    """Decode the file named on the command line to stdout."""
+    if len(sys.argv) != 2:
+        sys.exit(f"usage: {sys.argv[0]} LOG_FILE")
+    out = sys.stdout.buffer
+    for entry in decode_records(sys.argv[1]):
+        out.write(orjson.dumps(entry, default=str) + b"\n")
+
+
+if __name__ == "__main__":
+    main()
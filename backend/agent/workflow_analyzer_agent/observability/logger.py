@@ -1,8 +1,154 @@
 """Structured logging module for JSON-formatted logs."""
-import json
+import atexit
 import logging
-from datetime import datetime
-from typing import Any, Dict
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+import orjson
+
+# (time.time() of the last refresh, its ISO 8601 UTC rendering)
+_cached_timestamp: Tuple[float, str] = (0.0, "")
+
+
+def utc_now_iso() -> str:
+    """
+    Return the current UTC time as an ISO 8601 string, refreshed once per millisecond.
+
+    Records emitted within the same millisecond share one formatted timestamp
+    instead of each constructing and formatting a datetime.
+
+    Returns:
+        Timestamp such as ``2024-01-01T12:00:00.123456+00:00``
+    """
+    global _cached_timestamp
+    now = time.time()
+    last, formatted = _cached_timestamp
+    if now - last >= 1e-3 or now < last:
+        formatted = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        # Swapped as one tuple so concurrent threads never see a torn pair
+        _cached_timestamp = (now, formatted)
+    return formatted
+
+
+# Keys whose (highly repetitive) string values are interned in binary logs
+_INTERNED_KEYS = ("level", "message", "logger")
+
+# Record starting a segment of a binary log; string ids restart after it
+_SEGMENT_HEADER = {"binary_log_segment": 1}
+
+
+class _BinaryFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes log entries (``record.msg`` dicts) as msgpack.
+
+    The file is opened for appending, and every time it is (re)opened a
+    segment header record is written and the string table restarts, so a
+    file appended to by successive handlers still decodes. Interning and
+    writing both happen under the handler lock, so a string's defining record
+    always precedes the records that refer to it by id.
+    """
+
+    def __init__(self, filename: str, packb: Callable[..., bytes]):
+        self._packb = packb
+        self._intern_ids: Dict[str, int] = {}
+        super().__init__(filename, mode="ab")
+
+    def _open(self):
+        stream = super()._open()
+        self._intern_ids = {}
+        stream.write(self._packb(_SEGMENT_HEADER))
+        return stream
+
+    def _intern(self, value: str) -> Any:
+        """Return ``value``'s id, or ``[value, id]`` the first time it is seen."""
+        string_id = self._intern_ids.get(value)
+        if string_id is not None:
+            return string_id
+        string_id = self._intern_ids[value] = len(self._intern_ids)
+        return [value, string_id]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            log_entry = record.msg
+            for key in _INTERNED_KEYS:
+                value = log_entry.get(key)
+                if isinstance(value, str):
+                    log_entry[key] = self._intern(value)
+            self.stream.write(self._packb(log_entry, use_bin_type=True, datetime=True))
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+# One handler (and so one string table) per binary log file in this process
+_binary_handlers: Dict[str, _BinaryFileHandler] = {}
+_binary_handlers_lock = threading.Lock()
+
+
+def _binary_handler_for(path: str, packb: Callable[..., bytes]) -> _BinaryFileHandler:
+    """Return the shared binary handler for ``path``, creating it on first use."""
+    path = os.path.abspath(path)
+    with _binary_handlers_lock:
+        handler = _binary_handlers.get(path)
+        if handler is None:
+            handler = _binary_handlers[path] = _BinaryFileHandler(path, packb)
+        return handler
+
+
+class _BufferedStreamHandler(logging.handlers.MemoryHandler):
+    """
+    MemoryHandler that writes its buffered records to a stream in one write.
+
+    Records are held in memory until the buffer fills, an ERROR (or worse)
+    record arrives, or the background thread's periodic flush runs; each
+    flush then costs one ``write()`` instead of one per record. The trade-off:
+    up to ``flush_interval`` seconds of records can be lost on a hard crash.
+    """
+
+    def __init__(self, capacity: int, flush_interval: float, stream=None):
+        super().__init__(
+            capacity,
+            flushLevel=logging.ERROR,
+            target=logging.StreamHandler(stream or sys.stderr),
+        )
+        self._stop = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-flush",
+            daemon=True,
+        )
+        self._flush_thread.start()
+        atexit.register(self.flush)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.buffer or self.target is None:
+                return
+            records, self.buffer = self.buffer, []
+            target = self.target
+            try:
+                target.stream.write("".join(
+                    target.format(record) + target.terminator for record in records
+                ))
+                target.flush()
+            except Exception:
+                self.handleError(records[-1])
+
+    def close(self) -> None:
+        self._stop.set()
+        super().close()
 
 
 class StructuredLogger:
@@ -14,17 +160,87 @@ class StructuredLogger:
     - level: Log level (INFO, DEBUG, WARNING, ERROR)
     - message: The log message
     - Additional context from kwargs
+
+    With ``binary=True`` entries are instead written as msgpack to a
+    dedicated file (see ``decode_log.py`` to turn it back into JSON lines).
+    Level, message and logger strings are interned: their first occurrence is
+    written as ``[string, id]`` and later ones as the bare integer ``id``.
+    Loggers in one process that share a file share its string table; the
+    file is appended to, so separate processes need separate files.
+
+    With ``buffered=True`` JSON records go to stderr through an in-memory
+    buffer that is written out in batches (at least every ``flush_interval``
+    seconds, and immediately for errors) instead of one write per record.
+
+    With ``stream`` set, JSON lines are written as bytes straight to that
+    stream, bypassing the ``logging`` record/handler machinery entirely;
+    records below ``level`` are dropped with one integer comparison.
     """
 
-    def __init__(self, name: str = "workflow-analyzer"):
+    def __init__(
+        self,
+        name: str = "workflow-analyzer",
+        binary: bool = False,
+        binary_path: Optional[str] = None,
+        buffered: bool = False,
+        buffer_capacity: int = 256,
+        flush_interval: float = 0.1,
+        stream: Optional[BinaryIO] = None,
+        level: Optional[int] = None,
+    ):
         """
         Initialize the structured logger.
 
         Args:
             name: Logger name for identification
+            binary: Write msgpack records to a file instead of JSON text
+            binary_path: File for binary records (default: ``<name>.log.msgpack``)
+            buffered: Write JSON records to stderr in batches through a memory buffer
+            buffer_capacity: Records buffered before a flush is forced
+            flush_interval: Seconds between background flushes of the buffer
+            stream: Binary stream (e.g. ``sys.stdout.buffer``) to write JSON
+                lines to directly instead of going through ``logging``
+            level: Minimum level written to ``stream`` (default: the
+                ``logging`` logger's effective level)
+
+        Raises:
+            RuntimeError: If ``binary`` is set but msgpack is not installed
+            ValueError: If both ``binary`` and ``stream`` are set
         """
+        if binary and stream is not None:
+            raise ValueError("binary and stream sinks are mutually exclusive")
         self.name = name
         self.logger = logging.getLogger(name)
+        self.binary = binary
+        self._stream = stream
+        self._stream_threshold = self.logger.getEffectiveLevel() if level is None else level
+        self._binary_handler: Optional[_BinaryFileHandler] = None
+        if binary:
+            try:
+                import msgpack
+            except ImportError as e:
+                raise RuntimeError("Binary logging requires the msgpack package") from e
+            self._binary_handler = _binary_handler_for(
+                binary_path or f"{name}.log.msgpack", msgpack.packb
+            )
+        elif buffered and not any(
+            isinstance(handler, _BufferedStreamHandler) for handler in self.logger.handlers
+        ):
+            # Replaces propagation to the root handlers rather than duplicating them
+            self.logger.addHandler(_BufferedStreamHandler(buffer_capacity, flush_interval))
+            self.logger.propagate = False
+        # Pre-rendered record for calls without context (only the
+        # timestamp, level and message vary).
+        self._plain_template = (
+            '{"timestamp":"%s","level":"%s","message":%s,"logger":'
+            + orjson.dumps(name).decode().replace("%", "%%")
+            + "}"
+        )
+        self._plain_template_bytes = (
+            b'{"timestamp":"%s","level":"%s","message":%s,"logger":'
+            + orjson.dumps(name).replace(b"%", b"%%")
+            + b"}\n"
+        )
 
     def _format_log(self, level: str, message: str, **kwargs) -> str:
         """
@@ -38,15 +254,115 @@ class StructuredLogger:
         Returns:
             JSON-formatted log string
         """
+        timestamp = utc_now_iso()
+        if not kwargs:
+            return self._plain_template % (timestamp, level, orjson.dumps(message).decode())
+
         log_entry: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
             "level": level,
             "message": message,
             "logger": self.name,
         }
         # Add any additional context
         log_entry.update(kwargs)
-        return json.dumps(log_entry)
+        return orjson.dumps(log_entry).decode()
+
+    def _format_log_bytes(self, level: str, message: str, kwargs: Dict[str, Any]) -> bytes:
+        """
+        Format a log entry as a newline-terminated JSON line, in bytes.
+
+        Args:
+            level: Log level
+            message: Log message
+            kwargs: Additional context
+
+        Returns:
+            UTF-8 JSON line, ready to write to a binary stream
+        """
+        timestamp = utc_now_iso()
+        if not kwargs:
+            return self._plain_template_bytes % (
+                timestamp.encode(), level.encode(), orjson.dumps(message)
+            )
+
+        log_entry: Dict[str, Any] = {
+            "timestamp": timestamp,
+            "level": level,
+            "message": message,
+            "logger": self.name,
+        }
+        log_entry.update(kwargs)
+        return orjson.dumps(log_entry, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _emit_binary(self, level: int, level_name: str, message: str, kwargs: Dict[str, Any]) -> None:
+        """
+        Hand a log entry to the binary sink, which interns and packs it.
+
+        Args:
+            level: ``logging`` level constant
+            level_name: Log level name
+            message: Log message
+            kwargs: Additional context
+        """
+        log_entry: Dict[str, Any] = {
+            "timestamp": datetime.now(timezone.utc),
+            "level": level_name,
+            "message": message,
+            "logger": self.name,
+        }
+        log_entry.update(kwargs)
+        record = self.logger.makeRecord(self.name, level, "", 0, log_entry, None, None)
+        self._binary_handler.handle(record)
+
+    def close(self) -> None:
+        """
+        Flush the direct stream and close the binary sink, if any.
+
+        The binary sink is shared by loggers writing to the same file; if one
+        of them logs again, the file is reopened and a new segment started.
+        """
+        if self._stream is not None:
+            self._stream.flush()
+        if self._binary_handler is not None:
+            self._binary_handler.close()
+
+    def isEnabledFor(self, level: int) -> bool:
+        """
+        Check whether messages at ``level`` would be emitted.
+
+        Lets callers skip building expensive log context up front.
+
+        Args:
+            level: A ``logging`` level constant (e.g. ``logging.DEBUG``)
+
+        Returns:
+            True if the underlying logger (or direct stream) handles this level
+        """
+        if self._stream is not None:
+            return level >= self._stream_threshold
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level: int, level_name: str, message: str, kwargs: Dict[str, Any]) -> None:
+        """
+        Dispatch a message to the direct stream, the binary sink or ``logging``.
+
+        Args:
+            level: ``logging`` level constant
+            level_name: Log level name
+            message: Log message
+            kwargs: Additional context
+        """
+        if self._stream is not None:
+            if level >= self._stream_threshold:
+                self._stream.write(self._format_log_bytes(level_name, message, kwargs))
+            return
+        if not self.logger.isEnabledFor(level):
+            return
+        if self._binary_handler is not None:
+            self._emit_binary(level, level_name, message, kwargs)
+            return
+        self.logger.log(level, self._format_log(level_name, message, **kwargs))
 
     def info(self, msg: str, **kwargs) -> None:
         """
@@ -56,8 +372,7 @@ class StructuredLogger:
             msg: The log message
             **kwargs: Additional context to include in the log
         """
-        formatted = self._format_log("INFO", msg, **kwargs)
-        self.logger.info(formatted)
+        self._log(logging.INFO, "INFO", msg, kwargs)
 
     def debug(self, msg: str, **kwargs) -> None:
         """
@@ -67,8 +382,7 @@ class StructuredLogger:
             msg: The log message
             **kwargs: Additional context to include in the log
         """
-        formatted = self._format_log("DEBUG", msg, **kwargs)
-        self.logger.debug(formatted)
+        self._log(logging.DEBUG, "DEBUG", msg, kwargs)
 
     def warning(self, msg: str, **kwargs) -> None:
         """
@@ -78,8 +392,7 @@ class StructuredLogger:
             msg: The log message
             **kwargs: Additional context to include in the log
         """
-        formatted = self._format_log("WARNING", msg, **kwargs)
-        self.logger.warning(formatted)
+        self._log(logging.WARNING, "WARNING", msg, kwargs)
 
     def error(self, msg: str, **kwargs) -> None:
         """
@@ -89,5 +402,4 @@ class StructuredLogger:
             msg: The log message
             **kwargs: Additional context to include in the log
         """
-        formatted = self._format_log("ERROR", msg, **kwargs)
-        self.logger.error(formatted)
+        self._log(logging.ERROR, "ERROR", msg, kwargs)
@@ -1,7 +1,88 @@
 """Metrics collection and aggregation module."""
+import math
 from collections import defaultdict
-from typing import Any, Dict, List
-from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from .logger import utc_now_iso
+
+# Summary entries for series and tools with no data yet (copied, never returned)
+_EMPTY_STATS: Dict[str, float] = {
+    "count": 0,
+    "min": 0.0,
+    "max": 0.0,
+    "avg": 0.0,
+    "total": 0.0,
+}
+_EMPTY_TOOL_METRICS: Dict[str, int] = {"call_count": 0}
+
+
+# Latencies are bucketed at microsecond resolution with 2**_SUB_BUCKET_BITS
+# buckets per power of two, i.e. under 0.1% relative error (the layout of an
+# HdrHistogram with 3 significant digits).
+_SUB_BUCKET_BITS = 10
+
+
+class _LatencyHistogram:
+    """
+    Running aggregate of one latency series.
+
+    Count, total, min and max are exact and updated as each sample is
+    recorded; percentiles are read from a log-linear histogram of bucket
+    counts. Memory is bounded by the range of values seen rather than the
+    number of samples, and summaries cost O(#buckets).
+    """
+
+    __slots__ = ("count", "total", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.clear()
+
+    def append(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        # Keep the top _SUB_BUCKET_BITS + 1 bits of the value in microseconds
+        micros = int(value * 1000)
+        shift = micros.bit_length() - _SUB_BUCKET_BITS - 1
+        if shift > 0:
+            micros = micros >> shift << shift
+        buckets = self._buckets
+        buckets[micros] = buckets.get(micros, 0) + 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def values_at_ranks(self, ranks: Sequence[int]) -> List[float]:
+        """
+        Return the values at the given 0-based ranks (ascending) in sorted order.
+
+        Each value is its bucket's lower bound clamped to [min, max], so it is
+        exact for single-valued series and within 0.1% otherwise.
+        """
+        values = []
+        buckets = self._buckets
+        wanted = iter(ranks)
+        rank = next(wanted, None)
+        seen = 0
+        for micros in sorted(buckets):
+            seen += buckets[micros]
+            while rank is not None and rank < seen:
+                values.append(min(max(micros / 1000, self.min), self.max))
+                rank = next(wanted, None)
+            if rank is None:
+                break
+        return values
+
+    def clear(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buckets: Dict[int, int] = {}
 
 
 class MetricsCollector:
@@ -12,15 +93,27 @@ class MetricsCollector:
     - Agent latencies
     - Tool call counts and durations
     - Overall analysis metrics
+
+    Every series is aggregated as it is recorded rather than kept as raw
+    samples: tool calls as counts and totals, latencies as running
+    count/total/min/max plus a histogram for the median and tail percentiles.
+    Memory per series is therefore constant and ``get_summary`` does not
+    depend on how many samples were recorded.
     """
 
     def __init__(self):
         """Initialize metrics collector."""
         self.analyses_total = 0
-        self.agent_1_parser_latency: List[float] = []
-        self.agent_2_risk_latency: List[float] = []
-        self.agent_3_automation_latency: List[float] = []
-        self.tool_calls: Dict[str, List[float]] = defaultdict(list)
+        self.agent_1_parser_latency = _LatencyHistogram()
+        self.agent_2_risk_latency = _LatencyHistogram()
+        self.agent_3_automation_latency = _LatencyHistogram()
+        self._record_latency_for = {
+            "agent_1": self.agent_1_parser_latency.append,
+            "agent_2": self.agent_2_risk_latency.append,
+            "agent_3": self.agent_3_automation_latency.append,
+        }
+        self._tool_call_count: Dict[str, int] = defaultdict(int)
+        self._tool_total_ms: Dict[str, float] = defaultdict(float)
 
     def record_latency(self, agent: str, latency_ms: float) -> None:
         """
@@ -33,14 +126,10 @@ class MetricsCollector:
         if latency_ms < 0:
             raise ValueError("Latency cannot be negative")
 
-        if agent == "agent_1":
-            self.agent_1_parser_latency.append(latency_ms)
-        elif agent == "agent_2":
-            self.agent_2_risk_latency.append(latency_ms)
-        elif agent == "agent_3":
-            self.agent_3_automation_latency.append(latency_ms)
-        else:
+        record = self._record_latency_for.get(agent)
+        if record is None:
             raise ValueError(f"Unknown agent: {agent}")
+        record(latency_ms)
 
     def record_tool_call(self, tool_name: str, duration_ms: float) -> None:
         """
@@ -53,7 +142,8 @@ class MetricsCollector:
         if duration_ms < 0:
             raise ValueError("Duration cannot be negative")
 
-        self.tool_calls[tool_name].append(duration_ms)
+        self._tool_call_count[tool_name] += 1
+        self._tool_total_ms[tool_name] += duration_ms
 
     def record_analysis(self, session: Any) -> None:
         """
@@ -72,10 +162,13 @@ class MetricsCollector:
         if session.agent3_latency > 0:
             self.record_latency("agent_3", session.agent3_latency)
 
-        # Record tool calls from session
-        for tool_call in session.tool_calls:
-            if "tool_name" in tool_call and "duration_ms" in tool_call:
-                self.record_tool_call(tool_call["tool_name"], tool_call["duration_ms"])
+        # Record tool calls from session (validated by SessionState.add_tool_call)
+        if session.tool_call_timings:
+            call_count = self._tool_call_count
+            total_ms = self._tool_total_ms
+            for tool_name, duration_ms in session.tool_call_timings:
+                call_count[tool_name] += 1
+                total_ms[tool_name] += duration_ms
 
     def get_summary(self) -> Dict[str, Any]:
         """
@@ -84,51 +177,58 @@ class MetricsCollector:
         Returns:
             Dictionary with aggregated metrics
         """
-        def calculate_stats(values: List[float]) -> Dict[str, float]:
-            """Calculate min, max, avg, median for a list of values."""
-            if not values:
-                return {
-                    "count": 0,
-                    "min": 0.0,
-                    "max": 0.0,
-                    "avg": 0.0,
-                    "total": 0.0,
-                }
-
-            sorted_values = sorted(values)
+        def calculate_stats(series: _LatencyHistogram) -> Dict[str, float]:
+            """Read count, min, max, avg and percentiles off a latency aggregate."""
+            count = series.count
+            if not count:
+                return _EMPTY_STATS.copy()
+
+            # Upper median (the middle element for odd counts) and
+            # nearest-rank tail percentiles
+            median, p95, p99 = series.values_at_ranks((
+                count // 2,
+                math.ceil(count * 0.95) - 1,
+                math.ceil(count * 0.99) - 1,
+            ))
             return {
-                "count": len(values),
-                "min": min(values),
-                "max": max(values),
-                "avg": sum(values) / len(values),
-                "total": sum(values),
-                "median": sorted_values[len(sorted_values) // 2],
+                "count": count,
+                "min": series.min,
+                "max": series.max,
+                "avg": series.total / count,
+                "total": series.total,
+                "median": median,
+                "p95": p95,
+                "p99": p99,
             }
 
         # Calculate tool call metrics
         tool_metrics = {}
-        for tool_name, durations in self.tool_calls.items():
+        for tool_name, call_count in self._tool_call_count.items():
+            total_duration = self._tool_total_ms[tool_name]
             tool_metrics[tool_name] = {
-                "call_count": len(durations),
-                "total_duration_ms": sum(durations),
-                "avg_duration_ms": sum(durations) / len(durations) if durations else 0,
+                "call_count": call_count,
+                "total_duration_ms": total_duration,
+                "avg_duration_ms": total_duration / call_count,
             }
 
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "analyses_total": self.analyses_total,
             "agent_1_parser_latency": calculate_stats(self.agent_1_parser_latency),
             "agent_2_risk_latency": calculate_stats(self.agent_2_risk_latency),
             "agent_3_automation_latency": calculate_stats(self.agent_3_automation_latency),
-            "tool_api_lookup_calls": tool_metrics.get("api_lookup", {"call_count": 0}),
-            "tool_compliance_calls": tool_metrics.get("compliance_checker", {"call_count": 0}),
+            # Defaults are only copied when the tool has not been called
+            "tool_api_lookup_calls": tool_metrics.get("api_lookup") or _EMPTY_TOOL_METRICS.copy(),
+            "tool_compliance_calls": tool_metrics.get("compliance_checker") or _EMPTY_TOOL_METRICS.copy(),
             "all_tool_calls": tool_metrics,
         }
 
     def reset(self) -> None:
         """Reset all metrics to initial state."""
         self.analyses_total = 0
+        # Cleared in place: _record_latency_for holds their bound append methods.
         self.agent_1_parser_latency.clear()
         self.agent_2_risk_latency.clear()
         self.agent_3_automation_latency.clear()
-        self.tool_calls.clear()
+        self._tool_call_count.clear()
+        self._tool_total_ms.clear()
@@ -1,14 +1,47 @@
 """Distributed tracing module for tracking operation spans."""
+import logging
 import time
-from contextlib import contextmanager
+import zlib
+from array import array
 from datetime import datetime
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, ContextManager, Dict, List, Optional
+
+from ..config import MAX_SPANS_PER_TRACE
+
+logger = logging.getLogger(__name__)
+
+_now_ns = time.perf_counter_ns
+
+# Spans are timed with perf_counter_ns only; wall-clock times are derived from
+# this (time.time(), perf_counter_ns()) pair when they are exported.
+_WALL_ANCHOR = time.time()
+_PERF_ANCHOR_NS = _now_ns()
+
+
+def _wall_time(perf_ns: int) -> float:
+    """Convert a perf_counter_ns() reading to a time.time()-style timestamp."""
+    return _WALL_ANCHOR + (perf_ns - _PERF_ANCHOR_NS) / 1_000_000_000
 
 
 class Span:
-    """Represents a single span in distributed tracing."""
+    """
+    Represents a single span in distributed tracing.
 
-    def __init__(self, span_id: str, operation: str, trace_id: str):
+    A span is its own context manager: entering it starts the clock and
+    exiting it records the span in its trace's storage. A plain class rather
+    than a ``@contextmanager`` generator, so each ``with`` costs no generator
+    or frame setup.
+    """
+
+    __slots__ = ("span_id", "operation", "trace_id", "start_ns", "end_ns", "status", "_spans")
+
+    def __init__(
+        self,
+        span_id: str,
+        operation: str,
+        trace_id: str,
+        spans: Optional["_TraceSpans"] = None
+    ):
         """
         Initialize a span.
 
@@ -16,51 +49,217 @@ class Span:
             span_id: Unique identifier for this span
             operation: Name of the operation being traced
             trace_id: Identifier linking this span to a trace
+            spans: Storage the span is recorded in when its ``with`` block
+                exits (None records nothing)
         """
         self.span_id = span_id
         self.operation = operation
         self.trace_id = trace_id
-        self.start_time: Optional[float] = None
-        self.end_time: Optional[float] = None
-        self.duration_ms: float = 0.0
+        # perf_counter_ns() readings; 0 until the span starts/ends
+        self.start_ns = 0
+        self.end_ns = 0
         self.status: str = "pending"
+        self._spans = spans
+
+    def __enter__(self) -> "Span":
+        self.status = "running"
+        self.start_ns = _now_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.end_ns = _now_ns()
+        if exc_type is None:
+            self.status = "success"
+        elif issubclass(exc_type, Exception):
+            self.status = f"error: {exc_type.__name__}"
+        if self._spans is not None:
+            self._spans.append(self)
+        return False
 
-    def to_dict(self) -> Dict[str, Any]:
+    @property
+    def start_time(self) -> Optional[float]:
+        """Wall-clock start (time.time() scale), None until started."""
+        return _wall_time(self.start_ns) if self.start_ns else None
+
+    @property
+    def end_time(self) -> Optional[float]:
+        """Wall-clock end (time.time() scale), None until finished."""
+        return _wall_time(self.end_ns) if self.end_ns else None
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration in milliseconds, 0.0 until finished."""
+        return (self.end_ns - self.start_ns) / 1_000_000 if self.end_ns else 0.0
+
+    def to_dict(self, include_timestamps: bool = True) -> Dict[str, Any]:
         """
         Convert span to dictionary representation.
 
+        Args:
+            include_timestamps: Format ``start_time``/``end_time`` as ISO strings;
+                callers that only need durations can skip that work
+
         Returns:
             Dictionary with span data
         """
-        return {
+        data = {
             "span_id": self.span_id,
             "trace_id": self.trace_id,
             "operation": self.operation,
             "duration_ms": self.duration_ms,
             "status": self.status,
-            "start_time": datetime.fromtimestamp(self.start_time).isoformat() if self.start_time else None,
-            "end_time": datetime.fromtimestamp(self.end_time).isoformat() if self.end_time else None,
         }
+        if include_timestamps:
+            start_time, end_time = self.start_time, self.end_time
+            data["start_time"] = datetime.fromtimestamp(start_time).isoformat() if start_time else None
+            data["end_time"] = datetime.fromtimestamp(end_time).isoformat() if end_time else None
+        return data
+
+
+class _TraceSpans:
+    """
+    Finished spans of one trace, stored column-wise.
+
+    One parallel array/list per field instead of one ``Span`` object per span;
+    row ``i`` of every column describes the i-th finished span. The columns
+    form a ring buffer: once ``capacity`` spans are held, each new span
+    overwrites the oldest one and is counted in ``dropped``.
+    """
+
+    __slots__ = (
+        "span_ids", "operations", "starts_ns", "durations_ns", "statuses",
+        "capacity", "dropped", "_next",
+    )
+
+    def __init__(self, capacity: int = MAX_SPANS_PER_TRACE):
+        self.span_ids: List[str] = []
+        self.operations: List[str] = []
+        self.starts_ns = array("q")  # perf_counter_ns() readings
+        self.durations_ns = array("q")
+        self.statuses: List[str] = []
+        self.capacity = capacity
+        self.dropped = 0
+        self._next = 0  # row overwritten next once full (the oldest one)
+
+    def append(self, span: Span) -> None:
+        """Record a finished span, overwriting the oldest one when full."""
+        if len(self.span_ids) < self.capacity:
+            self.span_ids.append(span.span_id)
+            self.operations.append(span.operation)
+            self.starts_ns.append(span.start_ns)
+            self.durations_ns.append(span.end_ns - span.start_ns)
+            self.statuses.append(span.status)
+            return
+
+        i = self._next
+        self.span_ids[i] = span.span_id
+        self.operations[i] = span.operation
+        self.starts_ns[i] = span.start_ns
+        self.durations_ns[i] = span.end_ns - span.start_ns
+        self.statuses[i] = span.status
+        self._next = (i + 1) % self.capacity
+        self.dropped += 1
+        if self.dropped == 1:
+            logger.warning(
+                "Trace %s exceeded %d spans; dropping its oldest spans",
+                span.trace_id, self.capacity
+            )
+
+    def ordered(self, column):
+        """Return ``column`` oldest row first."""
+        i = self._next
+        return column[i:] + column[:i] if i else column
+
+    def __len__(self) -> int:
+        return len(self.span_ids)
+
+
+class _NoopSpan:
+    """Shared stand-in yielded by ``DistributedTracer.span`` when tracing is disabled."""
+
+    __slots__ = ()
+
+    span_id = ""
+    operation = ""
+    trace_id = ""
+    start_ns = 0
+    end_ns = 0
+    start_time = None
+    end_time = None
+    duration_ms = 0.0
+    status = "disabled"
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
 
 
 class DistributedTracer:
     """
     Tracks distributed traces across multiple operations and agents.
 
-    Stores spans grouped by trace_id for correlation analysis.
+    Stores spans grouped by trace_id for correlation analysis. Spans in flight
+    are ``Span`` objects; finished spans are kept column-wise per trace. When
+    disabled, or for traces left out by sampling, ``span`` returns a shared
+    no-op context manager and nothing is allocated or timed.
     """
 
-    def __init__(self):
-        """Initialize the tracer with empty trace storage."""
-        self._traces: Dict[str, List[Span]] = {}
+    def __init__(self, enabled: bool = True, sample_rate: float = 1.0):
+        """
+        Initialize the tracer with empty trace storage.
+
+        Args:
+            enabled: Record spans (False makes ``span`` and ``start_trace`` no-ops)
+            sample_rate: Fraction of traces recorded (0.0-1.0). The decision is
+                derived from the trace_id, so a trace is kept or dropped whole.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        # crc32 values below this are sampled
+        self._sample_threshold = int(sample_rate * 0x1_0000_0000)
+        self._traces: Dict[str, _TraceSpans] = {}
+
+    def _sampled(self, trace_id: str) -> bool:
+        """Whether spans of ``trace_id`` are recorded (tracing enabled and sampled in)."""
+        if not self.enabled:
+            return False
+        if self._sample_threshold > 0xFFFF_FFFF:
+            return True
+        return zlib.crc32(trace_id.encode()) < self._sample_threshold
+
+    def start_trace(self, trace_id: str) -> Optional[_TraceSpans]:
+        """
+        Allocate span storage for a new trace.
+
+        Calling this when a trace begins keeps the per-span path in ``span``
+        to a single dictionary lookup; traces that were not started are
+        allocated on their first span.
+
+        Args:
+            trace_id: The trace identifier
+
+        Returns:
+            The (empty) span storage for the trace, or None when disabled or
+            not sampled
+        """
+        if not self._sampled(trace_id):
+            return None
+        spans = self._traces[trace_id] = _TraceSpans()
+        return spans
 
-    @contextmanager
     def span(
         self,
         trace_id: str,
         span_id: str,
         operation: str
-    ) -> Generator[Span, None, None]:
+    ) -> ContextManager[Span]:
         """
         Context manager for tracking operation spans.
 
@@ -69,48 +268,60 @@ class DistributedTracer:
             span_id: Unique span identifier
             operation: Name of the operation
 
-        Yields:
-            Span object being tracked
+        Returns:
+            Context manager yielding the Span being tracked (a shared no-op
+            span when tracing is disabled or the trace is not sampled)
 
         Example:
             with tracer.span("trace-123", "span-456", "parse_workflow"):
                 # operation code here
                 pass
         """
-        span = Span(span_id, operation, trace_id)
-
-        # Initialize trace list if needed
-        if trace_id not in self._traces:
-            self._traces[trace_id] = []
-
-        # Record start
-        span.start_time = time.time()
-        span.status = "running"
+        if not self.enabled:
+            return _NOOP_SPAN
+        # Storage is normally allocated up front by start_trace; started
+        # (sampled) traces skip the sampling check
+        spans = self._traces.get(trace_id)
+        if spans is None:
+            spans = self.start_trace(trace_id)
+            if spans is None:
+                return _NOOP_SPAN
+        return Span(span_id, operation, trace_id, spans)
 
-        try:
-            yield span
-            span.status = "success"
-        except Exception as e:
-            span.status = f"error: {type(e).__name__}"
-            raise
-        finally:
-            # Record end and calculate duration
-            span.end_time = time.time()
-            span.duration_ms = (span.end_time - span.start_time) * 1000
-            self._traces[trace_id].append(span)
-
-    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+    def get_trace(self, trace_id: str, include_timestamps: bool = True) -> List[Dict[str, Any]]:
         """
         Retrieve all spans for a trace.
 
         Args:
             trace_id: The trace identifier
+            include_timestamps: Format ``start_time``/``end_time`` as ISO strings
 
         Returns:
-            List of span dictionaries
+            List of span dictionaries, oldest first (at most the last
+            ``MAX_SPANS_PER_TRACE`` spans of the trace)
         """
-        spans = self._traces.get(trace_id, [])
-        return [span.to_dict() for span in spans]
+        spans = self._traces.get(trace_id)
+        if spans is None:
+            return []
+
+        trace = []
+        ordered = spans.ordered
+        for span_id, operation, start_ns, duration_ns, status in zip(
+            ordered(spans.span_ids), ordered(spans.operations), ordered(spans.starts_ns),
+            ordered(spans.durations_ns), ordered(spans.statuses)
+        ):
+            span = {
+                "span_id": span_id,
+                "trace_id": trace_id,
+                "operation": operation,
+                "duration_ms": duration_ns / 1_000_000,
+                "status": status,
+            }
+            if include_timestamps:
+                span["start_time"] = datetime.fromtimestamp(_wall_time(start_ns)).isoformat()
+                span["end_time"] = datetime.fromtimestamp(_wall_time(start_ns + duration_ns)).isoformat()
+            trace.append(span)
+        return trace
 
     def get_trace_summary(self, trace_id: str) -> Dict[str, Any]:
         """
@@ -120,21 +331,21 @@ class DistributedTracer:
             trace_id: The trace identifier
 
         Returns:
-            Dictionary with trace summary (total duration, span count, etc.)
+            Dictionary with trace summary (total duration, span count, etc.).
+            Statistics cover the retained spans; ``dropped_spans`` counts the
+            older ones overwritten once the trace exceeded its span limit.
         """
-        spans = self._traces.get(trace_id, [])
+        spans = self._traces.get(trace_id)
         if not spans:
-            return {"trace_id": trace_id, "span_count": 0, "total_duration_ms": 0.0}
-
-        total_duration = sum(span.duration_ms for span in spans)
-        successful_spans = sum(1 for span in spans if span.status == "success")
+            return {"trace_id": trace_id, "span_count": 0, "total_duration_ms": 0.0, "dropped_spans": 0}
 
         return {
             "trace_id": trace_id,
             "span_count": len(spans),
-            "successful_spans": successful_spans,
-            "total_duration_ms": total_duration,
-            "operations": [span.operation for span in spans],
+            "successful_spans": spans.statuses.count("success"),
+            "total_duration_ms": sum(spans.durations_ns) / 1_000_000,
+            "operations": list(spans.ordered(spans.operations)),
+            "dropped_spans": spans.dropped,
         }
 
     def clear_trace(self, trace_id: str) -> None:
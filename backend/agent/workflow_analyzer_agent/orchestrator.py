@@ -1,9 +1,14 @@
 """Main orchestrator for workflow analysis - coordinates all agents."""
 import asyncio
-import json
+import hashlib
+import logging
 import os
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Optional, Set
 
 from dotenv import load_dotenv
 
@@ -15,10 +20,46 @@ load_dotenv()
 
 from .session import SessionState, SessionManager
 from .observability import StructuredLogger, DistributedTracer, MetricsCollector
-from .agents import WorkflowParserAgent, RiskAssessorAgent, AutomationAnalyzerAgent, AutomationSummarizerAgent
+from .agents import (
+    WorkflowParserAgent,
+    RiskAssessorAgent,
+    AutomationAnalyzerAgent,
+    AutomationSummarizerAgent,
+    FusedAnalyzerAgent,
+)
 from .tools import lookup_api_docs, get_compliance_rules
 from .types import WorkflowAnalysis, KeyInsight, AutomationSummary, WorkflowStep
-from .config import MODEL, AUTOMATION_FEASIBLE_THRESHOLD
+from .config import (
+    MODEL,
+    ANALYSIS_CACHE_SIZE,
+    AUTOMATION_FEASIBLE_THRESHOLD,
+    BINARY_LOG_PATH,
+    ENABLE_DISTRIBUTED_TRACING,
+    ENABLE_SESSION_PERSISTENCE,
+    LOG_BUFFER_CAPACITY,
+    LOG_BUFFERED,
+    LOG_DIRECT_TO_STDOUT,
+    LOG_FLUSH_INTERVAL_SECONDS,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    MAX_CONCURRENT_LLM_CALLS,
+    MAX_WORKFLOW_LENGTH,
+    PERSIST_ANALYSIS_IN_BACKGROUND,
+    SESSION_DB_PATH,
+    TRACE_SAMPLE_RATE,
+    USE_COMBINED_AGENTS_2_3,
+    USE_FUSED_ANALYSIS,
+)
+
+
+# Stands in for a step no agent reported on in _merge_results (never mutated)
+_EMPTY: Dict[str, Any] = {}
+
+
+def _analysis_cache_key(workflow_text: str) -> bytes:
+    """Hash workflow text with whitespace and letter case normalized away."""
+    normalized = " ".join(workflow_text.split()).casefold()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
 
 
 class WorkflowAnalyzerOrchestrator:
@@ -31,13 +72,25 @@ class WorkflowAnalyzerOrchestrator:
     3. Agent 4 (Sequential): Synthesizes insights and recommendations
     """
 
-    def __init__(self, model: str = MODEL, workflow_repository=None):
+    def __init__(
+        self,
+        model: str = MODEL,
+        workflow_repository=None,
+        fused_analysis: bool = USE_FUSED_ANALYSIS,
+        combined_agents_2_3: bool = USE_COMBINED_AGENTS_2_3,
+        persist_in_background: bool = PERSIST_ANALYSIS_IN_BACKGROUND,
+    ):
         """
         Initialize orchestrator with all components.
 
         Args:
             model: Gemini model to use (default: from config)
             workflow_repository: Optional WorkflowRepository for auto-saving analysis
+            fused_analysis: Run Agents 2-4 as a single Gemini call (default: from config)
+            combined_agents_2_3: Run Agents 2 and 3 as a single Gemini call
+                (default: from config; ignored when fused_analysis is set)
+            persist_in_background: Return without waiting for the Firestore
+                save (default: from config)
         """
         my_api_key = os.getenv("GOOGLE_API_KEY")
         if not my_api_key:
@@ -61,11 +114,29 @@ class WorkflowAnalyzerOrchestrator:
         self.model = model
 
         # Initialize core components
-        self.session_manager = SessionManager()
-        self.logger = StructuredLogger("WorkflowAnalyzer")
-        self.tracer = DistributedTracer()
+        self.session_manager = SessionManager(
+            db_path=SESSION_DB_PATH if ENABLE_SESSION_PERSISTENCE else None
+        )
+        self.logger = StructuredLogger(
+            "WorkflowAnalyzer",
+            binary=LOG_FORMAT == "msgpack",
+            binary_path=BINARY_LOG_PATH,
+            buffered=LOG_BUFFERED,
+            buffer_capacity=LOG_BUFFER_CAPACITY,
+            flush_interval=LOG_FLUSH_INTERVAL_SECONDS,
+            stream=sys.stdout.buffer if LOG_DIRECT_TO_STDOUT else None,
+            level=logging.getLevelName(LOG_LEVEL) if LOG_DIRECT_TO_STDOUT else None,
+        )
+        self.tracer = DistributedTracer(
+            enabled=ENABLE_DISTRIBUTED_TRACING, sample_rate=TRACE_SAMPLE_RATE
+        )
         self.metrics = MetricsCollector()
 
+        # Bounds in-flight Gemini calls across all concurrent analyses
+        self.llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+        self._llm_calls_queued = 0
+        self._llm_calls_in_flight = 0
+
         # Initialize agents with the underlying GenAI-compatible client
         self.agent1 = WorkflowParserAgent(self.client, self.logger, self.tracer)
 
@@ -74,12 +145,35 @@ class WorkflowAnalyzerOrchestrator:
             "lookup_api_docs": lookup_api_docs,
         }
 
-        self.agent2 = RiskAssessorAgent(self.client, self.logger, self.tracer, tools)
-        self.agent3 = AutomationAnalyzerAgent(self.client, self.logger, self.tracer, tools)
+        # Agent 2 may split a workflow into several calls, so it takes a
+        # Gemini call slot per call instead of one for the whole assessment
+        self.agent2 = RiskAssessorAgent(
+            self.client, self.logger, self.tracer, tools, llm_slot=self._llm_slot
+        )
+        # Agent 3 holds a slot for its Gemini request only, not for its tool lookups
+        self.agent3 = AutomationAnalyzerAgent(
+            self.client, self.logger, self.tracer, tools, llm_slot=self._llm_slot
+        )
         self.agent4 = AutomationSummarizerAgent(self.client, self.logger, self.tracer)
+        # Likewise for the fused / combined calls, which may also be chunked
+        self.fused_agent = FusedAnalyzerAgent(
+            self.client, self.logger, self.tracer, self.agent2, self.agent3,
+            llm_slot=self._llm_slot,
+        )
+        self.fused_analysis = fused_analysis
+        self.combined_agents_2_3 = combined_agents_2_3
 
         # Optional workflow repository for auto-saving
         self.workflow_repository = workflow_repository
+        self.persist_in_background = persist_in_background
+        self._background_saves: Set["asyncio.Task[None]"] = set()
+
+        # Completed analyses (LRU) keyed by normalized workflow text, so a
+        # re-submitted workflow skips all Gemini calls
+        self._analysis_cache: "OrderedDict[bytes, WorkflowAnalysis]" = OrderedDict()
+        # Analyses in progress by the same key; identical concurrent requests
+        # await the first one's result instead of repeating its Gemini calls
+        self._inflight_analyses: Dict[bytes, "asyncio.Future[WorkflowAnalysis]"] = {}
 
         self.logger.info("Orchestrator initialized successfully")
 
@@ -89,8 +183,9 @@ class WorkflowAnalyzerOrchestrator:
         # ...
         # (rest of docstring remains the same)
         """
-        session = self.session_manager.create_session()
+        session = await self._session_io(self.session_manager.create_session)
         trace_id = session.trace_id
+        self.tracer.start_trace(trace_id)
 
         self.logger.info(
             "Starting workflow analysis",
@@ -98,15 +193,43 @@ class WorkflowAnalyzerOrchestrator:
             workflow_length=len(workflow_text)
         )
 
+        # Set when this call runs the pipeline that identical concurrent calls wait on
+        leader_future: Optional["asyncio.Future[WorkflowAnalysis]"] = None
+
         try:
             if not workflow_text or not isinstance(workflow_text, str):
                 raise ValueError("workflow_text must be a non-empty string")
+            if len(workflow_text) > MAX_WORKFLOW_LENGTH:
+                # Rejected locally instead of after a full round trip to Gemini
+                raise ValueError(f"workflow_text exceeds {MAX_WORKFLOW_LENGTH} characters")
+
+            cache_key = _analysis_cache_key(workflow_text)
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(cache_key)
+                return await self._serve_cached_analysis(
+                    cached, session, workflow_text, workflow_name
+                )
+
+            # An identical workflow is already being analyzed: share its result.
+            # asyncio.wait only raises if this call itself is cancelled; if the
+            # leader was cancelled instead, look again and run the pipeline
+            # here unless another waiter has already taken over.
+            while (inflight := self._inflight_analyses.get(cache_key)) is not None:
+                await asyncio.wait((inflight,))
+                if not inflight.cancelled():
+                    return await self._serve_cached_analysis(
+                        inflight.result(), session, workflow_text, workflow_name
+                    )
+            leader_future = asyncio.get_running_loop().create_future()
+            self._inflight_analyses[cache_key] = leader_future
 
             # SEQUENTIAL: Agent 1
             self.logger.info("Agent 1: Starting workflow parsing", trace_id=trace_id)
 
             with self.tracer.span(trace_id, "agent1_parse", "workflow_parser"):
-                steps = self.agent1.parse(workflow_text, session)
+                async with self._llm_slot():
+                    steps = await self.agent1.parse(workflow_text, session)
 
             if not steps:
                 raise ValueError("Agent 1 failed to parse workflow steps")
@@ -118,60 +241,78 @@ class WorkflowAnalyzerOrchestrator:
                 latency_ms=session.agent1_latency
             )
 
-            # PARALLEL: Agent 2 & 3
-            self.logger.info("Launching parallel agents", trace_id=trace_id)
-            session.parallel_start_time = datetime.utcnow()
-
-            task2 = asyncio.create_task(
-                self._run_agent2(session, workflow_text, trace_id)
-            )
-            task3 = asyncio.create_task(
-                self._run_agent3(session, workflow_text, trace_id)
-            )
-
-            results2, results3 = await asyncio.gather(task2, task3, return_exceptions=False)
-            session.parallel_end_time = datetime.utcnow()
-
-            self.logger.info("Parallel agents completed", trace_id=trace_id)
-
-            # SEQUENTIAL: Agent 4 (runs after Agents 2 & 3)
-            self.logger.info("Agent 4: Starting automation summarization", trace_id=trace_id)
-
-            with self.tracer.span(trace_id, "agent4_summarize", "automation_summarizer"):
-                summary = self.agent4.summarize(session)
-
-            self.logger.info(
-                "Agent 4: Completed",
-                trace_id=trace_id,
-                automation_potential_percentage=summary.get("automation_potential_percentage", 0) if summary else 0,
-                latency_ms=session.agent4_latency if hasattr(session, 'agent4_latency') else 0
-            )
+            if self.fused_analysis:
+                # FUSED: Agents 2-4 in a single Gemini call
+                self.logger.info("Fused analysis: Starting agents 2-4", trace_id=trace_id)
+
+                # The fused agent acquires a Gemini call slot per call itself
+                with self.tracer.span(trace_id, "fused_analysis", "fused_analyzer"):
+                    await self.fused_agent.analyze(session, workflow_text)
+
+                self.logger.info(
+                    "Fused analysis: Completed",
+                    trace_id=trace_id,
+                    latency_ms=session.fused_latency
+                )
+            else:
+                if self.combined_agents_2_3:
+                    # COMBINED: Agent 2 & 3 in a single Gemini call
+                    session.parallel_start_time = time.perf_counter_ns()
+                    await self._run_agents23(session, workflow_text, trace_id)
+                    session.parallel_end_time = time.perf_counter_ns()
+                else:
+                    # PARALLEL: Agent 2 & 3 (results are written to the session).
+                    # Each runner records its own failure and returns no results,
+                    # so one agent failing never stops the other; the task group
+                    # makes sure both are cancelled if this analysis is cancelled.
+                    self.logger.info("Launching parallel agents", trace_id=trace_id)
+                    session.parallel_start_time = time.perf_counter_ns()
+
+                    async with asyncio.TaskGroup() as parallel_agents:
+                        parallel_agents.create_task(
+                            self._run_agent2(session, workflow_text, trace_id)
+                        )
+                        parallel_agents.create_task(
+                            self._run_agent3(session, workflow_text, trace_id)
+                        )
+
+                    session.parallel_end_time = time.perf_counter_ns()
+
+                    self.logger.info("Parallel agents completed", trace_id=trace_id)
+
+                # SEQUENTIAL: Agent 4 (runs after Agents 2 & 3)
+                self.logger.info("Agent 4: Starting automation summarization", trace_id=trace_id)
+
+                with self.tracer.span(trace_id, "agent4_summarize", "automation_summarizer"):
+                    async with self._llm_slot():
+                        summary = await self.agent4.summarize(session)
+
+                self.logger.info(
+                    "Agent 4: Completed",
+                    trace_id=trace_id,
+                    automation_potential_percentage=summary.get("automation_potential_percentage", 0) if summary else 0,
+                    latency_ms=session.agent4_latency if hasattr(session, 'agent4_latency') else 0
+                )
 
             # Merge results
             final_analysis = self._merge_results(session)
-            session.final_analysis = final_analysis.dict()
+            session.final_analysis = final_analysis
+
+            # Deep copy so callers mutating the result can't alter the shared one
+            shared = final_analysis.model_copy(deep=True)
+            leader_future.set_result(shared)
+            if ANALYSIS_CACHE_SIZE > 0 and not session.errors:
+                self._analysis_cache[cache_key] = shared
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+
+            # Write the finished session through to the session store
+            await self._session_io(
+                self.session_manager.update_session, session.session_id, session
+            )
 
             # Auto-save to Firestore if repository is available
-            if self.workflow_repository:
-                try:
-                    self.workflow_repository.save_workflow_analysis(
-                        workflow_id=final_analysis.workflow_id,
-                        original_text=workflow_text,
-                        analysis=final_analysis,
-                        workflow_name=workflow_name, # Pass workflow_name here
-                    )
-                    self.logger.info(
-                        "Analysis saved successfully to Firestore",
-                        trace_id=trace_id,
-                        workflow_id=final_analysis.workflow_id,
-                    )
-                except Exception as e:
-                    self.logger.warning(
-                        "Failed to persist analysis to Firestore",
-                        trace_id=trace_id,
-                        error_type=type(e).__name__,
-                        error_message=str(e),
-                    )
+            await self._persist_analysis(final_analysis, workflow_text, workflow_name, trace_id)
 
             # Collect metrics
             self.metrics.record_analysis(session)
@@ -193,15 +334,138 @@ class WorkflowAnalyzerOrchestrator:
             )
             session.add_error(type(e).__name__, str(e), stage="orchestration")
             self.metrics.record_analysis(session)
+            if leader_future is not None and not leader_future.done():
+                leader_future.set_exception(e)
+                # Retrieved here so an unawaited failure isn't reported by asyncio
+                leader_future.exception()
             raise
 
+        finally:
+            if leader_future is not None:
+                self._inflight_analyses.pop(cache_key, None)
+                if not leader_future.done():
+                    leader_future.cancel()
+
+    async def _session_io(self, method: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a SessionManager method, in a worker thread when it writes to SQLite.
+
+        In-memory sessions are cheap to update and stay on the event loop.
+        """
+        if self.session_manager.persistent:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    @asynccontextmanager
+    async def _llm_slot(self):
+        """Hold one of the shared Gemini call slots, tracking queue depth."""
+        self._llm_calls_queued += 1
+        try:
+            await self.llm_semaphore.acquire()
+        finally:
+            self._llm_calls_queued -= 1
+        self._llm_calls_in_flight += 1
+        try:
+            yield
+        finally:
+            self._llm_calls_in_flight -= 1
+            self.llm_semaphore.release()
+
+    async def _serve_cached_analysis(
+        self,
+        cached: WorkflowAnalysis,
+        session: SessionState,
+        workflow_text: str,
+        workflow_name: Optional[str],
+    ) -> WorkflowAnalysis:
+        """Return a cached analysis re-issued under this call's session."""
+        final_analysis = cached.model_copy(
+            update={
+                "workflow_id": f"wf_{session.session_id[:8]}",
+                "session_id": session.session_id,
+                "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
+                "analysis_duration_ms": 0.0,
+            },
+            deep=True,
+        )
+        session.final_analysis = final_analysis
+        await self._session_io(
+            self.session_manager.update_session, session.session_id, session
+        )
+
+        await self._persist_analysis(final_analysis, workflow_text, workflow_name, session.trace_id)
+        self.metrics.record_analysis(session)
+
+        self.logger.info(
+            "Analysis served from cache",
+            trace_id=session.trace_id,
+            total_steps=len(final_analysis.steps)
+        )
+        return final_analysis
+
+    async def _persist_analysis(
+        self,
+        final_analysis: WorkflowAnalysis,
+        workflow_text: str,
+        workflow_name: Optional[str],
+        trace_id: str,
+    ) -> None:
+        """
+        Save an analysis to Firestore if a repository is configured (best effort).
+
+        The blocking Firestore client runs in a worker thread so other analyses
+        keep making progress. With ``persist_in_background`` the save is not
+        awaited at all; callers that read the document back right away (as
+        the API does) need the default.
+        """
+        if not self.workflow_repository:
+            return
+        save = self._save_analysis(final_analysis, workflow_text, workflow_name, trace_id)
+        if self.persist_in_background:
+            task = asyncio.create_task(save)
+            # Keep a reference until done so the task isn't garbage collected
+            self._background_saves.add(task)
+            task.add_done_callback(self._background_saves.discard)
+        else:
+            await save
+
+    async def _save_analysis(
+        self,
+        final_analysis: WorkflowAnalysis,
+        workflow_text: str,
+        workflow_name: Optional[str],
+        trace_id: str,
+    ) -> None:
+        """Run the repository save in a worker thread, logging the outcome."""
+        try:
+            await asyncio.to_thread(
+                self.workflow_repository.save_workflow_analysis,
+                workflow_id=final_analysis.workflow_id,
+                original_text=workflow_text,
+                analysis=final_analysis,
+                workflow_name=workflow_name, # Pass workflow_name here
+            )
+            self.logger.info(
+                "Analysis saved successfully to Firestore",
+                trace_id=trace_id,
+                workflow_id=final_analysis.workflow_id,
+            )
+        except Exception as e:
+            self.logger.warning(
+                "Failed to persist analysis to Firestore",
+                trace_id=trace_id,
+                error_type=type(e).__name__,
+                error_message=str(e),
+            )
+
     async def _run_agent2(self, session: SessionState, workflow_text: str, trace_id: str) -> List[Dict[str, Any]]:
         """Run Agent 2 (Risk Assessor) with tracing."""
         try:
             self.logger.info("Agent 2: Starting risk assessment", trace_id=trace_id)
 
+            # Agent 2 acquires a Gemini call slot per call itself
             with self.tracer.span(trace_id, "agent2_risk", "risk_assessor"):
-                risk_assessments = self.agent2.assess_risk(session, workflow_text)
+                risk_assessments = await self.agent2.assess_risk(session, workflow_text)
 
             self.logger.info(
                 "Agent 2: Completed",
@@ -227,8 +491,12 @@ class WorkflowAnalyzerOrchestrator:
         try:
             self.logger.info("Agent 3: Starting automation analysis", trace_id=trace_id)
 
+            # Agent 3 acquires a Gemini call slot per request itself
             with self.tracer.span(trace_id, "agent3_automation", "automation_analyzer"):
-                automation_analyses = self.agent3.analyze(session, workflow_text)
+                # Runs alongside Agent 2, so don't read its (possibly partial) risks.
+                automation_analyses = await self.agent3.analyze(
+                    session, workflow_text, risk_assessments=[]
+                )
 
             self.logger.info(
                 "Agent 3: Completed",
@@ -249,6 +517,34 @@ class WorkflowAnalyzerOrchestrator:
             session.add_error(type(e).__name__, str(e), agent="agent_3")
             return []
 
+    async def _run_agents23(self, session: SessionState, workflow_text: str, trace_id: str) -> None:
+        """Run Agents 2 and 3 as one combined call with tracing."""
+        try:
+            self.logger.info("Agents 2-3: Starting combined analysis", trace_id=trace_id)
+
+            # The fused agent acquires a Gemini call slot per call itself
+            with self.tracer.span(trace_id, "agents23_combined", "risk_and_automation"):
+                risk_assessments, automation_analyses = await self.fused_agent.assess_and_analyze(
+                    session, workflow_text
+                )
+
+            self.logger.info(
+                "Agents 2-3: Completed",
+                trace_id=trace_id,
+                assessments_count=len(risk_assessments),
+                analyses_count=len(automation_analyses),
+                latency_ms=session.agent2_latency
+            )
+
+        except Exception as e:
+            self.logger.error(
+                "Agents 2-3 failed",
+                trace_id=trace_id,
+                error_type=type(e).__name__,
+                error_message=str(e)
+            )
+            session.add_error(type(e).__name__, str(e), agent="agents_2_3")
+
     def _merge_results(self, session: SessionState) -> WorkflowAnalysis:
         """Merge results from all agents into final analysis."""
         parsed_steps = session.parsed_steps.get("steps", []) if session.parsed_steps else []
@@ -260,22 +556,33 @@ class WorkflowAnalyzerOrchestrator:
         automation_map = {a.get("step_id"): a for a in automation_analyses}
 
         merged_steps = []
+        # Summary counters and insight step lists, accumulated while merging
+        # instead of re-walking the steps.
+        automatable_ids: List[str] = []
+        human_required_ids: List[str] = []
+        critical_risk_ids: List[str] = []
+        high_risk_steps = 0
         for step in parsed_steps:
             step_id = step.get("step_id")
-            risk_data = risks_map.get(step_id, {})
-            automation_data = automation_map.get(step_id, {})
+            risk_data = risks_map.get(step_id, _EMPTY)
+            automation_data = automation_map.get(step_id, _EMPTY)
+
+            # Look each agent field up once
+            available_api = automation_data.get("available_api")
+            automation_feasibility = automation_data.get("automation_feasibility", 0.0)
+            requires_human_review = risk_data.get("requires_human_in_loop", False)
 
             # Build suggested tools list
             suggested_tools = []
-            if automation_data.get("available_api"):
-                suggested_tools.append(automation_data.get("available_api"))
+            if available_api:
+                suggested_tools.append(available_api)
 
             # Add compliance tools if needed
-            if risk_data.get("requires_human_in_loop"):
+            if requires_human_review:
                 suggested_tools.append("Human Review")
 
             # Add API lookup if no API found but feasible
-            if not automation_data.get("available_api") and automation_data.get("automation_feasibility", 0) > 0.5:
+            if not available_api and automation_feasibility > 0.5:
                 suggested_tools.append("Custom Integration")
 
             # Create WorkflowStep object
@@ -287,27 +594,37 @@ class WorkflowAnalyzerOrchestrator:
                 dependencies=step.get("dependencies", []),
                 agent_type=automation_data.get("recommended_agent_type", "UNKNOWN"),
                 risk_level=risk_data.get("risk_level", "UNKNOWN"),
-                requires_human_review=risk_data.get("requires_human_in_loop", False),
+                requires_human_review=requires_human_review,
                 determinism_score=automation_data.get("determinism_score", 0.0),
-                automation_feasibility=automation_data.get("automation_feasibility", 0.0),
-                available_api=automation_data.get("available_api"),
+                automation_feasibility=automation_feasibility,
+                available_api=available_api,
                 suggested_tools=suggested_tools,
                 mitigation_suggestions=risk_data.get("mitigation_suggestions", []),
                 implementation_notes=automation_data.get("implementation_notes", ""),
             )
             merged_steps.append(merged_step)
 
+            if merged_step.automation_feasibility >= AUTOMATION_FEASIBLE_THRESHOLD:
+                automatable_ids.append(merged_step.id)
+            if merged_step.agent_type == "HUMAN":
+                human_required_ids.append(merged_step.id)
+            risk_level = merged_step.risk_level
+            if risk_level == "HIGH":
+                high_risk_steps += 1
+            elif risk_level == "CRITICAL":
+                critical_risk_ids.append(merged_step.id)
+
         # Calculate summary statistics
         total_steps = len(merged_steps)
-        automatable_count = sum(1 for s in merged_steps if s.automation_feasibility >= AUTOMATION_FEASIBLE_THRESHOLD)
-        agent_required_count = sum(1 for s in merged_steps if s.agent_type != "HUMAN")
-        human_required_count = sum(1 for s in merged_steps if s.agent_type == "HUMAN")
-        critical_risk_steps = sum(1 for s in merged_steps if s.risk_level == "CRITICAL")
-        high_risk_steps = sum(1 for s in merged_steps if s.risk_level == "HIGH")
+        automatable_count = len(automatable_ids)
+        human_required_count = len(human_required_ids)
+        critical_risk_steps = len(critical_risk_ids)
+        agent_required_count = total_steps - human_required_count
 
         automation_potential = automatable_count / total_steps if total_steps > 0 else 0.0
 
-        summary = AutomationSummary(
+        # All counts are derived locally, so skip re-validation.
+        summary = AutomationSummary.model_construct(
             total_steps=total_steps,
             automatable_count=automatable_count,
             agent_required_count=agent_required_count,
@@ -318,7 +635,9 @@ class WorkflowAnalyzerOrchestrator:
             automation_summary=workflow_summary,
         )
 
-        insights = self._extract_insights(merged_steps)
+        insights = self._extract_insights(
+            total_steps, automatable_ids, critical_risk_ids, human_required_ids
+        )
 
         final_analysis = WorkflowAnalysis(
             workflow_id=f"wf_{session.session_id[:8]}",
@@ -332,20 +651,33 @@ class WorkflowAnalyzerOrchestrator:
                 "human_review_required": human_required_count > 0,
             },
             recommendations=self._generate_recommendations(summary, merged_steps),
-            analysis_timestamp=datetime.utcnow().isoformat(),
+            analysis_timestamp=datetime.now(timezone.utc).isoformat(),
             analysis_duration_ms=self._calculate_total_duration(session),
         )
 
         return final_analysis
 
-    def _extract_insights(self, steps: List[WorkflowStep]) -> List[KeyInsight]:
-        """Extract key insights from analyzed steps."""
+    def _extract_insights(
+        self,
+        total: int,
+        automatable_ids: List[str],
+        critical_risk_ids: List[str],
+        human_required_ids: List[str],
+    ) -> List[KeyInsight]:
+        """
+        Extract key insights from analyzed steps.
+
+        Args:
+            total: Number of analyzed steps
+            automatable_ids: IDs of steps at or above the automation threshold
+            critical_risk_ids: IDs of CRITICAL risk steps
+            human_required_ids: IDs of steps assigned to the HUMAN agent type
+        """
         insights = []
 
-        total = len(steps)
-        automatable = sum(1 for s in steps if s.automation_feasibility >= AUTOMATION_FEASIBLE_THRESHOLD)
-        critical_risk = sum(1 for s in steps if s.risk_level == "CRITICAL")
-        human_required = sum(1 for s in steps if s.agent_type == "HUMAN")
+        automatable = len(automatable_ids)
+        critical_risk = len(critical_risk_ids)
+        human_required = len(human_required_ids)
 
         if automatable > 0:
             automation_percentage = (automatable / total) * 100
@@ -353,7 +685,7 @@ class WorkflowAnalyzerOrchestrator:
                 title="Strong Automation Potential",
                 description=f"{automatable}/{total} steps ({automation_percentage:.0f}%) can be automated",
                 priority="HIGH" if automation_percentage >= 70 else "MEDIUM",
-                affected_steps=[s.id for s in steps if s.automation_feasibility >= AUTOMATION_FEASIBLE_THRESHOLD]
+                affected_steps=automatable_ids
             ))
 
         if critical_risk > 0:
@@ -361,7 +693,7 @@ class WorkflowAnalyzerOrchestrator:
                 title="Critical Compliance Risks Detected",
                 description=f"{critical_risk} step(s) marked as CRITICAL risk level",
                 priority="CRITICAL",
-                affected_steps=[s.id for s in steps if s.risk_level == "CRITICAL"]
+                affected_steps=critical_risk_ids
             ))
 
         if human_required > 0:
@@ -370,7 +702,7 @@ class WorkflowAnalyzerOrchestrator:
                 title="Manual Review Bottleneck",
                 description=f"{human_required}/{total} steps ({human_percentage:.0f}%) require human review",
                 priority="HIGH" if human_percentage > 30 else "MEDIUM",
-                affected_steps=[s.id for s in steps if s.agent_type == "HUMAN"]
+                affected_steps=human_required_ids
             ))
 
         return insights[:5]
@@ -402,13 +734,23 @@ class WorkflowAnalyzerOrchestrator:
 
     def _calculate_total_duration(self, session: SessionState) -> float:
         """Calculate total analysis duration in milliseconds."""
-        if session.parallel_start_time and session.parallel_end_time:
-            parallel_duration = (session.parallel_end_time - session.parallel_start_time).total_seconds() * 1000
+        if session.fused_latency:
+            return session.agent1_latency + session.fused_latency
+        if session.parallel_start_time is not None and session.parallel_end_time is not None:
+            parallel_duration = (session.parallel_end_time - session.parallel_start_time) / 1e6
             total = session.agent1_latency + parallel_duration
         else:
             total = session.agent1_latency + session.agent2_latency + session.agent3_latency
         return total
 
     def get_analysis_metrics(self) -> Dict[str, Any]:
-        """Get metrics from the analysis."""
-        return self.metrics.get_summary()
+        """Get metrics from the analysis, plus the current Gemini call queue and tool caches."""
+        metrics = self.metrics.get_summary()
+        metrics["llm_concurrency_limit"] = MAX_CONCURRENT_LLM_CALLS
+        metrics["llm_calls_in_flight"] = self._llm_calls_in_flight
+        metrics["llm_calls_queued"] = self._llm_calls_queued
+        metrics["tool_caches"] = {
+            "get_compliance_rules": self.agent2.tool_cache_info(),
+            "lookup_api_docs": self.agent3.tool_cache_info(),
+        }
+        return metrics
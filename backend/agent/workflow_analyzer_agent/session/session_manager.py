@@ -1,6 +1,11 @@
 """Session manager for creating and retrieving analysis sessions."""
-from typing import Dict, Optional
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 from .session_state import SessionState
+from ..config import MAX_SESSION_AGE_HOURS, SESSION_SHARDS
 
 
 class SessionManager:
@@ -11,21 +16,109 @@ class SessionManager:
     - Creating new sessions with unique identifiers
     - Retrieving existing sessions
     - In-memory session storage (can be extended with persistence layer)
+    - Evicting sessions older than ``max_age``
+    - Optionally persisting sessions to a local SQLite database
+
+    Sessions are partitioned into shards by ``hash(session_id)``, each with its
+    own lock, so concurrent writers (threads or workers sharing the manager)
+    only contend when they touch the same shard. Reads are lock-free.
+
+    With a ``db_path`` every create, update and delete is also written through
+    to a SQLite database in WAL mode, so sessions survive restarts and are
+    visible to other processes on the same host; the shards then act as a
+    cache in front of it. ``get_session`` compares the row's ``updated``
+    stamp with the one the cached copy was written or read at, and reloads
+    sessions another process has changed. The database calls block, so
+    async callers should run the methods in a worker thread when
+    ``persistent`` is set.
     """
 
-    def __init__(self):
-        """Initialize session manager with empty session store."""
-        self._sessions: Dict[str, SessionState] = {}
+    def __init__(
+        self,
+        num_shards: int = SESSION_SHARDS,
+        max_age: Optional[timedelta] = timedelta(hours=MAX_SESSION_AGE_HOURS),
+        db_path: Optional[str] = None,
+    ):
+        """
+        Initialize session manager with empty session store.
+
+        Args:
+            num_shards: Number of independently locked partitions
+            max_age: Sessions older than this are evicted (None keeps them forever)
+            db_path: SQLite database file to persist sessions in (None keeps
+                them in memory only)
+        """
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self._shards: List[Dict[str, SessionState]] = [{} for _ in range(num_shards)]
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(num_shards)]
+        self.max_age = max_age
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # Row ``updated`` stamp each cached session corresponds to (under _db_lock)
+        self._row_versions: Dict[str, float] = {}
+        if db_path is not None:
+            self._db = self._open_db(db_path)
+
+    @staticmethod
+    def _open_db(db_path: str) -> sqlite3.Connection:
+        """Open (creating if needed) the session database in WAL mode."""
+        db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+        return db
+
+    @property
+    def persistent(self) -> bool:
+        """Whether sessions are written through to a database (blocking I/O)."""
+        return self._db is not None
+
+    def _db_write(self, session: SessionState) -> None:
+        """Insert or replace a session's row."""
+        data = session.to_json()
+        with self._db_lock:
+            updated = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated) VALUES (?, ?, ?)",
+                (session.session_id, data, updated),
+            )
+            self._row_versions[session.session_id] = updated
+
+    def close(self) -> None:
+        """Close the session database, if any."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def _shard_index(self, session_id: str) -> int:
+        """Return the index of the shard holding ``session_id``."""
+        return hash(session_id) % len(self._shards)
 
     def create_session(self) -> SessionState:
         """
         Create a new analysis session.
 
+        Expired sessions at the front of the new session's shard are evicted
+        at the same time (see ``_evict_expired``).
+
         Returns:
             SessionState: A new session with generated UUIDs and timestamps
         """
         session = SessionState()
-        self._sessions[session.session_id] = session
+        index = self._shard_index(session.session_id)
+        shard = self._shards[index]
+        with self._locks[index]:
+            if self.max_age is not None:
+                self._evict_expired(shard, session.created_at - self.max_age)
+            shard[session.session_id] = session
+        if self._db is not None:
+            self._db_write(session)
         return session
 
     def get_session(self, session_id: str) -> Optional[SessionState]:
@@ -38,7 +131,34 @@ class SessionManager:
         Returns:
             SessionState if found, None otherwise
         """
-        return self._sessions.get(session_id)
+        index = self._shard_index(session_id)
+        shard = self._shards[index]
+        session = shard.get(session_id)
+        if self._db is None:
+            return session
+
+        # The database is authoritative: the session may have been created,
+        # updated or deleted by another process, or before a restart
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data, updated FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            cached_version = self._row_versions.get(session_id)
+        if row is None:
+            if session is not None:
+                with self._locks[index]:
+                    shard.pop(session_id, None)
+            return None
+        data, updated = row
+        if session is not None and updated == cached_version:
+            return session
+
+        session = SessionState.from_json(data)
+        with self._locks[index]:
+            shard[session_id] = session
+        with self._db_lock:
+            self._row_versions[session_id] = updated
+        return session
 
     def update_session(self, session_id: str, session: SessionState) -> bool:
         """
@@ -51,10 +171,26 @@ class SessionManager:
         Returns:
             True if session was updated, False if not found
         """
-        if session_id in self._sessions:
-            self._sessions[session_id] = session
-            return True
-        return False
+        index = self._shard_index(session_id)
+        shard = self._shards[index]
+        with self._locks[index]:
+            found = session_id in shard
+            if found:
+                shard[session_id] = session
+        if self._db is None:
+            return found
+
+        if not found:
+            with self._db_lock:
+                found = self._db.execute(
+                    "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone() is not None
+            if not found:
+                return False
+            with self._locks[index]:
+                shard[session_id] = session
+        self._db_write(session)
+        return True
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -66,20 +202,99 @@ class SessionManager:
         Returns:
             True if session was deleted, False if not found
         """
-        if session_id in self._sessions:
-            del self._sessions[session_id]
-            return True
-        return False
+        index = self._shard_index(session_id)
+        with self._locks[index]:
+            deleted = self._shards[index].pop(session_id, None) is not None
+        if self._db is not None:
+            with self._db_lock:
+                cursor = self._db.execute(
+                    "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+                )
+                self._row_versions.pop(session_id, None)
+            deleted = deleted or cursor.rowcount > 0
+        return deleted
 
     def list_sessions(self) -> list[str]:
         """
         List all active session IDs.
 
+        Shards are read without locking, so the result is a snapshot that may
+        miss sessions created or deleted while it is being built. With a
+        database, the IDs come from it (and so include other processes').
+
         Returns:
             List of session identifiers
         """
-        return list(self._sessions.keys())
+        if self._db is not None:
+            with self._db_lock:
+                return [row[0] for row in self._db.execute("SELECT session_id FROM sessions")]
+        return [session_id for shard in self._shards for session_id in list(shard)]
+
+    def purge_expired_sessions(self) -> Dict[str, int]:
+        """
+        Evict every session older than ``max_age``.
+
+        Every shard is scanned in full, so sessions loaded from the database
+        out of creation order are evicted too. Database rows are deleted once
+        they have not been written for ``max_age``.
+
+        Returns:
+            Dictionary with the number of sessions evicted from memory
+            (``memory``) and of rows deleted from the database (``database``,
+            0 without one)
+        """
+        purged = {"memory": 0, "database": 0}
+        if self.max_age is None:
+            return purged
+        cutoff = datetime.utcnow() - self.max_age
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                purged["memory"] += self._evict_expired(shard, cutoff, full_scan=True)
+        if self._db is not None:
+            db_cutoff = time.time() - self.max_age.total_seconds()
+            with self._db_lock:
+                cursor = self._db.execute(
+                    "DELETE FROM sessions WHERE updated < ?", (db_cutoff,)
+                )
+                # Stamps this old belong to deleted rows or to rows another
+                # process has rewritten since; either way they are stale
+                self._row_versions = {
+                    session_id: updated
+                    for session_id, updated in self._row_versions.items()
+                    if updated >= db_cutoff
+                }
+            purged["database"] = cursor.rowcount
+        return purged
 
     def clear_all_sessions(self) -> None:
-        """Clear all sessions from memory (useful for testing)."""
-        self._sessions.clear()
+        """Clear all sessions from memory and the database (useful for testing)."""
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM sessions")
+                self._row_versions.clear()
+
+    @staticmethod
+    def _evict_expired(
+        shard: Dict[str, SessionState], cutoff: datetime, full_scan: bool = False
+    ) -> int:
+        """
+        Drop sessions created before ``cutoff`` from a shard (lock held).
+
+        Shards keep insertion order, which is creation order for sessions
+        created here, so by default this stops at the first session that is
+        still live. Sessions loaded from the database are inserted when first
+        read and may sit behind newer ones; ``full_scan`` checks every session.
+        """
+        expired = []
+        for session_id, session in shard.items():
+            if session.created_at >= cutoff:
+                if full_scan:
+                    continue
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            del shard[session_id]
+        return len(expired)
@@ -1,9 +1,14 @@
 """Session state management for tracking workflow analysis sessions."""
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, List, Dict
+from dataclasses import InitVar, dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Any, List, Dict, Optional, Tuple
+import time
 import uuid
 
+import orjson
+
+from ..types import WorkflowAnalysis
+
 
 @dataclass
 class SessionState:
@@ -12,50 +17,67 @@ class SessionState:
 
     Attributes:
         session_id: Unique identifier for this analysis session
-        trace_id: For distributed tracing across all agents
+        trace_id: For distributed tracing across all agents (generated on first
+            access unless set)
         created_at: Timestamp when session was created
         parsed_steps: Store Agent 1 output (workflow parsing)
+        parsed_steps_json: Compact JSON of the parsed steps, serialized once
+            by Agent 1 for reuse in the prompts of Agents 2-4
         risks: Store Agent 2 output (Risk Assessment)
         automation: Store Agent 3 output (Automation Analysis)
-        final_analysis: Merged final result
+        final_analysis: Merged final result (the WorkflowAnalysis returned to the caller)
         agent1_latency: Agent 1 latency in milliseconds
         agent2_latency: Agent 2 latency in milliseconds
         agent3_latency: Agent 3 latency in milliseconds
-        parallel_start_time: Timestamp when parallel execution started
-        parallel_end_time: Timestamp when parallel execution ended
-        tool_calls: List of tool calls made (for metrics)
-        errors: List of errors encountered (for metrics)
+        fused_latency: Fused Agents 2-4 call latency in milliseconds (fused mode only)
+        parallel_start_time: time.perf_counter_ns() when parallel execution started
+        parallel_end_time: time.perf_counter_ns() when parallel execution ended
+        tool_calls: List of tool calls made, with their context (``timestamp``
+            is a time.perf_counter_ns() reading until serialized)
+        tool_call_timings: (tool_name, duration_ms) of each tool call, for metrics
+        errors: List of errors encountered (for metrics), timestamped like
+            tool_calls
     """
 
     session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    trace_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # Exposed through the trace_id property defined below the class
+    trace_id: InitVar[Optional[str]] = None
+    _trace_id: Optional[str] = field(default=None, init=False, repr=False)
     created_at: datetime = field(default_factory=datetime.utcnow)
+    # perf_counter_ns() reading taken with created_at, to convert event
+    # timestamps to wall-clock time on serialization
+    _created_ns: int = field(default_factory=time.perf_counter_ns, init=False, repr=False)
 
     # Agent outputs
     parsed_steps: Dict[str, Any] = field(default_factory=dict)
+    parsed_steps_json: str = ""
     risks: Dict[str, Any] = field(default_factory=dict)
     automation: Dict[str, Any] = field(default_factory=dict)
-    final_analysis: Dict[str, Any] = field(default_factory=dict)
+    final_analysis: Optional[WorkflowAnalysis] = None
 
     # Latency metrics
     agent1_latency: float = 0.0
     agent2_latency: float = 0.0
     agent3_latency: float = 0.0
+    fused_latency: float = 0.0
 
     # Parallel execution tracking
-    parallel_start_time: datetime | None = None
-    parallel_end_time: datetime | None = None
+    parallel_start_time: Optional[int] = None
+    parallel_end_time: Optional[int] = None
 
     # Metrics tracking
     tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    tool_call_timings: List[Tuple[str, float]] = field(default_factory=list)
     errors: List[Dict[str, Any]] = field(default_factory=list)
 
-    def __post_init__(self):
+    def __post_init__(self, trace_id: Optional[str]):
         """Validate session state after initialization."""
         if not self.session_id:
             raise ValueError("session_id cannot be empty")
-        if not self.trace_id:
-            raise ValueError("trace_id cannot be empty")
+        if trace_id is not None:
+            if not trace_id:
+                raise ValueError("trace_id cannot be empty")
+            self._trace_id = trace_id
 
     def add_tool_call(self, tool_name: str, duration_ms: float, **kwargs) -> None:
         """
@@ -65,13 +87,19 @@ class SessionState:
             tool_name: Name of the tool that was called
             duration_ms: Duration of the tool call in milliseconds
             **kwargs: Additional context about the tool call
+
+        Raises:
+            ValueError: If duration_ms is negative
         """
+        if duration_ms < 0:
+            raise ValueError("Duration cannot be negative")
         self.tool_calls.append({
             "tool_name": tool_name,
             "duration_ms": duration_ms,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.perf_counter_ns(),
             **kwargs
         })
+        self.tool_call_timings.append((tool_name, duration_ms))
 
     def add_error(self, error_type: str, message: str, **kwargs) -> None:
         """
@@ -85,6 +113,86 @@ class SessionState:
         self.errors.append({
             "error_type": error_type,
             "message": message,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.perf_counter_ns(),
             **kwargs
         })
+
+    def to_json(self) -> bytes:
+        """
+        Serialize the session (including attributes set by agents, such as
+        ``automation_summary``) to JSON.
+
+        Tool call and error timestamps are written as wall-clock ISO times.
+        The trace_id is generated first if it has not been read yet, so every
+        reader of the document sees the same one.
+
+        Returns:
+            UTF-8 encoded JSON document
+        """
+        state = vars(self).copy()
+        del state["_created_ns"]
+        state.pop("_trace_id", None)
+        state["trace_id"] = self.trace_id
+        state["tool_calls"] = [self._with_wall_time(entry) for entry in self.tool_calls]
+        state["errors"] = [self._with_wall_time(entry) for entry in self.errors]
+        if self.final_analysis is not None:
+            state["final_analysis"] = self.final_analysis.model_dump(mode="json")
+        return orjson.dumps(state)
+
+    def _with_wall_time(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``entry`` with a perf_counter_ns timestamp converted to a datetime."""
+        timestamp = entry.get("timestamp")
+        if not isinstance(timestamp, int):
+            return entry
+        elapsed = timedelta(microseconds=(timestamp - self._created_ns) // 1000)
+        return {**entry, "timestamp": self.created_at + elapsed}
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "SessionState":
+        """
+        Rebuild a session serialized by ``to_json``.
+
+        Timestamps inside ``tool_calls`` and ``errors`` come back as ISO
+        strings; ``parallel_start_time``/``parallel_end_time`` are only
+        meaningful relative to each other.
+
+        Args:
+            data: JSON document produced by ``to_json``
+
+        Returns:
+            The restored SessionState
+        """
+        values = orjson.loads(data)
+        init = {f.name: values.pop(f.name) for f in fields(cls) if f.init and f.name in values}
+        # Documents written before trace_id was serialized hold _trace_id
+        init["trace_id"] = values.pop("trace_id", None) or values.pop("_trace_id", None)
+        if "created_at" in init:
+            init["created_at"] = datetime.fromisoformat(init["created_at"])
+        if init.get("final_analysis") is not None:
+            init["final_analysis"] = WorkflowAnalysis.model_validate(init["final_analysis"])
+        if "tool_call_timings" in init:
+            init["tool_call_timings"] = [tuple(timing) for timing in init["tool_call_timings"]]
+        session = cls(**init)
+        # Attributes agents add outside the declared fields
+        for name, value in values.items():
+            setattr(session, name, value)
+        return session
+
+
+def _get_trace_id(self: SessionState) -> str:
+    """Trace identifier, generated on first access."""
+    trace_id = self._trace_id
+    if trace_id is None:
+        trace_id = self._trace_id = str(uuid.uuid4())
+    return trace_id
+
+
+def _set_trace_id(self: SessionState, value: str) -> None:
+    if not value:
+        raise ValueError("trace_id cannot be empty")
+    self._trace_id = value
+
+
+# Assigned after the dataclass is built so that the trace_id init argument
+# (an InitVar) and the lazily generated attribute can share one name
+SessionState.trace_id = property(_get_trace_id, _set_trace_id, doc=_get_trace_id.__doc__)
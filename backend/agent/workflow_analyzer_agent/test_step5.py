@@ -3,7 +3,7 @@ import asyncio
 import json
 import sys
 from datetime import datetime, timedelta
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 import logging
 
 from session import SessionState, SessionManager
@@ -12,6 +12,33 @@ from tools import lookup_api_docs, get_compliance_rules
 from types import WorkflowAnalysis, WorkflowStep
 from orchestrator import WorkflowAnalyzerOrchestrator
 
+# Agent 1 response fixture, serialized once
+_AGENT1_FIXTURE_JSON = json.dumps({
+    "steps": [
+        {
+            "step_id": "step_1",
+            "description": "Read file",
+            "inputs": ["file path"],
+            "outputs": ["file content"],
+            "dependencies": []
+        },
+        {
+            "step_id": "step_2",
+            "description": "Process data",
+            "inputs": ["file content"],
+            "outputs": ["processed data"],
+            "dependencies": ["step_1"]
+        },
+        {
+            "step_id": "step_3",
+            "description": "Write output",
+            "inputs": ["processed data"],
+            "outputs": ["output file"],
+            "dependencies": ["step_2"]
+        }
+    ]
+}, separators=(",", ":"))
+
 # Setup logging to capture messages
 logging.basicConfig(
     level=logging.DEBUG,
@@ -129,37 +156,13 @@ try:
 
         # Mock response
         mock_response = Mock()
-        mock_response.text = json.dumps({
-            "steps": [
-                {
-                    "step_id": "step_1",
-                    "description": "Read file",
-                    "inputs": ["file path"],
-                    "outputs": ["file content"],
-                    "dependencies": []
-                },
-                {
-                    "step_id": "step_2",
-                    "description": "Process data",
-                    "inputs": ["file content"],
-                    "outputs": ["processed data"],
-                    "dependencies": ["step_1"]
-                },
-                {
-                    "step_id": "step_3",
-                    "description": "Write output",
-                    "inputs": ["processed data"],
-                    "outputs": ["output file"],
-                    "dependencies": ["step_2"]
-                }
-            ]
-        })
-
-        mock_client.models.generate_content = Mock(return_value=mock_response)
+        mock_response.text = _AGENT1_FIXTURE_JSON
+
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
         # Test parsing
         session = SessionState()
-        steps = agent1.parse("Test workflow", session)
+        steps = asyncio.run(agent1.parse("Test workflow", session))
 
         assert len(steps) == 3, f"Expected 3 steps, got {len(steps)}"
         assert steps[0]["step_id"] == "step_1", "First step ID wrong"
@@ -1,7 +1,10 @@
 """API Lookup Tool - Check if an API exists for automating a step."""
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from ..config import TOOL_LOOKUP_CACHE_SIZE
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -95,12 +98,16 @@ def lookup_api_docs(step_description: str, trace_id: Optional[str] = None) -> Di
         >>> lookup_api_docs("review and approve document")
         {'api_exists': False, 'api_name': None, 'determinism': 0.3, ...}
     """
+    # Debug context is only built when it will be emitted
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     # Validate input
     if not step_description or not isinstance(step_description, str):
-        logger.debug(
-            "Invalid step description provided",
-            extra={"trace_id": trace_id, "input": step_description}
-        )
+        if debug_enabled:
+            logger.debug(
+                "Invalid step description provided",
+                extra={"trace_id": trace_id, "input": step_description}
+            )
         return {
             "api_exists": False,
             "api_name": None,
@@ -113,17 +120,21 @@ def lookup_api_docs(step_description: str, trace_id: Optional[str] = None) -> Di
     normalized_desc = step_description.lower().strip()
 
     # Log the lookup
-    logger.debug(
-        "API lookup initiated",
-        extra={
-            "trace_id": trace_id,
-            "step_description": step_description
-        }
+    if debug_enabled:
+        logger.debug(
+            "API lookup initiated",
+            extra={
+                "trace_id": trace_id,
+                "step_description": step_description
+            }
+        )
+
+    api_exists, api_name, determinism, notes, lookup_status, keyword = _match_description(
+        normalized_desc
     )
 
-    # Check for no-API keywords FIRST (higher priority)
-    for keyword, determinism in NO_API_KEYWORDS.items():
-        if keyword in normalized_desc:
+    if debug_enabled:
+        if lookup_status == "no_api_available":
             logger.debug(
                 "No API available for step type",
                 extra={
@@ -132,45 +143,76 @@ def lookup_api_docs(step_description: str, trace_id: Optional[str] = None) -> Di
                     "determinism": determinism
                 }
             )
-            return {
-                "api_exists": False,
-                "api_name": None,
-                "determinism": determinism,
-                "notes": f"Step requires {keyword} which typically cannot be fully automated",
-                "lookup_status": "no_api_available"
-            }
-
-    # Try exact keyword matches after checking no-API keywords
-    for keyword, api_info in API_DATABASE.items():
-        if keyword in normalized_desc:
+        elif lookup_status == "found":
             logger.debug(
                 "API found via keyword match",
                 extra={
                     "trace_id": trace_id,
                     "keyword": keyword,
-                    "api_name": api_info["api_name"]
+                    "api_name": api_name
+                }
+            )
+        else:
+            logger.debug(
+                "No specific API found for step",
+                extra={
+                    "trace_id": trace_id,
+                    "step_description": step_description
                 }
             )
-            return {
-                "api_exists": True,
-                "api_name": api_info["api_name"],
-                "determinism": api_info["determinism"],
-                "notes": api_info["description"],
-                "lookup_status": "found"
-            }
 
-    # No match found
-    logger.debug(
-        "No specific API found for step",
-        extra={
-            "trace_id": trace_id,
-            "step_description": step_description
-        }
-    )
     return {
-        "api_exists": False,
-        "api_name": None,
-        "determinism": 0.5,
-        "notes": "No specific API found. May require custom integration or manual review.",
-        "lookup_status": "no_match"
+        "api_exists": api_exists,
+        "api_name": api_name,
+        "determinism": determinism,
+        "notes": notes,
+        "lookup_status": lookup_status
     }
+
+
+@lru_cache(maxsize=TOOL_LOOKUP_CACHE_SIZE)
+def _match_description(
+    normalized_desc: str,
+) -> Tuple[bool, Optional[str], float, str, str, Optional[str]]:
+    """
+    Match a normalized step description against the keyword tables.
+
+    Pure in its argument, so results are memoized; callers build a fresh
+    response dict from the returned tuple.
+
+    Returns:
+        (api_exists, api_name, determinism, notes, lookup_status, matched keyword)
+    """
+    # Check for no-API keywords FIRST (higher priority)
+    for keyword, determinism in NO_API_KEYWORDS.items():
+        if keyword in normalized_desc:
+            return (
+                False,
+                None,
+                determinism,
+                f"Step requires {keyword} which typically cannot be fully automated",
+                "no_api_available",
+                keyword,
+            )
+
+    # Try exact keyword matches after checking no-API keywords
+    for keyword, api_info in API_DATABASE.items():
+        if keyword in normalized_desc:
+            return (
+                True,
+                api_info["api_name"],
+                api_info["determinism"],
+                api_info["description"],
+                "found",
+                keyword,
+            )
+
+    # No match found
+    return (
+        False,
+        None,
+        0.5,
+        "No specific API found. May require custom integration or manual review.",
+        "no_match",
+        None,
+    )
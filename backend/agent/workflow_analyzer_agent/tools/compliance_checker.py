@@ -1,5 +1,5 @@
 """Compliance Rules Tool - Return applicable compliance rules for a given risk level and domain."""
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 # Configure logger
@@ -93,12 +93,16 @@ def get_compliance_rules(
             ...
         }
     """
+    # Debug context is only built when it will be emitted
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     # Validate inputs
     if not risk_level or not isinstance(risk_level, str):
-        logger.debug(
-            "Invalid risk level provided",
-            extra={"trace_id": trace_id, "risk_level": risk_level}
-        )
+        if debug_enabled:
+            logger.debug(
+                "Invalid risk level provided",
+                extra={"trace_id": trace_id, "risk_level": risk_level}
+            )
         return _build_response(
             DEFAULT_COMPLIANCE,
             "error",
@@ -107,10 +111,11 @@ def get_compliance_rules(
         )
 
     if not domain or not isinstance(domain, str):
-        logger.debug(
-            "Invalid domain provided",
-            extra={"trace_id": trace_id, "domain": domain}
-        )
+        if debug_enabled:
+            logger.debug(
+                "Invalid domain provided",
+                extra={"trace_id": trace_id, "domain": domain}
+            )
         return _build_response(
             DEFAULT_COMPLIANCE,
             "error",
@@ -123,72 +128,66 @@ def get_compliance_rules(
     normalized_domain = domain.lower().strip()
 
     # Log the lookup
-    logger.debug(
-        "Compliance rule lookup initiated",
-        extra={
-            "trace_id": trace_id,
-            "risk_level": normalized_risk,
-            "domain": normalized_domain
-        }
-    )
-
-    # Check for CRITICAL risk level (always requires audit and HITL)
-    if normalized_risk == "CRITICAL":
-        result = {
-            "applicable_rules": _get_critical_rules(normalized_domain),
-            "requires_audit": True,
-            "hitl_required": True
-        }
+    if debug_enabled:
         logger.debug(
-            "CRITICAL risk level detected - audit and HITL required",
-            extra={"trace_id": trace_id, "domain": normalized_domain}
-        )
-        return _build_response(result, "found", "CRITICAL risk requires audit and human review", trace_id)
-
-    # Try exact match in database
-    db_key = (normalized_risk, normalized_domain)
-    if db_key in COMPLIANCE_DATABASE:
-        result = COMPLIANCE_DATABASE[db_key]
-        logger.debug(
-            "Compliance rules found",
+            "Compliance rule lookup initiated",
             extra={
                 "trace_id": trace_id,
                 "risk_level": normalized_risk,
-                "domain": normalized_domain,
-                "rules": result["applicable_rules"]
+                "domain": normalized_domain
             }
         )
-        return _build_response(result, "found", None, trace_id)
+
+    # Check for CRITICAL risk level (always requires audit and HITL)
+    if normalized_risk == "CRITICAL":
+        if debug_enabled:
+            logger.debug(
+                "CRITICAL risk level detected - audit and HITL required",
+                extra={"trace_id": trace_id, "domain": normalized_domain}
+            )
+        template = _CRITICAL_RESPONSES.get(normalized_domain, _CRITICAL_DEFAULT_RESPONSE)
+        return _from_template(template, trace_id)
+
+    # Try exact match in database
+    template = _FOUND_RESPONSES.get((normalized_risk, normalized_domain))
+    if template is not None:
+        if debug_enabled:
+            logger.debug(
+                "Compliance rules found",
+                extra={
+                    "trace_id": trace_id,
+                    "risk_level": normalized_risk,
+                    "domain": normalized_domain,
+                    "rules": template["applicable_rules"]
+                }
+            )
+        return _from_template(template, trace_id)
 
     # Try with wildcard domain (risk_level, *)
-    wildcard_key = (normalized_risk, "*")
-    if wildcard_key in COMPLIANCE_DATABASE:
-        result = COMPLIANCE_DATABASE[wildcard_key]
+    template = _WILDCARD_RESPONSES.get(normalized_risk)
+    if template is not None:
+        if debug_enabled:
+            logger.debug(
+                "Compliance rules found via wildcard domain",
+                extra={
+                    "trace_id": trace_id,
+                    "risk_level": normalized_risk,
+                    "rules": template["applicable_rules"]
+                }
+            )
+        return _from_template(template, trace_id)
+
+    # No specific match - return defaults
+    if debug_enabled:
         logger.debug(
-            "Compliance rules found via wildcard domain",
+            "No specific compliance rules found - using defaults",
             extra={
                 "trace_id": trace_id,
                 "risk_level": normalized_risk,
-                "rules": result["applicable_rules"]
+                "domain": normalized_domain
             }
         )
-        return _build_response(result, "found", "Using generic rules for this risk level", trace_id)
-
-    # No specific match - return defaults
-    logger.debug(
-        "No specific compliance rules found - using defaults",
-        extra={
-            "trace_id": trace_id,
-            "risk_level": normalized_risk,
-            "domain": normalized_domain
-        }
-    )
-    return _build_response(
-        DEFAULT_COMPLIANCE,
-        "no_match",
-        "No specific rules found for this risk/domain combination",
-        trace_id
-    )
+    return _from_template(_NO_MATCH_RESPONSE, trace_id)
 
 
 def _get_critical_rules(domain: str) -> List[str]:
@@ -201,11 +200,7 @@ def _get_critical_rules(domain: str) -> List[str]:
     Returns:
         List of applicable compliance rules
     """
-    rules_map = {
-        "financial": ["SOX", "PCI-DSS"],
-        "healthcare": ["HIPAA", "HITECH"],
-    }
-    return rules_map.get(domain, ["General Compliance Review Required"])
+    return _CRITICAL_RULES.get(domain, _CRITICAL_DEFAULT_RULES)
 
 
 def _build_response(
@@ -240,3 +235,65 @@ def _build_response(
         response["trace_id"] = trace_id
 
     return response
+
+
+def _from_template(template: Dict[str, Any], trace_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Copy a precomputed response, adding the trace ID if given.
+
+    Args:
+        template: Response built at import time by ``_build_response``
+        trace_id: Optional trace ID
+
+    Returns:
+        Complete compliance response dictionary
+    """
+    response = template.copy()
+    if trace_id:
+        response["trace_id"] = trace_id
+    return response
+
+
+# Rules for CRITICAL risk level by domain
+_CRITICAL_RULES: Dict[str, List[str]] = {
+    "financial": ["SOX", "PCI-DSS"],
+    "healthcare": ["HIPAA", "HITECH"],
+}
+_CRITICAL_DEFAULT_RULES = ["General Compliance Review Required"]
+
+# Responses for every fixed lookup outcome, built once at import; a lookup
+# only copies one. Rule lists are shared between responses, so callers must
+# copy them before mutating.
+_CRITICAL_NOTES = "CRITICAL risk requires audit and human review"
+
+
+def _critical_response(rules: List[str]) -> Dict[str, Any]:
+    """Build the response for a CRITICAL risk level with the given rules."""
+    return _build_response(
+        {"applicable_rules": rules, "requires_audit": True, "hitl_required": True},
+        "found",
+        _CRITICAL_NOTES,
+        None,
+    )
+
+
+_CRITICAL_RESPONSES: Dict[str, Dict[str, Any]] = {
+    domain: _critical_response(rules) for domain, rules in _CRITICAL_RULES.items()
+}
+_CRITICAL_DEFAULT_RESPONSE = _critical_response(_CRITICAL_DEFAULT_RULES)
+_FOUND_RESPONSES: Dict[Tuple[str, str], Dict[str, Any]] = {
+    key: _build_response(data, "found", None, None)
+    for key, data in COMPLIANCE_DATABASE.items()
+    if key[1] != "*"
+}
+_WILDCARD_RESPONSES: Dict[str, Dict[str, Any]] = {
+    risk: _build_response(data, "found", "Using generic rules for this risk level", None)
+    for (risk, domain), data in COMPLIANCE_DATABASE.items()
+    if domain == "*"
+}
+_NO_MATCH_RESPONSE = _build_response(
+    DEFAULT_COMPLIANCE,
+    "no_match",
+    "No specific rules found for this risk/domain combination",
+    None,
+)
@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from agent.workflow_analyzer_agent.config import MAX_WORKFLOW_LENGTH
 from agent.workflow_analyzer_agent.orchestrator import WorkflowAnalyzerOrchestrator
 from database.exceptions import WorkflowNotFoundError, FirestoreError
 from database.firebase_client import FirebaseClient
@@ -85,6 +86,11 @@ async def create_workflow(request: WorkflowRequest):
         workflow_name = request.workflow_name # Retrieve workflow_name
         if not workflow_text:
             raise HTTPException(status_code=400, detail="workflow_text is required")
+        if len(workflow_text) > MAX_WORKFLOW_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"workflow_text exceeds the {MAX_WORKFLOW_LENGTH} character limit",
+            )
 
         # Initialize Firebase and repository FIRST (needed for orchestrator)
         repository = get_repository()
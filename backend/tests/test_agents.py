@@ -0,0 +1,205 @@
+"""Tests for the agents' shared helpers (streaming, retries, row marshaling)."""
+
+import asyncio
+import re
+
+import orjson
+import pytest
+from google.genai import errors as genai_errors
+
+from backend.agent.workflow_analyzer_agent.agents import (
+    agent2_risk_assessor,
+    agent3_automation_analyzer,
+    retry,
+)
+from backend.agent.workflow_analyzer_agent.agents.streaming import JsonArrayItemScanner
+
+
+def test_json_array_item_scanner_yields_items_as_they_complete():
+    """Items of the keyed array are returned once complete, whatever the chunking."""
+    document = {
+        "summary": {"risk_assessments": [{"step_id": "nested"}]},
+        "other": [{"step_id": "ignored"}],
+        "risk_assessments": [
+            {"step_id": "s1", "notes": "braces { and ] in \"quotes\" \\"},
+            {"step_id": "s2", "mitigation_suggestions": [{"kind": "review"}]},
+            {"step_id": "s3"},
+        ],
+    }
+    text = orjson.dumps(document, option=orjson.OPT_INDENT_2).decode()
+    expected = document["risk_assessments"]
+
+    for size in (1, 7, len(text)):
+        scanner = JsonArrayItemScanner("risk_assessments")
+        items = []
+        for start in range(0, len(text), size):
+            items.extend(scanner.feed(text[start:start + size]))
+        assert items == expected
+
+    # An item is reported by the chunk that closes it, not before
+    scanner = JsonArrayItemScanner("risk_assessments")
+    assert scanner.feed('{"risk_assessments": [{"step_id": "s1"') == []
+    assert scanner.feed('}, {"step_id": ') == [{"step_id": "s1"}]
+    assert scanner.feed('"s2"}]}') == [{"step_id": "s2"}]
+
+
+class _RecordingLogger:
+    """Collects warning calls in place of a StructuredLogger."""
+
+    def __init__(self):
+        self.warnings = []
+
+    def info(self, message, **kwargs):
+        pass
+
+    def debug(self, message, **kwargs):
+        pass
+
+    def isEnabledFor(self, level):
+        return False
+
+    def warning(self, message, **kwargs):
+        self.warnings.append((message, kwargs))
+
+
+def test_is_retryable_error_classification():
+    """Rate limits, server errors and dropped connections retry; client errors do not."""
+    assert retry.is_retryable_error(genai_errors.ServerError(503, {}))
+    assert retry.is_retryable_error(genai_errors.ClientError(429, {}))
+    assert retry.is_retryable_error(ConnectionError("reset"))
+    assert retry.is_retryable_error(TimeoutError())
+    assert retry.is_retryable_error(RuntimeError("Connection reset by peer"))
+    assert not retry.is_retryable_error(genai_errors.ClientError(400, {}))
+    assert not retry.is_retryable_error(genai_errors.ClientError(404, {}))
+    assert not retry.is_retryable_error(ValueError("bad schema"))
+
+
+def test_generate_with_retry_backs_off_then_succeeds(monkeypatch):
+    """Transient failures are retried with capped exponential delays."""
+    delays = []
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(retry, "LLM_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(retry, "LLM_RETRY_MAX_DELAY", 3.0)
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        if len(attempts) < 4:
+            raise genai_errors.ServerError(503, {})
+        return "ok"
+
+    logger = _RecordingLogger()
+    assert asyncio.run(retry.generate_with_retry(call, logger, "retrying", max_attempts=5)) == "ok"
+    assert len(attempts) == 4
+    assert delays == [1.0, 2.0, 3.0]
+    assert [kwargs["attempt"] for _, kwargs in logger.warnings] == [1, 2, 3]
+
+
+def test_generate_with_retry_reraises(monkeypatch):
+    """Non-retryable errors fail at once; retryable ones after the last attempt."""
+    async def fake_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    attempts = []
+
+    async def bad_request():
+        attempts.append(None)
+        raise genai_errors.ClientError(400, {})
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(retry.generate_with_retry(bad_request, _RecordingLogger(), "retrying", max_attempts=3))
+    assert len(attempts) == 1
+
+    attempts.clear()
+
+    async def unavailable():
+        attempts.append(None)
+        raise genai_errors.ServerError(503, {})
+
+    with pytest.raises(genai_errors.ServerError):
+        asyncio.run(retry.generate_with_retry(unavailable, _RecordingLogger(), "retrying", max_attempts=3))
+    assert len(attempts) == 3
+
+
+class _Response:
+    def __init__(self, body):
+        self.text = orjson.dumps(body).decode()
+
+
+class _ChunkedAssessmentModels:
+    """Answers each Agent 2 chunk prompt, later chunks first, re-assessing step s0 each time."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model=None, contents=None, config=None):
+        self.calls += 1
+        step_ids = re.findall(r'"step_id":"(s\d+)"', contents)
+        # Finish in reverse step order so the merge cannot rely on completion order
+        await asyncio.sleep(0.001 * (100 - int(step_ids[0][1:])))
+        assessments = [{"step_id": step_id, "risk_level": "LOW"} for step_id in step_ids]
+        if step_ids[0] != "s0":
+            assessments.append({"step_id": "s0", "risk_level": "CRITICAL"})
+        return _Response({"risk_assessments": assessments})
+
+
+def test_row_marshaled_assessments_merge_by_step_id(monkeypatch):
+    """Large workflows are assessed in chunks and merged in step order, first assessment per step."""
+    monkeypatch.setattr(agent2_risk_assessor, "ROW_MARSHAL_MIN_STEPS", 4)
+    monkeypatch.setattr(agent2_risk_assessor, "ROW_MARSHAL_SIZE", 3)
+    models = _ChunkedAssessmentModels()
+    client = type("Client", (), {"aio": type("Aio", (), {"models": models})()})()
+    agent = agent2_risk_assessor.RiskAssessorAgent(client, _RecordingLogger(), None, {})
+    agent._prompt_cache.enabled = False
+
+    steps = [{"step_id": f"s{i}", "description": f"Step {i}"} for i in range(10)]
+    session = type("Session", (), {"trace_id": "t", "parsed_steps": {"steps": steps}, "parsed_steps_json": None})()
+    assessments = asyncio.run(agent._generate_assessments(session, "workflow", steps))
+
+    assert models.calls == 4
+    assert [a["step_id"] for a in assessments] == [f"s{i}" for i in range(10)]
+    assert all(a["risk_level"] == "LOW" for a in assessments)
+
+
+class _Session:
+    trace_id = "t"
+    parsed_steps = {}
+
+    def add_tool_call(self, tool_name, duration_ms, **kwargs):
+        pass
+
+
+def test_api_lookup_cache_refreshes_model_hits_and_counts_dispatches(monkeypatch):
+    """Entries the model re-reads move to the LRU end; only real tool calls count as misses."""
+    monkeypatch.setattr(agent3_automation_analyzer, "API_LOOKUP_CACHE_SIZE", 2)
+    dispatched = []
+
+    def lookup_api_docs(step_description, trace_id):
+        dispatched.append(step_description)
+        return {"api_exists": False}
+
+    agent = agent3_automation_analyzer.AutomationAnalyzerAgent(
+        None, _RecordingLogger(), None, {"lookup_api_docs": lookup_api_docs}
+    )
+    session = _Session()
+
+    def analyze(*descriptions, model_lookups=None):
+        analyses = [{"step_id": d, "description": d} for d in descriptions]
+        asyncio.run(agent._process_automation_analyses(analyses, session, model_lookups=model_lookups))
+
+    analyze("a", "b")
+    # The model looks "a" up again through function calling; it is served from the cache
+    model_lookups = {}
+    agent._tool_calling_config(session, model_lookups).tools[0]("a")
+    analyze("a", model_lookups=model_lookups)
+    analyze("c")
+
+    assert dispatched == ["a", "b", "c"]
+    assert list(agent._api_lookup_cache) == ["a", "c"]
+    info = agent.tool_cache_info()
+    assert (info["hits"], info["misses"]) == (1, 3)
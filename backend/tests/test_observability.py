@@ -0,0 +1,132 @@
+"""Tests for the observability components (logging, tracing, metrics)."""
+
+import logging
+import math
+import random
+
+import pytest
+
+from backend.agent.workflow_analyzer_agent.observability import logger as logger_module
+from backend.agent.workflow_analyzer_agent.config import MAX_SPANS_PER_TRACE
+from backend.agent.workflow_analyzer_agent.observability.logger import StructuredLogger
+from backend.agent.workflow_analyzer_agent.observability.metrics import (
+    MetricsCollector,
+    _LatencyHistogram,
+)
+from backend.agent.workflow_analyzer_agent.observability.tracer import DistributedTracer
+
+
+def test_binary_log_round_trip(tmp_path):
+    """Binary records decode back to entries, across loggers sharing a file and reopened segments."""
+    pytest.importorskip("msgpack")
+    from backend.agent.workflow_analyzer_agent.observability.decode_log import decode_records
+
+    path = str(tmp_path / "log.msgpack")
+    for name in ("binary-a", "binary-b"):
+        logging.getLogger(name).setLevel(logging.INFO)
+    first = StructuredLogger("binary-a", binary=True, binary_path=path)
+    second = StructuredLogger("binary-b", binary=True, binary_path=path)
+
+    first.info("started", trace_id="t1", steps=3)
+    second.info("started")
+    first.warning("slow call", latency_ms=12.5)
+    second.info("started")
+    first.close()
+
+    # A later process appending to the same file starts its own string table
+    del logger_module._binary_handlers[str(tmp_path / "log.msgpack")]
+    third = StructuredLogger("binary-a", binary=True, binary_path=path)
+    third.info("started")
+    third.close()
+
+    entries = list(decode_records(path))
+    assert [(e["logger"], e["level"], e["message"]) for e in entries] == [
+        ("binary-a", "INFO", "started"),
+        ("binary-b", "INFO", "started"),
+        ("binary-a", "WARNING", "slow call"),
+        ("binary-b", "INFO", "started"),
+        ("binary-a", "INFO", "started"),
+    ]
+    assert entries[0]["trace_id"] == "t1" and entries[0]["steps"] == 3
+    assert entries[2]["latency_ms"] == 12.5
+    assert isinstance(entries[0]["timestamp"], str)
+
+
+def test_latency_histogram_bounds():
+    """Count/total/min/max are exact; ranked values stay within 0.1% of the sorted samples."""
+    rng = random.Random(3)
+    samples = [rng.lognormvariate(5, 1.5) for _ in range(5000)] + [1.0, 250.0, 60000.0]
+    histogram = _LatencyHistogram()
+    for value in samples:
+        histogram.append(value)
+
+    ordered = sorted(samples)
+    assert histogram.count == len(samples)
+    assert histogram.total == pytest.approx(math.fsum(samples))
+    assert histogram.min == ordered[0]
+    assert histogram.max == ordered[-1]
+
+    ranks = list(range(0, len(ordered), 97)) + [len(ordered) - 1]
+    for rank, value in zip(ranks, histogram.values_at_ranks(ranks)):
+        assert value == pytest.approx(ordered[rank], rel=1e-3, abs=1e-3)
+
+
+def test_latency_histogram_single_value_and_summary():
+    """A single-valued series reports that value exactly; the summary uses nearest-rank percentiles."""
+    histogram = _LatencyHistogram()
+    for _ in range(10):
+        histogram.append(1234.567)
+    assert histogram.values_at_ranks((0, 5, 9)) == [1234.567] * 3
+
+    collector = MetricsCollector()
+    for latency in range(1, 101):
+        collector.record_latency("agent_2", float(latency))
+    stats = collector.get_summary()["agent_2_risk_latency"]
+    assert (stats["count"], stats["min"], stats["max"], stats["total"]) == (100, 1.0, 100.0, 5050.0)
+    assert [stats["median"], stats["p95"], stats["p99"]] == pytest.approx([51.0, 95.0, 99.0], rel=1e-3)
+
+    histogram.clear()
+    assert histogram.count == 0 and histogram.values_at_ranks((0,)) == []
+
+
+def test_tracer_keeps_most_recent_spans():
+    """Past MAX_SPANS_PER_TRACE, a trace's oldest finished spans are overwritten in order."""
+    tracer = DistributedTracer()
+    extra = 5
+    for i in range(MAX_SPANS_PER_TRACE + extra):
+        with tracer.span("t1", f"span-{i}", "step"):
+            pass
+    with pytest.raises(KeyError):
+        with tracer.span("t1", "failing", "step"):
+            raise KeyError("missing")
+
+    trace = tracer.get_trace("t1", include_timestamps=False)
+    assert len(trace) == MAX_SPANS_PER_TRACE
+    assert trace[0]["span_id"] == f"span-{extra + 1}"
+    assert trace[-2]["span_id"] == f"span-{MAX_SPANS_PER_TRACE + extra - 1}"
+    assert trace[-1]["status"] == "error: KeyError"
+    assert tracer.get_trace_summary("t1")["successful_spans"] == MAX_SPANS_PER_TRACE - 1
+
+
+def test_tracer_sampling_keeps_or_drops_whole_traces():
+    """Sampling is decided per trace_id: a trace is kept or dropped as a whole, at about the given rate."""
+    with pytest.raises(ValueError):
+        DistributedTracer(sample_rate=1.5)
+
+    tracer = DistributedTracer(sample_rate=0.25)
+    trace_ids = [f"trace-{i}" for i in range(2000)]
+    for trace_id in trace_ids:
+        tracer.start_trace(trace_id)
+        for span_id in ("a", "b"):
+            with tracer.span(trace_id, span_id, "step"):
+                pass
+
+    kept = [trace_id for trace_id in trace_ids if tracer.get_trace(trace_id)]
+    assert 0.2 < len(kept) / len(trace_ids) < 0.3
+    assert all(len(tracer.get_trace(trace_id)) == 2 for trace_id in kept)
+    # The decision is stable for a given trace_id
+    assert [trace_id for trace_id in trace_ids if DistributedTracer(sample_rate=0.25)._sampled(trace_id)] == kept
+
+    assert all(DistributedTracer(sample_rate=1.0)._sampled(trace_id) for trace_id in trace_ids)
+    assert not any(DistributedTracer(sample_rate=0.0)._sampled(trace_id) for trace_id in trace_ids)
+    assert DistributedTracer(enabled=False).start_trace("trace-0") is None
@@ -3,8 +3,14 @@
 import json
 from pathlib import Path
 
+import pytest
+from pydantic import ValidationError
+
 from backend.agent.workflow_analyzer_agent.types import WorkflowAnalysis
 from backend.agent.org_design import (
+    AgentOrgChart,
+    AgentRegistry,
+    ToolRegistry,
     synthesize_agent_org_chart,
     build_agent_registry,
     build_tool_registry,
@@ -36,6 +42,43 @@ def test_synthesize_agent_org_chart_from_example():
     assert step_ids == agent_step_ids
 
 
+def test_synthesized_org_chart_passes_validation():
+    """Org chart built without validation should still satisfy the schema."""
+    analysis = load_example_analysis()
+    org_chart = synthesize_agent_org_chart(analysis)
+
+    validated = AgentOrgChart.model_validate(org_chart.model_dump())
+    assert validated.model_dump() == org_chart.model_dump()
+
+
+def test_org_chart_models_are_frozen():
+    """Synthesized cards are read-only once built."""
+    org_chart = synthesize_agent_org_chart(load_example_analysis())
+
+    with pytest.raises(ValidationError):
+        org_chart.agents[0].mode = "HUMAN"
+
+
+def test_org_chart_schemas_are_not_shared():
+    """Each card and connection owns its schema dicts, independent of the steps and other charts."""
+    analysis = load_example_analysis()
+    org_chart = synthesize_agent_org_chart(analysis)
+    first, second = org_chart.agents[0], org_chart.agents[1]
+
+    first.input_schema["inputs"].append("injected")
+    first.output_schema["outputs"].append("injected")
+    assert "injected" not in second.input_schema["inputs"]
+    assert "injected" not in analysis.steps[0].inputs
+    assert "injected" not in analysis.steps[0].outputs
+    if org_chart.connections:
+        org_chart.connections[0].payload_schema["type"] = "changed"
+
+    fresh = synthesize_agent_org_chart(analysis)
+    assert fresh.model_dump() == synthesize_agent_org_chart(load_example_analysis()).model_dump()
+    assert all(c.payload_schema == {"type": "workflow_step_output"} for c in fresh.connections)
+    assert "injected" not in fresh.agents[0].input_schema["inputs"]
+
+
 def test_build_registries_from_org_chart():
     """Agent and tool registries should be populated from the org chart."""
     analysis = load_example_analysis()
@@ -51,3 +94,9 @@ def test_build_registries_from_org_chart():
     referenced_tools = {tool_id for card in org_chart.agents for tool_id in card.tool_ids}
     assert referenced_tools.issuperset(tool_registry.tools.keys()) or not referenced_tools
 
+    # Registries serialize to plain dicts for persistence
+    assert agent_registry.model_dump()["agents"].keys() == agent_registry.agents.keys()
+    assert tool_registry.model_dump()["tools"].keys() == tool_registry.tools.keys()
+    assert AgentRegistry.model_validate(agent_registry.model_dump()) == agent_registry
+    assert ToolRegistry.model_validate_json(tool_registry.model_dump_json()) == tool_registry
+
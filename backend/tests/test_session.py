@@ -0,0 +1,81 @@
+"""Tests for analysis session state and the session manager."""
+
+import orjson
+import pytest
+
+from backend.agent.workflow_analyzer_agent.session import SessionManager, SessionState
+
+
+def test_trace_id_init_argument_and_lazy_default():
+    """trace_id can be passed in, is generated once otherwise, and rejects empty values."""
+    assert SessionState(trace_id="trace-1").trace_id == "trace-1"
+    with pytest.raises(ValueError):
+        SessionState(trace_id="")
+
+    session = SessionState()
+    assert session.trace_id == session.trace_id
+    with pytest.raises(ValueError):
+        session.trace_id = ""
+
+
+def test_trace_id_survives_serialization():
+    """The trace_id is written even if never read, and older _trace_id documents still load."""
+    session = SessionState()
+    data = session.to_json()
+    assert SessionState.from_json(data).trace_id == session.trace_id
+
+    legacy = orjson.loads(SessionState(trace_id="trace-1").to_json())
+    legacy["_trace_id"] = legacy.pop("trace_id")
+    assert SessionState.from_json(orjson.dumps(legacy)).trace_id == "trace-1"
+
+
+def test_persisted_session_shares_trace_id_across_managers(tmp_path):
+    """A second manager on the same database sees the creating manager's trace_id."""
+    path = str(tmp_path / "sessions.db")
+    first, second = SessionManager(db_path=path), SessionManager(db_path=path)
+    try:
+        session = first.create_session()
+        assert second.get_session(session.session_id).trace_id == session.trace_id
+    finally:
+        first.close()
+        second.close()
+
+
+def test_purge_evicts_sessions_loaded_out_of_order(tmp_path):
+    """Expired sessions behind a live one are purged, and both counts are reported."""
+    path = str(tmp_path / "sessions.db")
+    writer, reader = SessionManager(db_path=path), SessionManager(num_shards=1, db_path=path)
+    try:
+        live = reader.create_session()
+        old = writer.create_session()
+        old.created_at -= reader.max_age * 2
+        writer.update_session(old.session_id, old)
+        # Loaded after the live session, so it sits behind it in the shard
+        assert reader.get_session(old.session_id) is not None
+
+        assert reader.purge_expired_sessions() == {"memory": 1, "database": 0}
+        assert reader._shards[0].keys() == {live.session_id}
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_cached_sessions_follow_other_managers_writes(tmp_path):
+    """A cached session is reloaded after another manager updates it, and dropped once deleted."""
+    path = str(tmp_path / "sessions.db")
+    first, second = SessionManager(db_path=path), SessionManager(db_path=path)
+    try:
+        session = first.create_session()
+        cached = second.get_session(session.session_id)
+        assert cached.agent1_latency == 0.0
+        assert second.get_session(session.session_id) is cached
+
+        session.agent1_latency = 12.5
+        first.update_session(session.session_id, session)
+        assert second.get_session(session.session_id).agent1_latency == 12.5
+
+        first.delete_session(session.session_id)
+        assert second.get_session(session.session_id) is None
+    finally:
+        first.close()
+        second.close()